@@ -0,0 +1,180 @@
+"""
+Evaluare în masă a achievement-urilor.
+
+Regulile sunt declarative (AchievementRule): fiecare primește coloanele unui batch de useri
+ca array-uri numpy și returnează o mască booleană. Sweep-ul parcurge toți userii în batch-uri
+(cu proiecții, fără documente complete), aduce portofoliile unui batch cu o singură agregare
+și pune în coada de mint doar achievement-urile nou câștigate.
+"""
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+
+from lazy_import import lazy_module
+from models.portfolio import Portfolio
+from models.user import User
+from routers.achievements import UserAchievement, enqueue_achievement_mint
+
+np = lazy_module("numpy")
+logger = logging.getLogger(__name__)
+
+SWEEP_BATCH_SIZE = 1000
+DEFAULT_TOKEN_URI = "ipfs://QmP7vuFVH6jNfwU5sQP16AstYRUEvGwUjQu2wxwXz12E3Q"
+
+
+@dataclass(frozen=True)
+class AchievementRule:
+    achievement_type: str
+    # primește coloanele batch-ului (vezi build_features) și întoarce o mască booleană
+    predicate: Callable[[Dict[str, "np.ndarray"]], "np.ndarray"]
+    token_uri: str = DEFAULT_TOKEN_URI
+
+
+# Un achievement nou = o intrare nouă aici
+ACHIEVEMENT_RULES: List[AchievementRule] = [
+    AchievementRule("10_days", lambda f: f["account_age_days"] >= 10),
+    AchievementRule("profit_positive", lambda f: f["total_profit"] > 0),
+]
+
+
+async def _portfolio_features(user_ids: list) -> Dict:
+    """Profitul și numărul de poziții pentru un batch de useri, calculate direct în Mongo."""
+    pipeline = [
+        {"$match": {"user_id": {"$in": user_ids}}},
+        {"$project": {
+            "user_id": 1,
+            "cash": 1,
+            "holdings_count": {"$size": {"$ifNull": ["$holdings", []]}},
+            "total_profit": {"$sum": {"$map": {
+                "input": {"$ifNull": ["$holdings", []]},
+                "as": "h",
+                "in": {"$multiply": [
+                    {"$subtract": ["$$h.current_price", "$$h.avg_buy_price"]},
+                    "$$h.quantity",
+                ]},
+            }}},
+        }},
+    ]
+    cursor = Portfolio.get_motor_collection().aggregate(pipeline)
+    return {doc["user_id"]: doc async for doc in cursor}
+
+
+def build_features(users: List[dict], portfolios: Dict, now: datetime) -> Dict[str, "np.ndarray"]:
+    created_at = np.array([u.get("created_at") or now for u in users], dtype="datetime64[ms]")
+    empty = {}
+    return {
+        "account_age_days": (np.datetime64(now, "ms") - created_at) / np.timedelta64(1, "D"),
+        "total_profit": np.array([portfolios.get(u["_id"], empty).get("total_profit", 0.0) for u in users], dtype=float),
+        "holdings_count": np.array([portfolios.get(u["_id"], empty).get("holdings_count", 0) for u in users], dtype=int),
+        "cash": np.array([portfolios.get(u["_id"], empty).get("cash", 0.0) for u in users], dtype=float),
+    }
+
+
+async def _existing_achievements(user_ids: List[str], rules: List[AchievementRule]) -> set:
+    cursor = UserAchievement.get_motor_collection().find(
+        {
+            "user_id": {"$in": user_ids},
+            "achievement_type": {"$in": [r.achievement_type for r in rules]},
+        },
+        projection={"_id": 0, "user_id": 1, "achievement_type": 1},
+    )
+    return {(doc["user_id"], doc["achievement_type"]) async for doc in cursor}
+
+
+async def evaluate_batch(users: List[dict], rules: List[AchievementRule] = ACHIEVEMENT_RULES,
+                         mint: bool = True) -> List[UserAchievement]:
+    """Evaluează regulile pentru un batch de useri (documente proiectate) și pune mint-urile în coadă."""
+    if not users:
+        return []
+    now = datetime.utcnow()
+    ids = [u["_id"] for u in users]
+    str_ids = [str(i) for i in ids]
+
+    portfolios = await _portfolio_features(ids)
+    features = build_features(users, portfolios, now)
+    existing = await _existing_achievements(str_ids, rules)
+
+    earned = []
+    for rule in rules:
+        already = np.array([(uid, rule.achievement_type) in existing for uid in str_ids], dtype=bool)
+        mask = np.asarray(rule.predicate(features), dtype=bool) & ~already
+        for idx in np.flatnonzero(mask):
+            earned.append(UserAchievement(
+                user_id=str_ids[idx],
+                achievement_type=rule.achievement_type,
+                wallet_address=users[idx]["wallet_address"],
+                token_uri=rule.token_uri,
+            ))
+
+    if not earned or not mint:
+        return earned
+
+    inserted = await _insert_new(earned)
+    for achievement in inserted:
+        enqueue_achievement_mint(achievement)
+    return inserted
+
+
+async def _insert_new(achievements: List[UserAchievement]) -> List[UserAchievement]:
+    """
+    Inserează neordonat și întoarce doar achievement-urile chiar inserate. O evaluare concurentă
+    (outbox, sweep) poate să fi scris deja aceeași pereche (user_id, achievement_type): indexul unic
+    o respinge, iar mint-ul nu se mai pune în coadă a doua oară.
+    """
+    for achievement in achievements:
+        achievement.id = ObjectId()
+    try:
+        await UserAchievement.insert_many(achievements, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != 11000 for err in errors):
+            raise
+        duplicates = {err["index"] for err in errors}
+        logger.info(f"Skipped {len(duplicates)} achievements already earned concurrently")
+        return [a for i, a in enumerate(achievements) if i not in duplicates]
+    return achievements
+
+
+def _users_cursor(query: dict, batch_size: int):
+    query = {**query, "wallet_address": {"$nin": ["", None]}}
+    return User.get_motor_collection().find(
+        query,
+        projection={"_id": 1, "wallet_address": 1, "created_at": 1},
+    ).batch_size(batch_size)
+
+
+async def sweep_all_users(rules: List[AchievementRule] = ACHIEVEMENT_RULES,
+                          batch_size: int = SWEEP_BATCH_SIZE, mint: bool = True,
+                          query: Optional[dict] = None) -> dict:
+    """Parcurge toți userii cu wallet în batch-uri și returnează un sumar al sweep-ului."""
+    start = time.perf_counter()
+    scanned = 0
+    earned_by_type: Dict[str, int] = {r.achievement_type: 0 for r in rules}
+
+    batch = []
+    async for doc in _users_cursor(query or {}, batch_size):
+        batch.append(doc)
+        if len(batch) >= batch_size:
+            for a in await evaluate_batch(batch, rules, mint):
+                earned_by_type[a.achievement_type] += 1
+            scanned += len(batch)
+            batch = []
+    if batch:
+        for a in await evaluate_batch(batch, rules, mint):
+            earned_by_type[a.achievement_type] += 1
+        scanned += len(batch)
+
+    elapsed = time.perf_counter() - start
+    logger.info(f"Achievement sweep: {scanned} users in {elapsed:.2f}s, earned {earned_by_type}")
+    return {"users_scanned": scanned, "earned": earned_by_type, "seconds": round(elapsed, 3)}
+
+
+async def evaluate_user(user_id: str, rules: List[AchievementRule] = ACHIEVEMENT_RULES) -> List[UserAchievement]:
+    """Aceleași reguli, pentru un singur user (folosit după fiecare trade)."""
+    users = await _users_cursor({"_id": ObjectId(user_id)}, 1).to_list(length=1)
+    return await evaluate_batch(users, rules)
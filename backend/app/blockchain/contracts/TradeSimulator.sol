@@ -15,6 +15,22 @@ contract TradeSimulator {
         userTrades[user].push(Trade(symbol, amount, isBuy, block.timestamp));
     }
 
+    // Înregistrează mai multe trade-uri într-o singură tranzacție (folosit de batcher-ul din backend)
+    function registerTrades(
+        address[] calldata users,
+        string[] calldata symbols,
+        uint256[] calldata amounts,
+        bool[] calldata isBuys
+    ) public {
+        require(
+            users.length == symbols.length && users.length == amounts.length && users.length == isBuys.length,
+            "Length mismatch"
+        );
+        for (uint256 i = 0; i < users.length; i++) {
+            userTrades[users[i]].push(Trade(symbols[i], amounts[i], isBuys[i], block.timestamp));
+        }
+    }
+
     function getUserTrades(address user) public view returns (Trade[] memory) {
         return userTrades[user];
     }
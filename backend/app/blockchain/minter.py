@@ -0,0 +1,313 @@
+"""
+Coadă de mint pentru contul admin.
+
+Toate tranzacțiile mintNFT trec printr-un singur worker care alocă nonce-urile
+local, așa că mint-urile concurente nu se mai ciocnesc pe același nonce.
+Receipt-urile sunt urmărite separat, fără să blocheze trimiterea următoarei tranzacții.
+"""
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from dotenv import load_dotenv
+
+from lazy_import import lazy_module
+from metrics import span, start_background_task
+
+# web3 se importă la primul apel către chain, nu la pornirea API-ului
+web3 = lazy_module("web3")
+web3_exceptions = lazy_module("web3.exceptions")
+
+logger = logging.getLogger(__name__)
+
+load_dotenv()
+
+BLOCKCHAIN_URL = os.getenv("BLOCKCHAIN_URL", "http://127.0.0.1:8545")
+NFT_ARTIFACT_PATH = "blockchain/artifacts/contracts/UserAchievementNFT.sol/UserAchievementNFT.json"
+
+MINT_GAS = 300000
+MAX_ATTEMPTS = 3
+RECEIPT_POLL_INTERVAL = 0.5  # secunde între verificările de receipt
+RECEIPT_TIMEOUT = 120  # după cât timp considerăm o tranzacție pierdută
+
+
+async def run_sync(fn, *args, **kwargs):
+    """Rulează un apel web3 (sincron) pe executor ca să nu blocheze event loop-ul."""
+    loop = asyncio.get_running_loop()
+    with span("chain"):
+        return await loop.run_in_executor(None, functools.partial(fn, *args, **kwargs))
+
+
+@functools.lru_cache(maxsize=None)
+def get_w3() -> "web3.Web3":
+    """Singurul client Web3: coada de mint, batcher-ul de trade-uri și citirile vorbesc cu același nod."""
+    return web3.Web3(web3.Web3.HTTPProvider(BLOCKCHAIN_URL))
+
+
+class NonceManager:
+    """
+    Alocator local de nonce pentru un singur cont.
+    Nonce-ul e citit din chain o singură dată și apoi incrementat local;
+    se resincronizează doar când apare un gol (tranzacție eșuată sau pierdută).
+    """
+
+    def __init__(self, w3: "web3.Web3", address: str):
+        self.w3 = w3
+        self.address = address
+        self._next_nonce: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def _chain_nonce(self) -> int:
+        # "pending" include și tranzacțiile trimise dar încă neminate
+        return await run_sync(self.w3.eth.get_transaction_count, self.address, "pending")
+
+    async def allocate(self) -> int:
+        async with self._lock:
+            if self._next_nonce is None:
+                self._next_nonce = await self._chain_nonce()
+            nonce = self._next_nonce
+            self._next_nonce += 1
+            return nonce
+
+    async def resync(self) -> int:
+        async with self._lock:
+            self._next_nonce = await self._chain_nonce()
+            logger.info(f"Nonce resynced from chain: {self._next_nonce}")
+            return self._next_nonce
+
+
+_nonce_managers: Dict[str, NonceManager] = {}
+
+
+def get_nonce_manager(w3: "web3.Web3", address: str) -> NonceManager:
+    """
+    Un singur NonceManager per cont, partajat de toți cei care trimit tranzacții
+    din contul admin (coada de mint, batcher-ul de trade-uri).
+    """
+    if address not in _nonce_managers:
+        _nonce_managers[address] = NonceManager(w3, address)
+    return _nonce_managers[address]
+
+
+@dataclass
+class MintJob:
+    wallet_address: str
+    token_uri: str
+    # apelat cu (job, receipt) după confirmare; folosit pentru a actualiza UserAchievement
+    on_confirmed: Optional[Callable[["MintJob", Any], Awaitable[None]]] = None
+    # apelat cu (job, motiv) când mint-ul e abandonat după MAX_ATTEMPTS încercări
+    on_failed: Optional[Callable[["MintJob", str], Awaitable[None]]] = None
+    attempts: int = 0
+    nonce: Optional[int] = None
+    tx_hash: Optional[str] = None
+    sent_at: float = 0.0
+    submitted: Optional[asyncio.Future] = field(default=None, repr=False)
+
+
+class MintQueue:
+    """
+    Pipeline de mint: un worker trimite tranzacțiile una după alta (fără să aștepte receipt-ul),
+    iar un al doilea task urmărește receipt-urile tuturor tranzacțiilor în zbor.
+    """
+
+    def __init__(self, w3: "web3.Web3", contract, private_key: str):
+        self.w3 = w3
+        self.contract = contract
+        self.private_key = private_key
+        self.admin_address = w3.eth.account.from_key(private_key).address
+        self.nonces = get_nonce_manager(w3, self.admin_address)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._in_flight: Dict[str, MintJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self.stats = {"submitted": 0, "confirmed": 0, "failed": 0, "resyncs": 0}
+
+    def start(self):
+        """Pornește worker-ii; apelat automat la primul mint."""
+        if self._tasks:
+            return
+        self._tasks = [
+            start_background_task(self._submit_loop()),
+            start_background_task(self._receipt_loop()),
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def enqueue(self, wallet_address: str, token_uri: str, on_confirmed=None, on_failed=None) -> MintJob:
+        self.start()
+        job = MintJob(
+            wallet_address=web3.Web3.to_checksum_address(wallet_address),
+            token_uri=token_uri,
+            on_confirmed=on_confirmed,
+            on_failed=on_failed,
+            submitted=asyncio.get_running_loop().create_future(),
+        )
+        self._queue.put_nowait(job)
+        return job
+
+    async def submit(self, wallet_address: str, token_uri: str, on_confirmed=None, on_failed=None) -> str:
+        """Pune un mint în coadă și așteaptă doar trimiterea lui (nu și confirmarea). Returnează tx hash-ul."""
+        job = self.enqueue(wallet_address, token_uri, on_confirmed, on_failed)
+        return await job.submitted
+
+    @property
+    def depth(self) -> int:
+        return self._queue.qsize()
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def _sign_mint(self, job: MintJob) -> bytes:
+        txn = self.contract.functions.mintNFT(job.wallet_address, job.token_uri).build_transaction({
+            "from": self.admin_address,
+            "nonce": job.nonce,
+            "gas": MINT_GAS,
+            "gasPrice": self.w3.to_wei("10", "gwei"),
+        })
+        signed_txn = self.w3.eth.account.sign_transaction(txn, self.private_key)
+        return signed_txn.raw_transaction
+
+    async def _fail(self, job: MintJob, reason: str, error: Optional[Exception] = None):
+        self.stats["failed"] += 1
+        logger.error(f"Mint for {job.wallet_address} failed after {job.attempts} attempts: {reason}")
+        if job.submitted and not job.submitted.done():
+            job.submitted.set_exception(error or RuntimeError(reason))
+        if job.on_failed:
+            try:
+                await job.on_failed(job, reason)
+            except Exception as e:
+                logger.error(f"Mint failure callback failed for {job.wallet_address}: {e}")
+
+    async def _send(self, job: MintJob):
+        job.attempts += 1
+        job.nonce = await self.nonces.allocate()
+        try:
+            raw_tx = await run_sync(self._sign_mint, job)
+            tx_hash = await run_sync(self.w3.eth.send_raw_transaction, raw_tx)
+        except Exception as e:
+            # Nonce-ul alocat n-a fost folosit -> gol; re-citim din chain înainte de orice altă trimitere
+            self.stats["resyncs"] += 1
+            await self.nonces.resync()
+            if job.attempts < MAX_ATTEMPTS:
+                logger.warning(f"Mint send failed (attempt {job.attempts}), retrying: {e}")
+                return await self._send(job)
+            await self._fail(job, f"send failed: {e}", e)
+            return
+
+        job.tx_hash = tx_hash.hex()
+        job.sent_at = time.monotonic()
+        self._in_flight[job.tx_hash] = job
+        self.stats["submitted"] += 1
+        if job.submitted and not job.submitted.done():
+            job.submitted.set_result(job.tx_hash)
+
+    async def _submit_loop(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._send(job)
+            except Exception as e:
+                logger.error(f"Unexpected mint queue error: {e}")
+                if job.submitted and not job.submitted.done():
+                    job.submitted.set_exception(e)
+            finally:
+                self._queue.task_done()
+
+    async def _receipt(self, tx_hash: str):
+        try:
+            return await run_sync(self.w3.eth.get_transaction_receipt, tx_hash)
+        except web3_exceptions.TransactionNotFound:
+            # și pentru tranzacțiile încă neminate
+            return None
+
+    async def _still_pending(self, tx_hash: str, job: MintJob) -> bool:
+        """Nodul încă știe tranzacția și nonce-ul ei n-a fost consumat de alta: doar e lentă."""
+        mined_nonce = await run_sync(self.w3.eth.get_transaction_count, self.admin_address, "latest")
+        if mined_nonce > job.nonce:
+            return False
+        try:
+            await run_sync(self.w3.eth.get_transaction, tx_hash)
+        except web3_exceptions.TransactionNotFound:
+            return False
+        return True
+
+    async def _check_receipt(self, tx_hash: str, job: MintJob):
+        receipt = await self._receipt(tx_hash)
+        if receipt is None:
+            if time.monotonic() - job.sent_at <= RECEIPT_TIMEOUT:
+                return
+            if await self._still_pending(tx_hash, job):
+                # retrimisă cu alt nonce, ar putea fi minată de două ori; mai așteptăm un RECEIPT_TIMEOUT
+                logger.warning(f"Mint tx {tx_hash} still pending after {RECEIPT_TIMEOUT}s, waiting")
+                job.sent_at = time.monotonic()
+                return
+            # poate a fost minată între timp (nonce-ul consumat chiar de ea)
+            receipt = await self._receipt(tx_hash)
+            if receipt is None:
+                # Nodul n-o mai știe sau nonce-ul ei a fost luat de altă tranzacție: nu mai poate fi
+                # minată, deci o retrimitem după resincronizare
+                self._in_flight.pop(tx_hash, None)
+                self.stats["resyncs"] += 1
+                await self.nonces.resync()
+                if job.attempts < MAX_ATTEMPTS:
+                    self._queue.put_nowait(job)
+                else:
+                    await self._fail(job, f"tx {tx_hash} dropped")
+                return
+
+        self._in_flight.pop(tx_hash, None)
+        if receipt["status"] != 1:
+            # nonce-ul a fost consumat de tranzacția revert-uită, deci retrimiterea primește unul nou
+            if job.attempts < MAX_ATTEMPTS:
+                logger.warning(f"Mint tx {tx_hash} reverted (attempt {job.attempts}), retrying")
+                self._queue.put_nowait(job)
+            else:
+                await self._fail(job, f"tx {tx_hash} reverted")
+            return
+
+        self.stats["confirmed"] += 1
+        if job.on_confirmed:
+            try:
+                await job.on_confirmed(job, receipt)
+            except Exception as e:
+                logger.error(f"Mint confirmation callback failed for {tx_hash}: {e}")
+
+    async def _receipt_loop(self):
+        while True:
+            await asyncio.sleep(RECEIPT_POLL_INTERVAL)
+            if not self._in_flight:
+                continue
+            pending = list(self._in_flight.items())
+            await asyncio.gather(
+                *(self._check_receipt(tx_hash, job) for tx_hash, job in pending),
+                return_exceptions=True,
+            )
+
+
+_mint_queue: Optional[MintQueue] = None
+
+
+def get_mint_queue() -> MintQueue:
+    """Coada de mint partajată de toate rutele; construită la primul apel."""
+    global _mint_queue
+    if _mint_queue is None:
+        with open(NFT_ARTIFACT_PATH) as f:
+            abi = json.load(f)["abi"]
+        w3 = get_w3()
+        contract = w3.eth.contract(address=web3.Web3.to_checksum_address(os.getenv("NFT_CONTRACT_ADDRESS")), abi=abi)
+        _mint_queue = MintQueue(w3, contract, os.getenv("PRIVATE_KEY"))
+    return _mint_queue
+
+
+async def shutdown_mint_queue():
+    if _mint_queue is not None:
+        await _mint_queue.stop()
@@ -0,0 +1,85 @@
+"""
+Cache read-through pentru apelurile view pe contracte.
+
+Cheia este (contract, metodă, argumente, ultimul block). Cât timp nu s-a minat un block nou,
+starea contractului nu se poate schimba, așa că rezultatul se servește din memorie.
+Numărul block-ului este citit de la nod cel mult o dată la BLOCK_POLL_INTERVAL secunde.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from metrics import span
+
+BLOCK_POLL_INTERVAL = float(os.getenv("CHAIN_BLOCK_POLL_INTERVAL", "1.0"))
+MAX_ENTRIES = int(os.getenv("CHAIN_READ_CACHE_SIZE", "10000"))
+
+
+class ChainReadCache:
+    def __init__(self, w3, poll_interval: float = BLOCK_POLL_INTERVAL, max_entries: int = MAX_ENTRIES):
+        self.w3 = w3
+        self.poll_interval = poll_interval
+        self.max_entries = max_entries
+        self._block_number = None
+        self._block_checked_at = 0.0
+        # Rezultate dependente de block: LRU limitat, intrările vechi ies singure
+        self._entries = OrderedDict()
+        # Rezultate imutabile (ex. tokenURI): păstrate permanent
+        self._immutable = {}
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "block_polls": 0}
+
+    def block_number(self) -> int:
+        now = time.monotonic()
+        if self._block_number is None or now - self._block_checked_at >= self.poll_interval:
+            with span("chain"):
+                self._block_number = self.w3.eth.block_number
+            self._block_checked_at = now
+            self.stats["block_polls"] += 1
+        return self._block_number
+
+    @staticmethod
+    def _key(contract_fn):
+        return (contract_fn.address, contract_fn.fn_name, repr(contract_fn.args), repr(contract_fn.kwargs))
+
+    def call(self, contract_fn, immutable: bool = False):
+        """
+        Echivalentul lui contract_fn.call(), dar servit din cache când e posibil.
+        immutable=True pentru metode al căror rezultat nu se schimbă niciodată pentru aceleași argumente.
+        """
+        key = self._key(contract_fn)
+        if immutable:
+            with self._lock:
+                if key in self._immutable:
+                    self.stats["hits"] += 1
+                    return self._immutable[key]
+            with span("chain"):
+                result = contract_fn.call()
+            with self._lock:
+                self._immutable[key] = result
+                self.stats["misses"] += 1
+            return result
+
+        block = self.block_number()
+        block_key = key + (block,)
+        with self._lock:
+            if block_key in self._entries:
+                self._entries.move_to_end(block_key)
+                self.stats["hits"] += 1
+                return self._entries[block_key]
+
+        # Citim la block-ul cunoscut, ca rezultatul să corespundă exact cheii
+        with span("chain"):
+            result = contract_fn.call(block_identifier=block)
+        with self._lock:
+            self._entries[block_key] = result
+            self.stats["misses"] += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._block_number = None
@@ -1,14 +1,25 @@
-from web3 import Web3
-from eth_account import Account
 from dotenv import load_dotenv
+import asyncio
+import logging
 import os
 import time
-from bson import ObjectId
+from functools import lru_cache
+from beanie.operators import In, Set
 
-load_dotenv()
+from blockchain.minter import get_mint_queue, get_nonce_manager, get_w3, run_sync
+from blockchain.read_cache import ChainReadCache
+from lazy_import import lazy_module
+from metrics import start_background_task
+from models.trade import Trade
+from models.user import User
 
-# === Setup Web3 ===
-w3 = Web3(Web3.HTTPProvider("http://127.0.0.1:8545"))
+logger = logging.getLogger(__name__)
+# web3 / eth_account se importă la primul apel către chain, nu la pornirea API-ului
+web3 = lazy_module("web3")
+web3_exceptions = lazy_module("web3.exceptions")
+eth_account = lazy_module("eth_account")
+
+load_dotenv()
 
 # === ABIs ===
 trade_abi = [
@@ -24,6 +35,18 @@ trade_abi = [
         "stateMutability": "nonpayable",
         "type": "function"
     },
+    {
+        "inputs": [
+            {"internalType": "address[]", "name": "users", "type": "address[]"},
+            {"internalType": "string[]", "name": "symbols", "type": "string[]"},
+            {"internalType": "uint256[]", "name": "amounts", "type": "uint256[]"},
+            {"internalType": "bool[]", "name": "isBuys", "type": "bool[]"}
+        ],
+        "name": "registerTrades",
+        "outputs": [],
+        "stateMutability": "nonpayable",
+        "type": "function"
+    },
     {
         "inputs": [
             {"internalType": "address", "name": "user", "type": "address"}
@@ -64,81 +87,233 @@ nft_abi = [
 PRIVATE_KEY = os.getenv("PRIVATE_KEY")
 TRADE_CONTRACT_ADDRESS = os.getenv("CONTRACT_ADDRESS")
 NFT_CONTRACT_ADDRESS = os.getenv("NFT_CONTRACT_ADDRESS")
+# Trade.quantity e float (se pot vinde fracțiuni), contractul ține uint256: cantitățile
+# se scriu on-chain în unități fixe de 10^-QUANTITY_DECIMALS acțiuni
+QUANTITY_DECIMALS = 6
+QUANTITY_SCALE = 10 ** QUANTITY_DECIMALS
 
-ACCOUNT = Account.from_key(PRIVATE_KEY)
-trade_contract = w3.eth.contract(address=Web3.to_checksum_address(TRADE_CONTRACT_ADDRESS), abi=trade_abi)
-nft_contract = w3.eth.contract(address=Web3.to_checksum_address(NFT_CONTRACT_ADDRESS), abi=nft_abi)
 
-# === Functions ===
-def register_trade_on_chain(trade_data):
+def to_chain_amount(quantity: float) -> int:
+    amount = round(quantity * QUANTITY_SCALE)
+    if amount <= 0:
+        raise ValueError(f"Quantity {quantity} cannot be registered on-chain")
+    return amount
+
+
+def from_chain_amount(amount: int) -> float:
+    return amount / QUANTITY_SCALE
+
+
+# === Setup Web3 ===
+# Clienții on-chain se creează la prima folosire, nu la import: API-ul pornește
+# și fără nod local sau PRIVATE_KEY, iar importul routerelor rămâne ieftin.
+# get_w3 (din blockchain.minter) citește BLOCKCHAIN_URL, la fel ca coada de mint.
+@lru_cache(maxsize=None)
+def get_account():
+    return eth_account.Account.from_key(PRIVATE_KEY)
+
+
+@lru_cache(maxsize=None)
+def get_trade_contract():
+    return get_w3().eth.contract(address=web3.Web3.to_checksum_address(TRADE_CONTRACT_ADDRESS), abi=trade_abi)
+
+
+@lru_cache(maxsize=None)
+def get_nft_contract():
+    return get_w3().eth.contract(address=web3.Web3.to_checksum_address(NFT_CONTRACT_ADDRESS), abi=nft_abi)
+
+
+@lru_cache(maxsize=None)
+def get_read_cache() -> ChainReadCache:
+    # Citirile view se repetă doar când s-a minat un block nou
+    return ChainReadCache(get_w3())
+
+# Un batch pleacă on-chain când are TRADE_BATCH_SIZE trade-uri sau după TRADE_BATCH_WINDOW secunde
+TRADE_BATCH_SIZE = int(os.getenv("TRADE_BATCH_SIZE", "50"))
+TRADE_BATCH_WINDOW = float(os.getenv("TRADE_BATCH_WINDOW", "2.0"))
+
+# === Batch registration ===
+class TradeBatcher:
     """
-    Register trade data on the blockchain
+    Strânge trade-urile completate și le înregistrează on-chain printr-un singur apel
+    registerTrades, când se umple batch-ul sau expiră fereastra de timp.
+    Tx hash-ul rezultat este scris înapoi în Trade.blockchain_tx pentru toate trade-urile din batch.
     """
+
+    def __init__(self, contract, account, max_batch_size: int = TRADE_BATCH_SIZE, max_wait: float = TRADE_BATCH_WINDOW):
+        self.contract = contract
+        self.account = account
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.nonces = get_nonce_manager(contract.w3, account.address)
+        self._queue = None
+        self._task = None
+        self.stats = {"batches": 0, "trades": 0, "failed_batches": 0}
+
+    def start(self):
+        if self._task is None:
+            self._queue = asyncio.Queue()
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        """Oprește worker-ul și trimite ce a rămas în coadă."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        remaining = []
+        while not self._queue.empty():
+            remaining.append(self._queue.get_nowait())
+        for i in range(0, len(remaining), self.max_batch_size):
+            await self._flush_items(remaining[i:i + self.max_batch_size])
+
+    def add(self, trade_data: dict) -> asyncio.Future:
+        """Adaugă trade-ul în batch-ul curent; future-ul primește tx hash-ul după trimitere."""
+        # o cantitate invalidă e respinsă aici, ca să nu pice tot batch-ul la trimitere
+        to_chain_amount(trade_data["quantity"])
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((trade_data, future))
+        return future
+
+    async def _collect(self) -> list:
+        loop = asyncio.get_running_loop()
+        batch = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _flush_items(self, items: list):
+        try:
+            tx_hash = await self.flush([trade_data for trade_data, _ in items])
+        except Exception as e:
+            self.stats["failed_batches"] += 1
+            logger.exception(f"Batch of {len(items)} trades failed on-chain: {e}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for _, future in items:
+            if not future.done():
+                future.set_result(tx_hash)
+
+    async def _run(self):
+        while True:
+            await self._flush_items(await self._collect())
+
+    def _sign_batch(self, wallets: list, rows: list, nonce: int):
+        txn = self.contract.functions.registerTrades(
+            wallets,
+            [t["symbol"] for t in rows],
+            [to_chain_amount(t["quantity"]) for t in rows],
+            [t["trade_type"] == "buy" for t in rows],
+        ).build_transaction({
+            "from": self.account.address,
+            "nonce": nonce,
+            "gasPrice": self.contract.w3.to_wei("10", "gwei"),
+        })
+        signed_txn = self.account.sign_transaction(txn)
+        return signed_txn.raw_transaction, signed_txn.hash.hex()
+
+    async def flush(self, batch: list):
+        # Adresele wallet se rezolvă o singură dată pentru tot batch-ul
+        user_ids = list({t["user_id"] for t in batch})
+        users = await User.find(In(User.id, user_ids)).to_list()
+        wallets = {u.id: web3.Web3.to_checksum_address(u.wallet_address) for u in users if u.wallet_address}
+
+        rows = [t for t in batch if t["user_id"] in wallets]
+        if not rows:
+            return None
+
+        trades = Trade.find(In(Trade.id, [t["trade_id"] for t in rows]))
+        nonce = await self.nonces.allocate()
+        try:
+            raw_tx, tx_hash = await run_sync(self._sign_batch, [wallets[t["user_id"]] for t in rows], rows, nonce)
+            # Hash-ul se scrie înainte de trimitere: dacă evenimentul din outbox e reîncercat,
+            # handler-ul vede trade-ul deja înregistrat și nu îl mai trimite a doua oară
+            await trades.update(Set({Trade.blockchain_tx: tx_hash}))
+        except Exception:
+            await self.nonces.resync()
+            raise
+        try:
+            await run_sync(self.contract.w3.eth.send_raw_transaction, raw_tx)
+        except Exception:
+            await self.nonces.resync()
+            await trades.update(Set({Trade.blockchain_tx: None}))
+            raise
+
+        self.stats["batches"] += 1
+        self.stats["trades"] += len(rows)
+        return tx_hash
+
+
+_trade_batcher = None
+
+
+def get_trade_batcher() -> TradeBatcher:
+    global _trade_batcher
+    if _trade_batcher is None:
+        _trade_batcher = TradeBatcher(get_trade_contract(), get_account())
+    return _trade_batcher
+
+
+async def shutdown_trade_batcher():
+    if _trade_batcher is not None:
+        await _trade_batcher.stop()
+
+
+# === Functions ===
+async def is_tx_known(tx_hash: str) -> bool:
+    """True dacă nodul știe de tranzacție (minată sau încă în mempool)."""
     try:
-        # Convert MongoDB ObjectId to a hex string if needed
-        user_id = trade_data.get('user_id')
-        if isinstance(user_id, ObjectId):
-            user_id = str(user_id)  # Convert ObjectId to string
-        
-        # For simulation/educational purposes only
-        # In a real blockchain implementation, you would call a smart contract here
-        print(f"BLOCKCHAIN: Registering trade for user {user_id}")
-        print(f"BLOCKCHAIN: Symbol: {trade_data.get('symbol')}")
-        print(f"BLOCKCHAIN: Quantity: {trade_data.get('quantity')}")
-        print(f"BLOCKCHAIN: Price: {trade_data.get('execution_price')}")
-        
-        # Return a mock transaction hash
-        import hashlib
-        import time
-        mock_hash = hashlib.sha256(f"{user_id}-{time.time()}".encode()).hexdigest()
-        return {"tx_hash": f"0x{mock_hash[:40]}"}
-        
-    except Exception as e:
-        # Log the error but don't fail the trade
-        print(f"BLOCKCHAIN ERROR: {str(e)}")
-        return {"error": str(e), "tx_hash": None}
+        await run_sync(get_w3().eth.get_transaction, tx_hash if tx_hash.startswith("0x") else "0x" + tx_hash)
+        return True
+    except web3_exceptions.TransactionNotFound:
+        return False
+
+
 def get_trades_from_chain(user_addr: str):
-    user_addr = Web3.to_checksum_address(user_addr)
-    trades = trade_contract.functions.getUserTrades(user_addr).call()
+    user_addr = web3.Web3.to_checksum_address(user_addr)
+    trades = get_read_cache().call(get_trade_contract().functions.getUserTrades(user_addr))
 
     result = []
     for trade in trades:
         result.append({
             "symbol": trade[0],
-            "amount": trade[1],
+            "amount": from_chain_amount(trade[1]),
             "is_buy": trade[2],
             "timestamp": trade[3]
         })
 
     return result
 
-def mint_nft_to_user(user_wallet: str, token_uri: str) -> str:
-    txn = nft_contract.functions.mintNFT(
-        Web3.to_checksum_address(user_wallet),
-        token_uri
-    ).build_transaction({
-        "from": ACCOUNT.address,
-        "nonce": w3.eth.get_transaction_count(ACCOUNT.address),
-        "gas": 300000,
-        "gasPrice": w3.eth.gas_price
-    })
-    signed_txn = w3.eth.account.sign_transaction(txn, private_key=PRIVATE_KEY)
-    tx_hash = w3.eth.send_raw_transaction(signed_txn.rawTransaction)
-    return tx_hash.hex()
+async def mint_nft_to_user(user_wallet: str, token_uri: str) -> str:
+    # Trece prin coada de mint ca să folosească alocatorul local de nonce
+    return await get_mint_queue().submit(user_wallet, token_uri)
 
 # 🎯 Funcție bonus: Reward NFT pentru useri activi
-def reward_active_user(wallet_address: str, metadata_uri: str) -> str:
-    print(f"🎁 Mint NFT to {wallet_address}")
-    return mint_nft_to_user(wallet_address, metadata_uri)
+async def reward_active_user(wallet_address: str, metadata_uri: str) -> str:
+    logger.info("Minting reward NFT to %s", wallet_address)
+    return await mint_nft_to_user(wallet_address, metadata_uri)
 def get_user_nfts(wallet_address: str):
     """
     Returnează lista de tokenURI-uri pentru NFT-urile deținute de un wallet.
     """
-    wallet_address = Web3.to_checksum_address(wallet_address)
-    balance = nft_contract.functions.balanceOf(wallet_address).call()
+    wallet_address = web3.Web3.to_checksum_address(wallet_address)
+    read_cache, nft_contract = get_read_cache(), get_nft_contract()
+    balance = read_cache.call(nft_contract.functions.balanceOf(wallet_address))
     uris = []
     for i in range(balance):
-        token_id = nft_contract.functions.tokenOfOwnerByIndex(wallet_address, i).call()
-        uri = nft_contract.functions.tokenURI(token_id).call()
+        token_id = read_cache.call(nft_contract.functions.tokenOfOwnerByIndex(wallet_address, i))
+        # Metadata unui token nu se schimbă după mint
+        uri = read_cache.call(nft_contract.functions.tokenURI(token_id), immutable=True)
         uris.append(uri)
     return uris
\ No newline at end of file
@@ -0,0 +1,163 @@
+"""
+Cache pentru răspunsurile chatbot-ului.
+
+Cheia este mesajul normalizat + un hash al contextului de portofoliu, deci doi useri cu
+portofolii diferite nu primesc același răspuns. Implicit doar potrivirea exactă e folosită;
+opțional (CHAT_CACHE_SIMILARITY > 0) o întrebare poate fi servită și dintr-o întrebare
+asemănătoare (similaritate cosinus pe vectori TF-IDF), doar din același context. Atenție:
+două întrebări care diferă printr-un singur cuvânt cheie (ex. tickerul) pot trece pragul.
+Intrările expiră după CHAT_CACHE_TTL secunde; peste CHAT_CACHE_SIZE iese cea mai veche folosită.
+"""
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+import unicodedata
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+CHAT_CACHE_SIZE = int(os.getenv("CHAT_CACHE_SIZE", "1000"))
+CHAT_CACHE_TTL = float(os.getenv("CHAT_CACHE_TTL", "3600"))
+# 0 (implicit) = doar potrivire exactă; ex. 0.9 activează potrivirea după similaritate
+CHAT_CACHE_SIMILARITY = float(os.getenv("CHAT_CACHE_SIMILARITY", "0"))
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, fără diacritice, punctuație și spații multiple."""
+    text = unicodedata.normalize("NFKD", message or "")
+    text = "".join(c for c in text if not unicodedata.combining(c)).lower()
+    return " ".join(_WORD_RE.findall(text))
+
+
+def context_hash(context: str) -> str:
+    return hashlib.sha1((context or "").encode()).hexdigest()
+
+
+class _Entry:
+    __slots__ = ("response", "expires_at", "terms", "vector", "norm")
+
+    def __init__(self, response: str, expires_at: float, terms: Counter):
+        self.response = response
+        self.expires_at = expires_at
+        self.terms = terms
+        # vectorul TF-IDF, calculat o dată la inserare (cu IDF-ul de atunci)
+        self.vector: Dict[str, float] = {}
+        self.norm = 0.0
+
+
+class ChatResponseCache:
+    def __init__(self, max_entries: int = CHAT_CACHE_SIZE, ttl: float = CHAT_CACHE_TTL,
+                 similarity: float = CHAT_CACHE_SIMILARITY):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        # (context_hash, mesaj normalizat) -> intrare; ordinea = LRU
+        self._entries: "OrderedDict[Tuple[str, str], _Entry]" = OrderedDict()
+        # context_hash -> cheile lui: căutarea după similaritate parcurge doar contextul cererii
+        self._by_context: Dict[str, set] = {}
+        # în câte intrări apare fiecare termen (pentru IDF)
+        self._doc_freq: Counter = Counter()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "similar_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _idf(self, term: str) -> float:
+        return math.log((1 + len(self._entries)) / (1 + self._doc_freq.get(term, 0))) + 1.0
+
+    def _vector(self, terms: Counter) -> Dict[str, float]:
+        return {t: tf * self._idf(t) for t, tf in terms.items()}
+
+    def _remove(self, key):
+        entry = self._entries.pop(key)
+        bucket = self._by_context.get(key[0])
+        if bucket is not None:
+            bucket.discard(key)
+            if not bucket:
+                del self._by_context[key[0]]
+        self._doc_freq.subtract(entry.terms.keys())
+        self._doc_freq += Counter()  # scoate termenii ajunși la 0
+
+    def _find_similar(self, ctx: str, terms: Counter, now: float) -> Optional[Tuple[str, str]]:
+        query = self._vector(terms)
+        query_norm = math.sqrt(sum(w * w for w in query.values()))
+        if not query_norm:
+            return None
+        best_key, best_score = None, self.similarity
+        for key in self._by_context.get(ctx, ()):
+            entry = self._entries[key]
+            if entry.expires_at <= now or not entry.norm:
+                continue
+            score = sum(w * entry.vector.get(t, 0.0) for t, w in query.items()) / (query_norm * entry.norm)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def get(self, message: str, context: str) -> Optional[str]:
+        key = (context_hash(context), normalize_message(message))
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.expires_at <= now:
+                self._remove(key)
+                self.stats["expired"] += 1
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats["hits"] += 1
+                return entry.response
+
+            if self.similarity > 0:
+                similar = self._find_similar(key[0], Counter(key[1].split()), now)
+                if similar is not None:
+                    self._entries.move_to_end(similar)
+                    self.stats["similar_hits"] += 1
+                    return self._entries[similar].response
+
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, message: str, context: str, response: str):
+        if not response:
+            return
+        key = (context_hash(context), normalize_message(message))
+        terms = Counter(key[1].split())
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            entry = _Entry(response, time.monotonic() + self.ttl, terms)
+            self._entries[key] = entry
+            self._by_context.setdefault(key[0], set()).add(key)
+            self._doc_freq.update(terms.keys())
+            if self.similarity > 0:
+                entry.vector = self._vector(terms)
+                entry.norm = math.sqrt(sum(w * w for w in entry.vector.values()))
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._by_context.clear()
+            self._doc_freq.clear()
+
+    def metrics(self) -> dict:
+        lookups = self.stats["hits"] + self.stats["similar_hits"] + self.stats["misses"]
+        hits = self.stats["hits"] + self.stats["similar_hits"]
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl": self.ttl,
+            "similarity_threshold": self.similarity,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            **self.stats,
+        }
+
+
+chat_cache = ChatResponseCache()
@@ -0,0 +1,138 @@
+"""
+Memoria conversațiilor chatbot-ului și asamblarea prompt-ului într-un buget fix de tokeni.
+
+Fiecare sesiune păstrează ultimele schimburi integral; când istoricul depășește
+CHAT_HISTORY_MAX_TOKENS, cele mai vechi schimburi sunt comprimate într-un rezumat
+(extractiv: întrebarea + prima frază a răspunsului), fără un apel suplimentar la model.
+assemble_messages pune în prompt, în ordinea priorității: instrucțiunile, mesajul curent,
+portofoliul, rezumatul, schimburile recente (cele mai noi primele) și fragmentele RAG,
+cât încape în CHAT_CONTEXT_BUDGET. Lungimea prompt-ului rămâne mărginită oricât ar dura conversația.
+"""
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from rag_index import estimate_tokens
+
+CHAT_CONTEXT_BUDGET = int(os.getenv("CHAT_CONTEXT_BUDGET", "2000"))
+CHAT_HISTORY_MAX_TOKENS = int(os.getenv("CHAT_HISTORY_MAX_TOKENS", "1200"))
+CHAT_SUMMARY_MAX_TOKENS = int(os.getenv("CHAT_SUMMARY_MAX_TOKENS", "300"))
+CHAT_MAX_SESSIONS = int(os.getenv("CHAT_MAX_SESSIONS", "5000"))
+CHAT_SESSION_TTL = float(os.getenv("CHAT_SESSION_TTL", "3600"))
+
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def _truncate(text: str, max_tokens: int) -> str:
+    max_chars = max(0, max_tokens * 4)
+    return text if len(text) <= max_chars else text[:max_chars].rstrip() + "..."
+
+
+def _summarize_turn(question: str, answer: str) -> str:
+    first_sentence = _SENTENCE_RE.split(answer.strip(), maxsplit=1)[0]
+    return f"- User asked: {_truncate(question, 40)} Assistant: {_truncate(first_sentence, 40)}"
+
+
+class Conversation:
+    def __init__(self, session_id: str, user_id: str):
+        self.session_id = session_id
+        self.user_id = user_id
+        # (întrebare, răspuns), cele mai vechi primele
+        self.turns: List[tuple] = []
+        self.summary_lines: List[str] = []
+        self.touched_at = time.monotonic()
+
+    @property
+    def summary(self) -> str:
+        return "\n".join(self.summary_lines)
+
+    def _history_tokens(self) -> int:
+        return sum(estimate_tokens(q) + estimate_tokens(a) for q, a in self.turns)
+
+    def add_turn(self, question: str, answer: str):
+        self.turns.append((question, answer))
+        self.touched_at = time.monotonic()
+        # rezumat rulant: schimburile vechi trec în rezumat, ultimul rămâne mereu întreg
+        while len(self.turns) > 1 and self._history_tokens() > CHAT_HISTORY_MAX_TOKENS:
+            self.summary_lines.append(_summarize_turn(*self.turns.pop(0)))
+        while len(self.summary_lines) > 1 and estimate_tokens(self.summary) > CHAT_SUMMARY_MAX_TOKENS:
+            self.summary_lines.pop(0)
+
+
+class ConversationStore:
+    """Sesiunile active, în memorie: LRU cu expirare după inactivitate."""
+
+    def __init__(self, max_sessions: int = CHAT_MAX_SESSIONS, ttl: float = CHAT_SESSION_TTL):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self._sessions: "OrderedDict[str, Conversation]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def get_or_create(self, session_id: Optional[str], user_id: str) -> Conversation:
+        now = time.monotonic()
+        with self._lock:
+            conversation = self._sessions.get(session_id) if session_id else None
+            # o sesiune expirată sau a altui user nu este continuată
+            if conversation is not None and (conversation.user_id != user_id or now - conversation.touched_at > self.ttl):
+                del self._sessions[session_id]
+                conversation = None
+            if conversation is None:
+                conversation = Conversation(session_id or uuid.uuid4().hex, user_id)
+                self._sessions[conversation.session_id] = conversation
+            self._sessions.move_to_end(conversation.session_id)
+            conversation.touched_at = now
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return conversation
+
+    def clear(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+conversation_store = ConversationStore()
+
+
+def assemble_messages(instructions: str, portfolio_context: str, message: str,
+                      conversation: Optional[Conversation],
+                      retrieve: Optional[Callable[[str, int], List[str]]] = None,
+                      budget: int = CHAT_CONTEXT_BUDGET) -> List[dict]:
+    """Mesajele pentru /v1/chat/completions, încadrate în `budget` tokeni."""
+    remaining = budget - estimate_tokens(instructions) - estimate_tokens(message)
+
+    portfolio = _truncate(portfolio_context, max(0, remaining // 3))
+    remaining -= estimate_tokens(portfolio)
+    system_parts = [instructions, portfolio, "If the user asks about their stocks, use this information."]
+
+    history = []
+    if conversation is not None:
+        summary = conversation.summary
+        if summary and estimate_tokens(summary) <= remaining // 2:
+            system_parts.append("Summary of the earlier conversation:\n" + summary)
+            remaining -= estimate_tokens(summary)
+        # schimburile recente, de la cel mai nou spre cel mai vechi, cât încap (păstrăm loc pentru RAG)
+        history_budget = remaining * 2 // 3
+        for question, answer in reversed(conversation.turns):
+            cost = estimate_tokens(question) + estimate_tokens(answer)
+            if cost > history_budget:
+                break
+            history[:0] = [{"role": "user", "content": question}, {"role": "assistant", "content": answer}]
+            history_budget -= cost
+            remaining -= cost
+
+    if retrieve is not None and remaining > 0:
+        passages = retrieve(message, remaining)
+        if passages:
+            system_parts.append(
+                "Use the following reference material when it is relevant to the question:\n"
+                + "\n---\n".join(passages)
+            )
+
+    return [{"role": "system", "content": "\n".join(system_parts)}, *history, {"role": "user", "content": message}]
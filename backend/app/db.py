@@ -1,12 +1,10 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from models.user import User
 from models.portfolio import Portfolio
 from models.trade import Trade
 from models.stock import Stock
-import asyncio
+from mongo_client import get_main_db
 
 async def init_db():
-    client = AsyncIOMotorClient("mongodb://localhost:27017")
-    db = client.wallstreet_sim
+    db = get_main_db()
     await init_beanie(database=db, document_models=[User, Portfolio, Trade, Stock])
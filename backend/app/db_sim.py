@@ -1,16 +1,17 @@
-from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from models.user import User
 from models.portfolio import Portfolio
 from models.trade import Trade
+from models.outbox import OutboxEvent
+from models.news import NewsArticle
 from routers.achievements import UserAchievement  # Import UserAchievement
+from mongo_client import get_main_db
 
 async def init_main_db(additional_models=None):
-    client = AsyncIOMotorClient("mongodb://localhost:27017")
-    db = client.wallstreet_sim
+    db = get_main_db()
     
     # Lista de bază de modele
-    models = [User, Portfolio, Trade, UserAchievement]
+    models = [User, Portfolio, Trade, UserAchievement, OutboxEvent, NewsArticle]
     
     # Dacă există modele suplimentare, adaugă-le
     if additional_models:
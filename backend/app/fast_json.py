@@ -0,0 +1,92 @@
+"""
+Serializare JSON rapidă pentru răspunsurile mari (liste de sute/mii de rânduri).
+
+FastAPI trece orice valoare returnată prin jsonable_encoder (o copie recursivă în Python),
+apoi prin json.dumps. Un endpoint care întoarce direct FastJSONResponse(data) sare peste
+ambele: datele sunt codate într-un singur pas de orjson (C), dacă e instalat, altfel de json
+din stdlib, cu aceleași reguli pentru tipurile speciale:
+- ObjectId -> str, datetime/date -> ISO 8601 (ca jsonable_encoder);
+- scalari și array-uri NumPy (np.float64, np.bool_, ndarray) -> valori/liste Python;
+- NaN/Infinity -> null (JSONResponse standard ar arunca ValueError).
+
+Benchmark: backend/benchmarks/json_encoding.py.
+"""
+import json
+import math
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(obj):
+    """Tipurile pe care encoder-ul nu le știe nativ."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    # NumPy fără import: și scalarii, și array-urile au .tolist()
+    if type(obj).__module__ == "numpy":
+        return obj.tolist()
+    if isinstance(obj, BaseModel):
+        return obj.model_dump()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _default_stdlib(obj):
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    value = _default(obj)
+    # float-urile NumPy ajung aici ca float Python; NaN trebuie tot null
+    return None if isinstance(value, float) and not math.isfinite(value) else value
+
+
+def _finite(obj):
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if isinstance(obj, dict):
+        return {k: _finite(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_finite(v) for v in obj]
+    return obj
+
+
+def _stdlib_dumps(data) -> bytes:
+    return json.dumps(data, default=_default_stdlib, ensure_ascii=False,
+                      allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_stdlib(data) -> bytes:
+    try:
+        return _stdlib_dumps(data)
+    except ValueError:
+        # json din stdlib nu poate scrie NaN ca null; copiem structura doar când e cazul
+        return _stdlib_dumps(_finite(data))
+
+
+if orjson is not None:
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(data) -> bytes:
+        return orjson.dumps(data, default=_default, option=_ORJSON_OPTIONS)
+else:
+    dumps = dumps_stdlib
+
+
+class FastJSONResponse(JSONResponse):
+    """Răspuns JSON codat direct cu fast_json.dumps; se returnează explicit din endpoint."""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
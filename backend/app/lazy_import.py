@@ -0,0 +1,38 @@
+"""
+Import amânat pentru dependențele grele (pandas, yfinance...).
+
+    pd = lazy_module("pandas")
+
+Modulul real este importat la primul acces la un atribut (pd.DataFrame), nu la pornirea
+aplicației, așa că un worker nou nu plătește importul decât dacă endpoint-ul chiar îl folosește.
+"""
+import importlib
+import threading
+from types import ModuleType
+
+
+class _LazyModule(ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_lock"] = threading.Lock()
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            with self.__dict__["_lazy_lock"]:
+                module = self.__dict__["_lazy_module"]
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    self.__dict__["_lazy_module"] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+
+def lazy_module(name: str) -> ModuleType:
+    return _LazyModule(name)
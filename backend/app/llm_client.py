@@ -0,0 +1,148 @@
+"""
+Acces partajat la backend-ul LLM (Ollama).
+
+- un singur httpx.AsyncClient pe toată durata aplicației, cu pool de conexiuni;
+- o coadă de admitere corectă (round-robin între useri) care limitează câte generări
+  rulează simultan, câte cereri are un user în sistem și cât de lungă poate fi coada.
+  Când coada e plină cererea e respinsă imediat, în loc să suprasolicite procesul modelului.
+"""
+import asyncio
+import os
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Deque, Dict, Optional
+
+import httpx
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "2"))
+LLM_MAX_QUEUE = int(os.getenv("LLM_MAX_QUEUE", "50"))
+LLM_PER_USER_LIMIT = int(os.getenv("LLM_PER_USER_LIMIT", "2"))
+LLM_POOL_SIZE = int(os.getenv("LLM_POOL_SIZE", "10"))
+
+
+class QueueFullError(Exception):
+    pass
+
+
+class UserLimitError(Exception):
+    pass
+
+
+class LLMAdmission:
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, max_queue: int = LLM_MAX_QUEUE,
+                 per_user_limit: int = LLM_PER_USER_LIMIT):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.per_user_limit = per_user_limit
+        self._active = 0
+        # user -> cererile lui care așteaptă; ordinea cheilor dă rândul în round-robin
+        self._waiting: "OrderedDict[str, Deque[asyncio.Future]]" = OrderedDict()
+        self._outstanding: Dict[str, int] = {}
+        self.stats = {"admitted": 0, "completed": 0, "rejected_queue_full": 0, "rejected_user_limit": 0}
+
+    @property
+    def depth(self) -> int:
+        return sum(len(q) for q in self._waiting.values())
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    def metrics(self) -> dict:
+        return {
+            "active": self._active,
+            "queue_depth": self.depth,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "per_user_limit": self.per_user_limit,
+            **self.stats,
+        }
+
+    def _dispatch(self):
+        while self._active < self.max_concurrency and self._waiting:
+            user_id, queue = next(iter(self._waiting.items()))
+            future = queue.popleft()
+            # userul trece la coada rotației dacă mai are cereri în așteptare
+            del self._waiting[user_id]
+            if queue:
+                self._waiting[user_id] = queue
+            if future.cancelled():
+                continue
+            self._active += 1
+            future.set_result(None)
+
+    def _forget(self, user_id: str):
+        self._outstanding[user_id] = self._outstanding.get(user_id, 1) - 1
+        if self._outstanding[user_id] <= 0:
+            self._outstanding.pop(user_id, None)
+
+    async def acquire(self, user_id: str):
+        """Așteaptă un loc liber. Aruncă UserLimitError / QueueFullError fără să aștepte."""
+        if self._outstanding.get(user_id, 0) >= self.per_user_limit:
+            self.stats["rejected_user_limit"] += 1
+            raise UserLimitError(f"Too many chatbot requests in progress for user {user_id}")
+        self._outstanding[user_id] = self._outstanding.get(user_id, 0) + 1
+
+        if self._active < self.max_concurrency and not self._waiting:
+            self._active += 1
+        else:
+            if self.depth >= self.max_queue:
+                self._forget(user_id)
+                self.stats["rejected_queue_full"] += 1
+                raise QueueFullError("Chatbot is busy, please try again shortly")
+            future = asyncio.get_running_loop().create_future()
+            self._waiting.setdefault(user_id, deque()).append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                self._forget(user_id)
+                if future.done() and not future.cancelled():
+                    # locul a fost acordat chiar înainte de anulare: îl eliberăm
+                    self._active -= 1
+                    self._dispatch()
+                else:
+                    queue = self._waiting.get(user_id)
+                    if queue and future in queue:
+                        queue.remove(future)
+                        if not queue:
+                            del self._waiting[user_id]
+                raise
+
+        self.stats["admitted"] += 1
+
+    def release(self, user_id: str):
+        self._active -= 1
+        self._forget(user_id)
+        self.stats["completed"] += 1
+        self._dispatch()
+
+    @asynccontextmanager
+    async def slot(self, user_id: str):
+        await self.acquire(user_id)
+        try:
+            yield
+        finally:
+            self.release(user_id)
+
+
+llm_admission = LLMAdmission()
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def get_llm_client() -> httpx.AsyncClient:
+    """Clientul HTTP partajat pentru Ollama (conexiunile rămân deschise între mesaje)."""
+    global _client
+    if _client is None:
+        _client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE),
+            timeout=httpx.Timeout(60.0),
+        )
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
@@ -1,9 +1,14 @@
 from fastapi import FastAPI
+from logging_config import RequestIdMiddleware, configure_logging, shutdown_logging
+
+# Înainte de importul routerelor, ca loggerii lor să scrie prin coadă de la început
+configure_logging()
 
 
 from routers import users, trades, portfolios, leaderboard, auth, recommendations, stocks, chart, news
 from routers import chatbot
 from routers import nft
+from routers import admin
 # Importă tot modulul achievements, nu doar UserAchievement
 from routers import achievements  # Modificare aici
 from routers.achievements import UserAchievement
@@ -14,6 +19,10 @@ app = FastAPI(title="Wall Street Academy API")
 
 
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from metrics import MetricsMiddleware, install_mongo_metrics, registry
+from profiling import ProfilingMiddleware
+from response_compression import CompressionMiddleware
 
 # Șterge această linie - este definită deja mai sus
 # app = FastAPI(title="Wall Street Academy API")
@@ -26,17 +35,62 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+# gzip/brotli peste COMPRESSION_MIN_SIZE; răspunsurile din response_cache vin deja comprimate
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(RequestIdMiddleware)
+# Profilare la cerere (X-Profile sau eșantionare); fără PROFILING_TOKEN doar pasează cererea
+app.add_middleware(ProfilingMiddleware)
+# Cel mai exterior middleware: măsoară și timpul petrecut în CORS
+app.add_middleware(MetricsMiddleware)
+# Listener-ul pymongo trebuie înregistrat înainte ca init_main_db / init_stock_db să creeze clienții
+install_mongo_metrics()
+
+@app.get("/metrics", include_in_schema=False)
+async def prometheus_metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
 
 
 from db_sim import init_main_db
 from db_stocks import init_stock_db
+from mongo_client import close_motor_client, warm_pool
+from blockchain.minter import shutdown_mint_queue
+from blockchain.utils import shutdown_trade_batcher
+from outbox import outbox_worker, user_invalidation_hooks
+from news_ingest import news_ingester
+from news_index import news_index
+from llm_client import close_llm_client
+from rag_index import rag_index
+from portfolio_snapshot import portfolio_snapshots
+from response_cache import response_cache
 
 @app.on_event("startup")
 async def app_startup():
   
     await init_main_db([UserAchievement])  # Treci UserAchievement ca parametru
     await init_stock_db()
-
+    await warm_pool()
+    outbox_worker.start()
+    await news_index.load_from_store()
+    news_ingester.listeners.append(news_index.on_ingest)
+    # după indexare, ca /news să fie reconstruit din datele noi
+    news_ingester.listeners.append(response_cache.invalidation_listener("news"))
+    news_ingester.start()
+    rag_index.start()
+    user_invalidation_hooks.append(portfolio_snapshots.invalidate)
+    portfolio_snapshots.stock_listeners.append(response_cache.invalidation_listener("stocks"))
+    portfolio_snapshots.start()
+
+@app.on_event("shutdown")
+async def app_shutdown():
+    await news_ingester.stop()
+    await rag_index.stop()
+    await portfolio_snapshots.stop()
+    await outbox_worker.stop()
+    await shutdown_trade_batcher()
+    await shutdown_mint_queue()
+    await close_llm_client()
+    close_motor_client()
+    shutdown_logging()
 
 
 
@@ -49,6 +103,7 @@ app.include_router(recommendations.router, prefix="/recommendations", tags=["AI"
 app.include_router(stocks.router, prefix="/stocks", tags=["Stocks"])
 app.include_router(news.router, prefix="/news", tags=["News"])
 app.include_router(chatbot.router, prefix="/api/chatbot", tags=["chatbot"])
+app.include_router(admin.router, prefix="/admin", tags=["Admin"], include_in_schema=False)
 app.include_router(achievements.router)
 app.include_router(nft.router)
 app.include_router(chart.router)
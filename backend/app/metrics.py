@@ -0,0 +1,239 @@
+"""
+Metrici de performanță în format text Prometheus, expuse la GET /metrics.
+
+- MetricsMiddleware (ASGI) măsoară fiecare cerere HTTP: latență și dimensiunea răspunsului
+  ca histograme per rută (șablonul rutei, ex. /portfolios/{user_id}), cereri în curs și coduri de stare;
+- span("yfinance") / span("chain") / span("llm") ... măsoară porțiuni dintr-o cerere și le
+  atribuie rutei curente ("background" pentru task-urile din fundal);
+- comenzile Mongo sunt măsurate printr-un CommandListener pymongo (per comandă și rută, pentru
+  toți clienții), deci se vede și timpul petrecut în DB de fiecare rută.
+
+Task-urile din fundal se pornesc cu start_background_task: un task creat cu asyncio.create_task
+dintr-o cerere moștenește contextul ei și ar raporta la nesfârșit ruta care l-a pornit.
+
+Implementare proprie, minimală, ca să nu adăugăm o dependență doar pentru formatul de export.
+"""
+import asyncio
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Optional, Sequence, Tuple
+
+from pymongo import monitoring
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+SIZE_BUCKETS = (100, 1_000, 10_000, 100_000, 1_000_000, 10_000_000)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def header(self):
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, labels: Tuple[str, ...] = (), value: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + value
+
+    def render(self):
+        with self._lock:
+            items = list(self._values.items())
+        return self.header() + [
+            f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(v)}" for labels, v in items
+        ]
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, labels: Tuple[str, ...] = (), value: float = 1.0):
+        self.inc(labels, -value)
+
+    def set(self, labels: Tuple[str, ...] = (), value: float = 0.0):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [număr per bucket (necumulat)..., +Inf], sumă
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, labels: Tuple[str, ...], value: float):
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def render(self):
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+        lines = self.header()
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                bucket_labels = _format_labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+HTTP_REQUESTS = registry.register(Counter(
+    "http_requests_total", "HTTP requests by route and status code.", ("method", "route", "status")))
+HTTP_DURATION = registry.register(Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route.", ("method", "route")))
+HTTP_RESPONSE_SIZE = registry.register(Histogram(
+    "http_response_size_bytes", "HTTP response body size by route.", ("method", "route"), SIZE_BUCKETS))
+HTTP_IN_FLIGHT = registry.register(Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served."))
+SPAN_DURATION = registry.register(Histogram(
+    "app_span_duration_seconds", "Time spent in named sub-operations (yfinance, chain, llm...) by route.",
+    ("span", "route")))
+MONGO_DURATION = registry.register(Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command latency by route.", ("command", "outcome", "route")))
+
+_current_scope: ContextVar[Optional[dict]] = ContextVar("metrics_scope", default=None)
+
+
+def route_of(scope: dict) -> str:
+    # Șablonul rutei (nu path-ul concret), ca numărul de serii să rămână mic
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or getattr(route, "path", None) or "unmatched"
+
+
+def current_route() -> str:
+    scope = _current_scope.get()
+    return route_of(scope) if scope is not None else "background"
+
+
+def start_background_task(coro) -> asyncio.Task:
+    """asyncio.create_task într-un context gol: task-ul apare ca "background", nu ca ruta care l-a pornit."""
+    return contextvars.Context().run(asyncio.create_task, coro)
+
+
+@contextmanager
+def span(name: str):
+    """Măsoară blocul și îl atribuie rutei cererii curente. Merge și în cod sync, și în async."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        SPAN_DURATION.observe((name, current_route()), time.perf_counter() - start)
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+
+        token = _current_scope.set(scope)
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            _current_scope.reset(token)
+            labels = (scope["method"], route_of(scope))
+            HTTP_REQUESTS.inc(labels + (str(response["status"]),))
+            HTTP_DURATION.observe(labels, time.perf_counter() - start)
+            HTTP_RESPONSE_SIZE.observe(labels, response["size"])
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    # Motor rulează comenzile în thread-uri cu contextul apelantului copiat, deci ruta e vizibilă aici
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_DURATION.observe((event.command_name, "ok", current_route()), event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_DURATION.observe((event.command_name, "error", current_route()), event.duration_micros / 1e6)
+
+
+_mongo_listener_installed = False
+
+
+def install_mongo_metrics():
+    """Trebuie apelat înainte de crearea clienților Motor (listener-ele globale se aplică doar clienților noi)."""
+    global _mongo_listener_installed
+    if not _mongo_listener_installed:
+        monitoring.register(MongoCommandMetrics())
+        _mongo_listener_installed = True
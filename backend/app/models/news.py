@@ -0,0 +1,41 @@
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from typing import List, Optional
+import pymongo
+
+
+class NewsArticle(Document):
+    """Știre normalizată cu process_yfinance_news, scrisă de ingester-ul de știri."""
+    news_id: str
+    title: Optional[str] = None
+    publisher: Optional[str] = None
+    link: Optional[str] = None
+    providerPublishTime: Optional[int] = None
+    type: Optional[str] = None
+    relatedTickers: List[str] = Field(default_factory=list)
+    thumbnail: Optional[dict] = None
+    ingested_at: datetime = Field(default_factory=datetime.utcnow)
+
+    class Settings:
+        name = "news"
+        indexes = [
+            pymongo.IndexModel([("news_id", pymongo.ASCENDING)], unique=True),
+            [("providerPublishTime", pymongo.DESCENDING)],
+            [("relatedTickers", pymongo.ASCENDING), ("providerPublishTime", pymongo.DESCENDING)],
+        ]
+
+    def to_api(self) -> dict:
+        """Forma așteptată de frontend (aceeași ca NewsItem)."""
+        item = {
+            "id": self.news_id,
+            "title": self.title,
+            "publisher": self.publisher,
+            "link": self.link,
+            "providerPublishTime": self.providerPublishTime,
+            "type": self.type,
+            "relatedTickers": self.relatedTickers,
+        }
+        if self.thumbnail:
+            item["thumbnail"] = self.thumbnail
+        return item
\ No newline at end of file
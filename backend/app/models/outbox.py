@@ -0,0 +1,24 @@
+from beanie import Document
+from pydantic import Field
+from datetime import datetime
+from typing import Any, Dict, Optional
+import pymongo
+
+
+class OutboxEvent(Document):
+    """Efect secundar al unei scrieri (ex. înregistrare on-chain), procesat asincron de outbox worker."""
+    event_type: str            # register_trade / check_achievements / portfolio_changed
+    payload: Dict[str, Any] = Field(default_factory=dict)
+    status: str = "pending"    # pending / processing / done / failed
+    attempts: int = 0
+    next_attempt_at: datetime = Field(default_factory=datetime.utcnow)
+    locked_until: Optional[datetime] = None
+    last_error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    processed_at: Optional[datetime] = None
+
+    class Settings:
+        name = "outbox"
+        indexes = [
+            [("status", pymongo.ASCENDING), ("next_attempt_at", pymongo.ASCENDING)],
+        ]
\ No newline at end of file
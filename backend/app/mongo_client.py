@@ -0,0 +1,125 @@
+"""
+Clientul Motor partajat de toată aplicația.
+
+Ambele baze de date (wallstreet_sim și wallstreet) folosesc același AsyncIOMotorClient, deci
+același pool de conexiuni. Setările vin din variabile de mediu; la pornire pool-ul este
+"încălzit" cu MONGO_MIN_POOL_SIZE conexiuni, ca primele cereri să nu plătească handshake-ul.
+Starea pool-ului apare în /metrics (mongodb_pool_*).
+"""
+import asyncio
+import os
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from metrics import Counter, Gauge, Histogram, registry
+
+MONGO_URI = os.getenv("MONGO_URI", "mongodb://localhost:27017")
+MONGO_MAIN_DB = os.getenv("MONGO_MAIN_DB", "wallstreet_sim")
+MONGO_STOCKS_DB = os.getenv("MONGO_STOCKS_DB", "wallstreet")
+MONGO_MAX_POOL_SIZE = int(os.getenv("MONGO_MAX_POOL_SIZE", "50"))
+MONGO_MIN_POOL_SIZE = int(os.getenv("MONGO_MIN_POOL_SIZE", "5"))
+MONGO_MAX_IDLE_MS = int(os.getenv("MONGO_MAX_IDLE_MS", "300000"))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGO_SERVER_SELECTION_TIMEOUT_MS", "5000"))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv("MONGO_CONNECT_TIMEOUT_MS", "5000"))
+MONGO_SOCKET_TIMEOUT_MS = int(os.getenv("MONGO_SOCKET_TIMEOUT_MS", "30000"))
+MONGO_READ_PREFERENCE = os.getenv("MONGO_READ_PREFERENCE", "primary")
+# ex. "zstd,snappy,zlib"; gol = fără compresie (zstd/snappy cer pachetele lor)
+MONGO_COMPRESSORS = os.getenv("MONGO_COMPRESSORS", "")
+
+POOL_CONNECTIONS = registry.register(Gauge(
+    "mongodb_pool_connections", "Open connections in the MongoDB pool.", ("address",)))
+POOL_CHECKED_OUT = registry.register(Gauge(
+    "mongodb_pool_checked_out", "MongoDB connections currently checked out.", ("address",)))
+POOL_CHECKOUT_FAILURES = registry.register(Counter(
+    "mongodb_pool_checkout_failures_total", "Failed MongoDB connection checkouts.", ("address", "reason")))
+POOL_CHECKOUT_WAIT = registry.register(Histogram(
+    "mongodb_pool_checkout_wait_seconds", "Time spent waiting for a pooled MongoDB connection.", ("address",)))
+
+
+def _address(event) -> str:
+    host, port = event.address
+    return f"{host}:{port}"
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        POOL_CONNECTIONS.inc((_address(event),))
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        POOL_CONNECTIONS.dec((_address(event),))
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        POOL_CHECKOUT_FAILURES.inc((_address(event), str(event.reason)))
+
+    def connection_checked_out(self, event):
+        POOL_CHECKED_OUT.inc((_address(event),))
+        # durata așteptării e raportată doar de pymongo >= 4.7
+        duration = getattr(event, "duration", None)
+        if duration is not None:
+            POOL_CHECKOUT_WAIT.observe((_address(event),), duration)
+
+    def connection_checked_in(self, event):
+        POOL_CHECKED_OUT.dec((_address(event),))
+
+
+_client: Optional[AsyncIOMotorClient] = None
+
+
+def get_motor_client() -> AsyncIOMotorClient:
+    global _client
+    if _client is None:
+        options = {
+            "maxPoolSize": MONGO_MAX_POOL_SIZE,
+            "minPoolSize": MONGO_MIN_POOL_SIZE,
+            "maxIdleTimeMS": MONGO_MAX_IDLE_MS,
+            "serverSelectionTimeoutMS": MONGO_SERVER_SELECTION_TIMEOUT_MS,
+            "connectTimeoutMS": MONGO_CONNECT_TIMEOUT_MS,
+            "socketTimeoutMS": MONGO_SOCKET_TIMEOUT_MS,
+            "readPreference": MONGO_READ_PREFERENCE,
+            "event_listeners": [PoolMetricsListener()],
+        }
+        if MONGO_COMPRESSORS:
+            options["compressors"] = MONGO_COMPRESSORS
+        _client = AsyncIOMotorClient(MONGO_URI, **options)
+    return _client
+
+
+def get_main_db():
+    return get_motor_client()[MONGO_MAIN_DB]
+
+
+def get_stocks_db():
+    return get_motor_client()[MONGO_STOCKS_DB]
+
+
+async def warm_pool(connections: int = MONGO_MIN_POOL_SIZE):
+    """Deschide `connections` conexiuni de la început: ping-uri concurente forțează pool-ul să crească."""
+    client = get_motor_client()
+    await asyncio.gather(*(client.admin.command("ping") for _ in range(max(1, connections))))
+
+
+def close_motor_client():
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
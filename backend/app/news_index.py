@@ -0,0 +1,181 @@
+"""
+Index inversat în memorie: ticker -> știri recente, cu știrile aproape identice comasate.
+
+Aceeași știre sindicalizată apare în yfinance sub id-uri diferite. Pentru fiecare titlu
+calculăm un SimHash pe 64 de biți; două titluri la distanță Hamming <= SIMHASH_MAX_DISTANCE
+sunt tratate ca aceeași știre și doar prima (canonică) este servită.
+Indexul este construit din colecția "news" la pornire și actualizat după fiecare ingestie.
+Păstrează cel mult MAX_INDEXED_NEWS știri, nu mai vechi de MAX_NEWS_AGE_DAYS; cele mai vechi
+sunt scoase din toate structurile (postări, amprente, benzi, duplicate).
+"""
+import hashlib
+import re
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from models.news import NewsArticle
+
+SIMHASH_BITS = 64
+SIMHASH_MAX_DISTANCE = 3
+# 4 benzi de 16 biți: două hash-uri la distanță <= 3 au sigur o bandă identică
+SIMHASH_BANDS = 4
+MAX_NEWS_PER_TICKER = 200
+STORE_LOAD_LIMIT = 5000
+MAX_INDEXED_NEWS = 20000
+MAX_NEWS_AGE_DAYS = 30
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {"a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "is", "are", "at", "by", "with", "as"}
+
+
+def normalize_title(title: str) -> List[str]:
+    return [w for w in _WORD_RE.findall((title or "").lower()) if w not in _STOPWORDS]
+
+
+def simhash(tokens: List[str]) -> int:
+    if not tokens:
+        return 0
+    # cuvinte + perechi de cuvinte, ca ordinea să conteze puțin
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = int.from_bytes(hashlib.md5(feature.encode()).digest()[:8], "big")
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(SIMHASH_BITS) if weights[bit] > 0)
+
+
+def _bands(fingerprint: int) -> List[Tuple[int, int]]:
+    width = SIMHASH_BITS // SIMHASH_BANDS
+    mask = (1 << width) - 1
+    return [(i, fingerprint >> (i * width) & mask) for i in range(SIMHASH_BANDS)]
+
+
+class NewsIndex:
+    def __init__(self, max_per_ticker: int = MAX_NEWS_PER_TICKER, max_articles: int = MAX_INDEXED_NEWS,
+                 max_age_days: float = MAX_NEWS_AGE_DAYS):
+        self.max_per_ticker = max_per_ticker
+        self.max_articles = max_articles
+        self.max_age_seconds = max_age_days * 86400
+        self._articles: Dict[str, dict] = {}
+        # (publish_time, news_id) sortat: cele mai vechi primele, pentru evacuare
+        self._by_age: List[Tuple[int, str]] = []
+        # ticker -> listă (-publish_time, news_id) sortată: cele mai noi primele
+        self._by_ticker: Dict[str, List[Tuple[int, str]]] = {}
+        # id duplicat -> id canonic, și invers
+        self._canonical: Dict[str, str] = {}
+        self._duplicates: Dict[str, List[str]] = {}
+        self._fingerprints: Dict[str, int] = {}
+        self._band_buckets: Dict[Tuple[int, int], List[str]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._articles)
+
+    def _find_duplicate(self, fingerprint: int) -> Optional[str]:
+        for band in _bands(fingerprint):
+            for candidate in self._band_buckets.get(band, ()):
+                if bin(fingerprint ^ self._fingerprints[candidate]).count("1") <= SIMHASH_MAX_DISTANCE:
+                    return candidate
+        return None
+
+    def _post(self, ticker: str, publish_time: int, news_id: str):
+        postings = self._by_ticker.setdefault(ticker.upper(), [])
+        entry = (-publish_time, news_id)
+        if entry in postings:
+            return
+        insort(postings, entry)
+        if len(postings) > self.max_per_ticker:
+            postings.pop()
+
+    def add(self, items: Iterable[dict]):
+        """Adaugă știri în forma returnată de API (id, title, relatedTickers, providerPublishTime...)."""
+        with self._lock:
+            for item in items:
+                news_id = item.get("id")
+                if not news_id or news_id in self._articles or news_id in self._canonical:
+                    continue
+                publish_time = int(item.get("providerPublishTime") or 0)
+                fingerprint = simhash(normalize_title(item.get("title")))
+                canonical = self._find_duplicate(fingerprint) if fingerprint else None
+
+                if canonical:
+                    # Duplicat: tickerele lui trimit spre știrea canonică
+                    self._canonical[news_id] = canonical
+                    self._duplicates.setdefault(canonical, []).append(news_id)
+                    target = self._articles[canonical]
+                    for ticker in item.get("relatedTickers") or []:
+                        if ticker not in target["relatedTickers"]:
+                            target["relatedTickers"].append(ticker)
+                        self._post(ticker, int(target.get("providerPublishTime") or 0), canonical)
+                    continue
+
+                self._articles[news_id] = {**item, "relatedTickers": list(item.get("relatedTickers") or [])}
+                insort(self._by_age, (publish_time, news_id))
+                if fingerprint:
+                    self._fingerprints[news_id] = fingerprint
+                    for band in _bands(fingerprint):
+                        self._band_buckets.setdefault(band, []).append(news_id)
+                for ticker in item.get("relatedTickers") or []:
+                    self._post(ticker, publish_time, news_id)
+            self._evict()
+
+    def _evict(self):
+        cutoff = time.time() - self.max_age_seconds
+        while self._by_age and (len(self._by_age) > self.max_articles or self._by_age[0][0] < cutoff):
+            _, news_id = self._by_age.pop(0)
+            self._remove(news_id)
+
+    def _remove(self, news_id: str):
+        article = self._articles.pop(news_id)
+        entry = (-int(article.get("providerPublishTime") or 0), news_id)
+        for ticker in article["relatedTickers"]:
+            postings = self._by_ticker.get(ticker.upper())
+            if not postings:
+                continue
+            i = bisect_left(postings, entry)
+            if i < len(postings) and postings[i] == entry:
+                postings.pop(i)
+            if not postings:
+                del self._by_ticker[ticker.upper()]
+        fingerprint = self._fingerprints.pop(news_id, None)
+        if fingerprint:
+            for band in _bands(fingerprint):
+                bucket = self._band_buckets.get(band)
+                if bucket and news_id in bucket:
+                    bucket.remove(news_id)
+                    if not bucket:
+                        del self._band_buckets[band]
+        for duplicate in self._duplicates.pop(news_id, ()):
+            self._canonical.pop(duplicate, None)
+
+    def is_duplicate(self, news_id: str) -> bool:
+        return news_id in self._canonical
+
+    def query(self, tickers: Iterable[str], offset: int = 0, limit: int = 20) -> List[dict]:
+        """Știrile pentru unul sau mai multe tickere, cele mai noi primele, fără duplicate."""
+        merged = set()
+        for ticker in tickers:
+            merged.update(self._by_ticker.get(ticker.upper(), ()))
+        ordered = sorted(merged)
+        seen = set()
+        page = []
+        for _, news_id in ordered:
+            if news_id in seen:
+                continue
+            seen.add(news_id)
+            page.append(news_id)
+        return [self._articles[news_id] for news_id in page[offset:offset + limit]]
+
+    async def load_from_store(self, limit: int = STORE_LOAD_LIMIT):
+        articles = await NewsArticle.find_all().sort(-NewsArticle.providerPublishTime).limit(limit).to_list()
+        # în ordine cronologică: prima apariție a unei știri rămâne canonică
+        self.add(article.to_api() for article in reversed(articles))
+
+    async def on_ingest(self, items: List[dict]):
+        self.add(sorted(items, key=lambda i: i.get("providerPublishTime") or 0))
+
+
+news_index = NewsIndex()
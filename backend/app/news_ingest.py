@@ -0,0 +1,172 @@
+"""
+Ingestie de știri în fundal.
+
+La fiecare NEWS_REFRESH_INTERVAL secunde tickerele configurate plus cele din portofoliile
+userilor sunt interogate concurent în yfinance, știrile sunt normalizate o singură dată cu
+process_yfinance_news și salvate (upsert după id) în colecția "news". Endpoint-urile /news
+citesc doar din această colecție / din news_index, fără apeluri yfinance în timpul cererii.
+Un ticker cerut explicit care nu e urmărit (request_ticker) intră în rundele următoare, dacă
+există în colecția "stocks".
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+
+from lazy_import import lazy_module
+from metrics import span, start_background_task
+from models.news import NewsArticle
+from models.portfolio import Portfolio
+from models.stock import Stock
+from routers.news import process_yfinance_news
+
+logger = logging.getLogger(__name__)
+yf = lazy_module("yfinance")
+
+NEWS_TICKERS = [
+    "^GSPC", "^DJI", "^IXIC",  # Indici pentru știri generale
+    "SPY", "QQQ", "DIA",       # ETF-uri pentru indici
+    "AAPL", "MSFT", "GOOG", "AMZN", "TSLA", "META", "NVDA", "JPM",
+    "GE", "BAC", "F", "AMD", "INTC", "WFC", "PFE", "DIS", "XOM", "WMT"
+]
+NEWS_REFRESH_INTERVAL = float(os.getenv("NEWS_REFRESH_INTERVAL", "300"))
+NEWS_FETCH_CONCURRENCY = int(os.getenv("NEWS_FETCH_CONCURRENCY", "8"))
+# plafon pentru tickerele din portofolii adăugate la fiecare rundă
+NEWS_MAX_TICKERS = int(os.getenv("NEWS_MAX_TICKERS", "300"))
+# cât timp rămâne urmărit un ticker cerut explicit (request_ticker)
+NEWS_REQUESTED_TTL = float(os.getenv("NEWS_REQUESTED_TTL", "86400"))
+
+
+def _ticker_symbol(ticker) -> str:
+    # yfinance întoarce uneori tickerele ca dict-uri ({"symbol": ...})
+    if isinstance(ticker, dict):
+        return str(ticker.get("symbol", ""))
+    return str(ticker)
+
+
+def _fetch_news_sync(ticker: str) -> list:
+    return yf.Ticker(ticker).news or []
+
+
+class NewsIngester:
+    def __init__(self, tickers: List[str] = NEWS_TICKERS, interval: float = NEWS_REFRESH_INTERVAL,
+                 concurrency: int = NEWS_FETCH_CONCURRENCY):
+        self.tickers = tickers
+        self.interval = interval
+        self.concurrency = concurrency
+        self._task: Optional[asyncio.Task] = None
+        # apelate după fiecare ingestie cu lista de știri scrise (ex. indexul pe tickere)
+        self.listeners = []
+        self.last_run = None
+        # tickerele rundei periodice curente
+        self._tracked = set(t.upper() for t in tickers)
+        # ticker cerut explicit -> ultima cerere (time.monotonic); intră în runda următoare
+        self._requested: Dict[str, float] = {}
+
+    def start(self):
+        if self._task is None:
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _fetch(self, ticker: str, semaphore: asyncio.Semaphore) -> list:
+        async with semaphore:
+            try:
+                loop = asyncio.get_running_loop()
+                with span("yfinance"):
+                    raw = await loop.run_in_executor(None, _fetch_news_sync, ticker)
+                news = process_yfinance_news(raw)
+            except Exception as e:
+                logger.warning(f"Error fetching news for {ticker}: {e}")
+                return []
+        # Tickerul pentru care a venit știrea e și el "related", chiar dacă yfinance nu îl listează
+        for item in news:
+            tickers = [_ticker_symbol(t) for t in (item.get("relatedTickers") or [])]
+            if ticker not in tickers:
+                tickers.append(ticker)
+            item["relatedTickers"] = [t for t in tickers if t]
+        return news
+
+    async def tracked_tickers(self) -> List[str]:
+        """Tickerele configurate + cele deținute în portofolii + cele cerute explicit (fără duplicate, plafonat)."""
+        held = await Portfolio.get_motor_collection().distinct("holdings.symbol")
+        now = time.monotonic()
+        self._requested = {t: at for t, at in self._requested.items() if now - at < NEWS_REQUESTED_TTL}
+        tickers = list(dict.fromkeys([*self.tickers, *(s.upper() for s in held if s), *self._requested]))
+        return tickers[:NEWS_MAX_TICKERS]
+
+    async def request_ticker(self, ticker: str) -> bool:
+        """
+        Cere urmărirea unui ticker de la runda următoare (nu îl aduce acum). Sunt acceptate doar
+        simbolurile din colecția "stocks"; întoarce False pentru celelalte.
+        """
+        ticker = ticker.upper()
+        if ticker in self._tracked:
+            return True
+        if ticker not in self._requested:
+            if len(self._requested) >= NEWS_MAX_TICKERS or await Stock.find_one(Stock.symbol == ticker) is None:
+                return False
+        self._requested[ticker] = time.monotonic()
+        return True
+
+    async def ingest_once(self) -> int:
+        start = time.perf_counter()
+        tickers = await self.tracked_tickers()
+        self._tracked = set(tickers)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._fetch(t, semaphore) for t in tickers))
+
+        # Aceeași știre apare la mai multe tickere; o scriem o singură dată
+        items = {}
+        for news in results:
+            for item in news:
+                if not item.get("id"):
+                    continue
+                if item["id"] in items:
+                    merged = items[item["id"]]["relatedTickers"]
+                    merged.extend(t for t in item["relatedTickers"] if t not in merged)
+                else:
+                    items[item["id"]] = item
+        if not items:
+            return 0
+
+        now = datetime.utcnow()
+        operations = []
+        for news_id, item in items.items():
+            doc = {k: v for k, v in item.items() if k != "id"}
+            operations.append(UpdateOne(
+                {"news_id": news_id},
+                {"$set": doc, "$setOnInsert": {"news_id": news_id, "ingested_at": now}},
+                upsert=True,
+            ))
+        await NewsArticle.get_motor_collection().bulk_write(operations, ordered=False)
+
+        self.last_run = {
+            "at": now.isoformat(),
+            "tickers": len(tickers),
+            "items": len(items),
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+        logger.info(f"News ingest: {self.last_run}")
+        for listener in self.listeners:
+            await listener(list(items.values()))
+        return len(items)
+
+    async def _run(self):
+        while True:
+            try:
+                await self.ingest_once()
+            except Exception as e:
+                logger.error(f"News ingest failed: {e}")
+            await asyncio.sleep(self.interval)
+
+
+news_ingester = NewsIngester()
@@ -0,0 +1,221 @@
+"""
+Outbox tranzacțional pentru efectele secundare ale trade-urilor.
+
+create_trade scrie trade-ul, portofoliul și evenimentele din outbox în aceeași tranzacție Mongo
+(sau secvențial, dacă serverul nu e replica set) și răspunde imediat. Worker-ul de aici
+preia evenimentele din colecția "outbox" și le execută cu retry și backoff exponențial.
+
+Evenimentele aceluiași user (payload["user_id"]) rulează în ordinea în care au fost scrise,
+unul după altul; cele ale userilor diferiți rulează concurent.
+"""
+import asyncio
+import logging
+import random
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import ReturnDocument
+
+from beanie.operators import Set
+
+from blockchain.utils import get_trade_batcher, is_tx_known
+from metrics import start_background_task
+from models.outbox import OutboxEvent
+from models.trade import Trade
+from achievements_engine import evaluate_user
+
+logger = logging.getLogger(__name__)
+
+POLL_INTERVAL = 1.0       # secunde între verificări când outbox-ul e gol
+CLAIM_BATCH = 100         # câte evenimente preia worker-ul o dată
+LEASE_SECONDS = 60        # după cât timp un eveniment "processing" poate fi reluat
+MAX_ATTEMPTS = 8
+BACKOFF_BASE = 1.0
+BACKOFF_MAX = 300.0
+
+_handlers: Dict[str, Callable[[dict], Awaitable[None]]] = {}
+_transactions_supported: Optional[bool] = None
+
+
+def outbox_handler(event_type: str):
+    """Decorator care înregistrează handler-ul pentru un tip de eveniment."""
+    def decorator(fn):
+        _handlers[event_type] = fn
+        return fn
+    return decorator
+
+
+# Hook-uri apelate când se schimbă portofoliul unui user (cache-uri per user le înregistrează aici)
+user_invalidation_hooks: List[Callable[[str], Awaitable[None]]] = []
+
+
+async def supports_transactions() -> bool:
+    """Tranzacțiile multi-document merg doar pe replica set / mongos; un mongod standalone nu le suportă."""
+    global _transactions_supported
+    if _transactions_supported is None:
+        try:
+            hello = await OutboxEvent.get_motor_collection().database.command("hello")
+            _transactions_supported = "setName" in hello or hello.get("msg") == "isdbgrid"
+        except Exception:
+            _transactions_supported = False
+    return _transactions_supported
+
+
+@asynccontextmanager
+async def outbox_transaction():
+    """
+    Returnează o sesiune cu tranzacție pornită dacă serverul le suportă, altfel None.
+    Scrierile făcute cu session=... în interior sunt atomice împreună cu evenimentele din outbox.
+    """
+    if not await supports_transactions():
+        yield None
+        return
+    client = OutboxEvent.get_motor_collection().database.client
+    async with await client.start_session() as session:
+        async with session.start_transaction():
+            yield session
+
+
+def backoff_delay(attempts: int) -> float:
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * (2 ** (attempts - 1)))
+    return delay * random.uniform(0.5, 1.0)
+
+
+class OutboxWorker:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self.stats = {"processed": 0, "retried": 0, "failed": 0}
+
+    def start(self):
+        if self._task is None:
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def notify(self):
+        """Trezește worker-ul imediat după o scriere nouă, fără să aștepte următorul poll."""
+        self._wakeup.set()
+
+    async def _claim(self) -> Optional[OutboxEvent]:
+        now = datetime.utcnow()
+        collection = OutboxEvent.get_motor_collection()
+        doc = await collection.find_one_and_update(
+            {
+                "$or": [
+                    {"status": "pending", "next_attempt_at": {"$lte": now}},
+                    {"status": "processing", "locked_until": {"$lte": now}},
+                ]
+            },
+            {"$set": {"status": "processing", "locked_until": now + timedelta(seconds=LEASE_SECONDS)}},
+            sort=[("next_attempt_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+        return OutboxEvent.model_validate(doc) if doc else None
+
+    async def _process(self, event: OutboxEvent):
+        collection = OutboxEvent.get_motor_collection()
+        handler = _handlers.get(event.event_type)
+        try:
+            if handler is None:
+                raise ValueError(f"No outbox handler for {event.event_type}")
+            await handler(event.payload)
+        except Exception as e:
+            attempts = event.attempts + 1
+            if attempts >= MAX_ATTEMPTS:
+                self.stats["failed"] += 1
+                logger.error(f"Outbox event {event.id} ({event.event_type}) failed permanently: {e}")
+                update = {"status": "failed", "attempts": attempts, "last_error": str(e), "locked_until": None}
+            else:
+                self.stats["retried"] += 1
+                logger.warning(f"Outbox event {event.id} ({event.event_type}) failed, retrying: {e}")
+                update = {
+                    "status": "pending",
+                    "attempts": attempts,
+                    "last_error": str(e),
+                    "locked_until": None,
+                    "next_attempt_at": datetime.utcnow() + timedelta(seconds=backoff_delay(attempts)),
+                }
+            await collection.update_one({"_id": event.id}, {"$set": update})
+            return
+
+        self.stats["processed"] += 1
+        await collection.update_one(
+            {"_id": event.id},
+            {"$set": {"status": "done", "processed_at": datetime.utcnow(), "locked_until": None}},
+        )
+
+    async def drain_once(self) -> int:
+        events = []
+        while len(events) < CLAIM_BATCH:
+            event = await self._claim()
+            if event is None:
+                break
+            events.append(event)
+        # Userii diferiți rulează concurent, ca trade-urile lor să ajungă în același batch on-chain;
+        # evenimentele unui user rulează în ordine, altfel două trade-uri ar evalua achievements simultan
+        groups: Dict[str, List[OutboxEvent]] = {}
+        for event in sorted(events, key=lambda e: e.id):
+            key = str(event.payload.get("user_id") or event.id)
+            groups.setdefault(key, []).append(event)
+        await asyncio.gather(*(self._process_in_order(group) for group in groups.values()))
+        return len(events)
+
+    async def _process_in_order(self, events: List[OutboxEvent]):
+        for event in events:
+            await self._process(event)
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            try:
+                processed = await self.drain_once()
+            except Exception as e:
+                logger.error(f"Outbox worker error: {e}")
+                processed = 0
+            if processed == 0:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+
+
+outbox_worker = OutboxWorker()
+
+
+# === Handlers ===
+@outbox_handler("register_trade")
+async def handle_register_trade(payload: dict):
+    # La un retry, trade-ul poate fi deja trimis (hash-ul se scrie înainte de send_raw_transaction)
+    trade = await Trade.get(ObjectId(payload["trade_id"]))
+    if trade is not None and trade.blockchain_tx:
+        if await is_tx_known(trade.blockchain_tx):
+            return
+        await trade.update(Set({Trade.blockchain_tx: None}))
+    # Evenimentul e marcat "done" abia după ce batch-ul din care face parte a fost trimis
+    await get_trade_batcher().add({
+        **payload,
+        "trade_id": ObjectId(payload["trade_id"]),
+        "user_id": ObjectId(payload["user_id"]),
+    })
+
+
+@outbox_handler("check_achievements")
+async def handle_check_achievements(payload: dict):
+    # Toate regulile din ACHIEVEMENT_RULES, cu aceleași interogări ca sweep-ul complet
+    await evaluate_user(payload["user_id"])
+
+
+@outbox_handler("portfolio_changed")
+# numele vechi, pentru evenimentele scrise înainte de redenumire și încă neprocesate
+@outbox_handler("invalidate_recommendations")
+async def handle_portfolio_changed(payload: dict):
+    # Reconstruiește cache-urile per user (ex. snapshot-ul de portofoliu al chatbot-ului)
+    for hook in user_invalidation_hooks:
+        await hook(payload["user_id"])
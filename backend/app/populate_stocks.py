@@ -1,42 +1,174 @@
+"""
+Populează / reîmprospătează colecția "stocks" (universul de acțiuni) din yfinance.
+
+Metadatele (nume, sector, capitalizare, preț) sunt cerute concurent, cu cel mult --concurrency
+cereri yfinance în paralel și --retries reîncercări cu backoff per simbol. Toate scrierile se fac
+la final printr-un singur bulk_write neordonat de upsert-uri după simbol. Simbolurile pentru care
+yfinance nu răspunde nu sunt atinse (datele existente rămân).
+
+Lista de simboluri vine implicit din tabelul S&P 500 de pe Wikipedia; cu --symbols se citește
+dintr-un fișier local: CSV (coloana Symbol/symbol sau un simbol pe linie) ori JSON (listă de
+simboluri sau de obiecte cu "symbol").
+
+    cd backend/app
+    python populate_stocks.py
+    python populate_stocks.py --symbols sp500.csv --concurrency 32
+"""
+import argparse
 import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
-from beanie import init_beanie
+import csv
+import json
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from pymongo import UpdateOne
+
+from db_stocks import init_stock_db
+from lazy_import import lazy_module
 from models.stock import Stock
-import yfinance as yf
-import pandas as pd
+from mongo_client import close_motor_client
+
+yf = lazy_module("yfinance")
+pd = lazy_module("pandas")
 
-# Poți folosi un fișier CSV cu simboluri sau un set cunoscut
-def get_sp500_symbols():
-    url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    table = pd.read_html(url)[0]
+SP500_URL = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
+STOCK_INGEST_CONCURRENCY = int(os.getenv("STOCK_INGEST_CONCURRENCY", "16"))
+STOCK_INGEST_RETRIES = int(os.getenv("STOCK_INGEST_RETRIES", "3"))
+STOCK_INGEST_BACKOFF = float(os.getenv("STOCK_INGEST_BACKOFF", "0.5"))
+
+
+def get_sp500_symbols() -> List[str]:
+    table = pd.read_html(SP500_URL)[0]
     return table["Symbol"].tolist()
 
-async def populate():
-    client = AsyncIOMotorClient("mongodb://localhost:27017")
-    await init_beanie(database=client.wallstreet, document_models=[Stock])
 
-    symbols = get_sp500_symbols()
+def load_symbols(path: str) -> List[str]:
+    """Simboluri dintr-un fișier CSV sau JSON local, fără duplicate, în ordinea din fișier."""
+    with open(path, newline="") as f:
+        if path.lower().endswith(".json"):
+            data = json.load(f)
+            symbols = [item["symbol"] if isinstance(item, dict) else item for item in data]
+        else:
+            rows = [row for row in csv.reader(f) if row and row[0].strip()]
+            # antet opțional: coloana Symbol/symbol, altfel prima coloană
+            header = [h.strip().lower() for h in rows[0]] if rows else []
+            if "symbol" in header:
+                column = header.index("symbol")
+                rows = rows[1:]
+            else:
+                column = 0
+            symbols = [row[column] for row in rows if len(row) > column]
+    return list(dict.fromkeys(s.strip().upper() for s in symbols if s and s.strip()))
+
+
+def _fetch_info_sync(symbol: str) -> dict:
+    # Wikipedia scrie "BRK.B", yfinance așteaptă "BRK-B"
+    return yf.Ticker(symbol.replace(".", "-")).info or {}
+
 
-    for symbol in symbols:
+def stock_fields(symbol: str, info: dict) -> dict:
+    return {
+        "symbol": symbol,
+        "name": info.get("shortName") or symbol,
+        "sector": info.get("sector") or "Unknown",
+        "market_cap": float(info.get("marketCap") or 0),
+        "last_price": float(info.get("regularMarketPrice") or info.get("currentPrice") or 0),
+    }
+
+
+class StockIngest:
+    def __init__(self, concurrency: int = STOCK_INGEST_CONCURRENCY, retries: int = STOCK_INGEST_RETRIES,
+                 progress_every: int = 25):
+        self.concurrency = concurrency
+        self.retries = max(1, retries)
+        self.progress_every = progress_every
+        self.failed = {}
+        self._done = 0
+        self._total = 0
+        self._start = 0.0
+
+    def _progress(self):
+        self._done += 1
+        if self._done % self.progress_every == 0 or self._done == self._total:
+            elapsed = time.perf_counter() - self._start
+            print(f"[{self._done}/{self._total}] {self._done - len(self.failed)} ok, {len(self.failed)} failed, "
+                  f"{self._done / elapsed:.1f} symbols/s", flush=True)
+
+    async def _fetch(self, symbol: str, semaphore: asyncio.Semaphore, executor) -> Optional[dict]:
+        loop = asyncio.get_running_loop()
+        async with semaphore:
+            for attempt in range(1, self.retries + 1):
+                try:
+                    info = await loop.run_in_executor(executor, _fetch_info_sync, symbol)
+                    if info:
+                        return stock_fields(symbol, info)
+                    error = "empty info"
+                except Exception as e:
+                    error = f"{type(e).__name__}: {e}"
+                if attempt < self.retries:
+                    await asyncio.sleep(STOCK_INGEST_BACKOFF * 2 ** (attempt - 1) * random.uniform(0.5, 1.0))
+        self.failed[symbol] = error
+        return None
+
+    async def _fetch_tracked(self, symbol: str, semaphore: asyncio.Semaphore, executor) -> Optional[dict]:
         try:
-            ticker = yf.Ticker(symbol)
-            info = ticker.info
-
-            stock = Stock(
-                symbol=symbol,
-                name=info.get("shortName", symbol),
-                sector=info.get("sector", "Unknown"),
-                market_cap=info.get("marketCap", 0),
-                last_price=info.get("regularMarketPrice", 0),
-            )
-            existing = await Stock.find_one(Stock.symbol == symbol)
-            if existing:
-                await existing.set(stock.dict(exclude={"id"}))
-            else:
-                await stock.insert()
+            return await self._fetch(symbol, semaphore, executor)
+        finally:
+            self._progress()
+
+    async def run(self, symbols: List[str]) -> dict:
+        self._total = len(symbols)
+        self._start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        # yfinance e sincron; un pool propriu, ca paralelismul să nu fie limitat de executorul implicit
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            results = await asyncio.gather(*(self._fetch_tracked(s, semaphore, executor) for s in symbols))
+        fetch_seconds = time.perf_counter() - self._start
+
+        operations = [UpdateOne({"symbol": doc["symbol"]}, {"$set": doc}, upsert=True) for doc in results if doc]
+        upserted = modified = 0
+        if operations:
+            result = await Stock.get_motor_collection().bulk_write(operations, ordered=False)
+            upserted, modified = result.upserted_count, result.modified_count
+        return {
+            "symbols": len(symbols),
+            "fetched": len(operations),
+            "failed": self.failed,
+            "inserted": upserted,
+            "updated": modified,
+            "fetch_seconds": round(fetch_seconds, 2),
+            "seconds": round(time.perf_counter() - self._start, 2),
+        }
+
+
+async def populate(args):
+    symbols = load_symbols(args.symbols) if args.symbols else get_sp500_symbols()
+    if args.limit:
+        symbols = symbols[:args.limit]
+    await init_stock_db()
+    try:
+        report = await StockIngest(args.concurrency, args.retries, args.progress_every).run(symbols)
+    finally:
+        close_motor_client()
+    for symbol, error in report["failed"].items():
+        print(f"⚠️ Failed to fetch {symbol}: {error}")
+    print(f"✅ {report['fetched']}/{report['symbols']} stocks saved ({report['inserted']} new, "
+          f"{report['updated']} updated) in {report['seconds']}s")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--symbols", help="fișier CSV/JSON cu simboluri (implicit S&P 500 de pe Wikipedia)")
+    parser.add_argument("--concurrency", type=int, default=STOCK_INGEST_CONCURRENCY)
+    parser.add_argument("--retries", type=int, default=STOCK_INGEST_RETRIES)
+    parser.add_argument("--limit", type=int, help="doar primele N simboluri")
+    parser.add_argument("--progress-every", type=int, default=25)
+    asyncio.run(populate(parser.parse_args()))
 
-            print(f"✅ {symbol} added.")
-        except Exception as e:
-            print(f"⚠️ Failed to fetch {symbol}: {e}")
 
-asyncio.run(populate())
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,217 @@
+"""
+Rezumatul portofoliului folosit de chatbot, precalculat per user.
+
+Snapshot-ul conține pozițiile cu ultimul preț, valoarea, P&L-ul, totalurile și ponderile pe
+sectoare, plus textul deja formatat pentru prompt. Chatbot-ul îl citește din memorie (O(1));
+snapshot-ul este reconstruit după un trade (hook în outbox.user_invalidation_hooks), când
+GET /portfolios/{user_id} aduce prețuri noi și periodic, din prețurile colecției "stocks".
+Textul nu conține momentul evaluării, deci cache-ul de răspunsuri al chatbot-ului (cheiat pe
+text) se invalidează doar când se schimbă efectiv pozițiile, cash-ul sau prețurile. Și lipsa
+unui portofoliu e ținută în memorie, ca userii fără portofoliu să nu atingă DB-ul la fiecare mesaj.
+"""
+import asyncio
+import logging
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from beanie.operators import In
+from bson import ObjectId
+
+from metrics import start_background_task
+from models.portfolio import Portfolio
+from models.stock import Stock
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAX_USERS = int(os.getenv("PORTFOLIO_SNAPSHOT_MAX_USERS", "10000"))
+QUOTE_REFRESH_INTERVAL = float(os.getenv("PORTFOLIO_SNAPSHOT_REFRESH", "300"))
+
+
+def render_snapshot(snapshot: dict) -> str:
+    if not snapshot["holdings"]:
+        return f"You don't have any stocks in your portfolio yet. Cash available: {snapshot['cash']:.2f}."
+    lines = ["Your portfolio:"]
+    for h in snapshot["holdings"]:
+        lines.append(
+            f"- {h['symbol']}: {h['quantity']} shares, avg buy price: {h['avg_buy_price']:.2f}, "
+            f"current price: {h['price']:.2f}, value: {h['market_value']:.2f}, "
+            f"P&L: {h['profit_loss']:+.2f} ({h['profit_loss_percent']:+.2f}%)"
+        )
+    lines.append(
+        f"Cash: {snapshot['cash']:.2f}. Holdings value: {snapshot['holdings_value']:.2f}. "
+        f"Total value: {snapshot['total_value']:.2f}. "
+        f"Total P&L: {snapshot['total_profit']:+.2f} ({snapshot['total_profit_percent']:+.2f}%)."
+    )
+    sectors = ", ".join(f"{sector} {weight:.1f}%" for sector, weight in snapshot["sector_weights"].items())
+    lines.append(f"Sector weights: {sectors}.")
+    return "\n".join(lines)
+
+
+def pick_price(holding: dict, last_price: float, observed_at: datetime) -> float:
+    """Cel mai nou dintre prețul poziției (din last_updated) și cel din "stocks" (din momentul schimbării)."""
+    current_price = holding.get("current_price")
+    if current_price and last_price:
+        return last_price if observed_at > (holding.get("priced_at") or datetime.min) else current_price
+    return current_price or last_price or holding["avg_buy_price"]
+
+
+def build_snapshot(cash: float, holdings: List[dict], stocks: Dict[str, Tuple[str, float, datetime]]) -> dict:
+    """
+    holdings: symbol, quantity, avg_buy_price, current_price, priced_at.
+    stocks: symbol -> (sector, last_price, observed_at); se folosește prețul mai nou dintre cele două.
+    """
+    rows = []
+    sector_values: Dict[str, float] = {}
+    for h in holdings:
+        sector, last_price, observed_at = stocks.get(h["symbol"], ("", 0.0, datetime.min))
+        price = pick_price(h, last_price, observed_at)
+        market_value = price * h["quantity"]
+        invested = h["avg_buy_price"] * h["quantity"]
+        rows.append({
+            "symbol": h["symbol"],
+            "quantity": h["quantity"],
+            "avg_buy_price": h["avg_buy_price"],
+            "price": price,
+            "sector": sector or "Other",
+            "market_value": round(market_value, 2),
+            "profit_loss": round(market_value - invested, 2),
+            "profit_loss_percent": round((market_value / invested - 1) * 100, 2) if invested else 0.0,
+        })
+        sector_values[sector or "Other"] = sector_values.get(sector or "Other", 0.0) + market_value
+
+    holdings_value = sum(r["market_value"] for r in rows)
+    invested_total = sum(h["avg_buy_price"] * h["quantity"] for h in holdings)
+    total_profit = holdings_value - invested_total
+    snapshot = {
+        "cash": round(cash, 2),
+        "holdings": rows,
+        "holdings_value": round(holdings_value, 2),
+        "total_value": round(cash + holdings_value, 2),
+        "total_profit": round(total_profit, 2),
+        "total_profit_percent": round(total_profit / invested_total * 100, 2) if invested_total else 0.0,
+        "sector_weights": {
+            sector: round(value / holdings_value * 100, 1) if holdings_value else 0.0
+            for sector, value in sorted(sector_values.items(), key=lambda item: -item[1])
+        },
+        "priced_at": datetime.utcnow(),
+    }
+    snapshot["text"] = render_snapshot(snapshot)
+    return snapshot
+
+
+class PortfolioSnapshots:
+    def __init__(self, max_users: int = SNAPSHOT_MAX_USERS, refresh_interval: float = QUOTE_REFRESH_INTERVAL):
+        self.max_users = max_users
+        self.refresh_interval = refresh_interval
+        # user_id -> (cash, poziții brute, snapshot); snapshot None = userul nu are portofoliu.
+        # ordinea = LRU
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        # symbol -> (sector, last_price, observed_at) din colecția "stocks"; "stocks" nu are
+        # timestamp, așa că observed_at e momentul în care am văzut prețul schimbându-se
+        # (datetime.min pentru prima încărcare: vârsta prețului e necunoscută)
+        self._stocks: Dict[str, Tuple[str, float, datetime]] = {}
+        self._lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        # apelate (fără argumente) când reîncărcarea găsește prețuri sau sectoare schimbate
+        self.stock_listeners = []
+        self.stats = {"hits": 0, "builds": 0, "quote_refreshes": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, user_id: str, cash: float, holdings: List[dict], touch: bool = True,
+               missing: bool = False) -> Optional[dict]:
+        snapshot = None if missing else build_snapshot(cash, holdings, self._stocks)
+        with self._lock:
+            if not touch and user_id not in self._entries:
+                return snapshot
+            self._entries[user_id] = (cash, holdings, snapshot)
+            if touch:
+                self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+        return snapshot
+
+    async def _load_stocks(self, symbols: Optional[List[str]] = None):
+        query = Stock.find(In(Stock.symbol, symbols)) if symbols is not None else Stock.find_all()
+        now = datetime.utcnow()
+        for stock in await query.to_list():
+            previous = self._stocks.get(stock.symbol)
+            if previous is None:
+                observed_at = datetime.min
+            elif previous[1] != stock.last_price:
+                observed_at = now
+            else:
+                observed_at = previous[2]
+            self._stocks[stock.symbol] = (stock.sector, stock.last_price, observed_at)
+
+    def update_from_portfolio(self, user_id: str, portfolio: Portfolio) -> dict:
+        """Reconstruiește snapshot-ul dintr-un portofoliu deja încărcat (fără acces la DB)."""
+        holdings = [
+            {"symbol": h.symbol, "quantity": h.quantity, "avg_buy_price": h.avg_buy_price,
+             "current_price": h.current_price, "priced_at": h.last_updated}
+            for h in portfolio.holdings
+        ]
+        self.stats["builds"] += 1
+        return self._store(str(user_id), portfolio.cash, holdings)
+
+    async def rebuild(self, user_id: str) -> Optional[dict]:
+        portfolio = await Portfolio.find_one(Portfolio.user_id == ObjectId(user_id))
+        if portfolio is None:
+            return self._store(user_id, 0.0, [], missing=True)
+        missing = [h.symbol for h in portfolio.holdings if h.symbol not in self._stocks]
+        if missing:
+            await self._load_stocks(missing)
+        return self.update_from_portfolio(user_id, portfolio)
+
+    async def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                self._entries.move_to_end(user_id)
+                self.stats["hits"] += 1
+                return entry[2]
+        return await self.rebuild(user_id)
+
+    async def invalidate(self, user_id: str):
+        # hook pentru outbox: după un trade snapshot-ul e reconstruit imediat, nu la următorul mesaj
+        await self.rebuild(user_id)
+
+    async def refresh_quotes(self):
+        """Re-evaluează toate snapshot-urile cu prețurile curente din "stocks" (o singură interogare)."""
+        previous = dict(self._stocks)
+        await self._load_stocks()
+        if self._stocks != previous:
+            for listener in self.stock_listeners:
+                await listener()
+        with self._lock:
+            entries = list(self._entries.items())
+        for user_id, (cash, holdings, snapshot) in entries:
+            if snapshot is not None:
+                # build_snapshot alege singur prețul mai nou (poziție vs. "stocks")
+                self._store(user_id, cash, holdings, touch=False)
+        self.stats["quote_refreshes"] += 1
+
+    def start(self):
+        if self._task is None:
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh_quotes()
+            except Exception as e:
+                logger.error(f"Portfolio snapshot refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+portfolio_snapshots = PortfolioSnapshots()
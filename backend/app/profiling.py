@@ -0,0 +1,197 @@
+"""
+Profilare la cerere pentru request-uri individuale, fără redeploy.
+
+Un request e profilat dacă:
+- are header-ul X-Profile egal cu PROFILING_TOKEN, sau
+- e ales aleator cu probabilitatea PROFILE_SAMPLE_RATE, iar path-ul începe cu unul din
+  PROFILE_SAMPLE_PATHS (ex. "/recommendations"); profilele eșantionate se păstrează doar
+  dacă request-ul a durat cel puțin PROFILE_MIN_DURATION_MS.
+
+Rezultatele (ultimele PROFILE_MAX_STORED) se citesc din /admin/profiles cu header-ul
+X-Admin-Token = PROFILING_TOKEN. Se folosește pyinstrument dacă e instalat (eșantionare, raport
+HTML tip flamegraph, doar task-ul request-ului), altfel cProfile (text pstats + fișier .prof
+pentru snakeviz; include și corutinele care rulează concurent pe același loop).
+Codul din thread pool (endpoint-uri sync, run_in_executor) nu apare în profil.
+
+Fără PROFILING_TOKEN și cu PROFILE_SAMPLE_RATE=0 middleware-ul doar pasează cererea mai departe.
+"""
+import cProfile
+import hmac
+import io
+import marshal
+import os
+import pstats
+import random
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from fastapi import Header, HTTPException
+
+try:
+    import pyinstrument
+except ImportError:
+    pyinstrument = None
+
+PROFILING_TOKEN = os.getenv("PROFILING_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_SAMPLE_PATHS = tuple(p for p in os.getenv("PROFILE_SAMPLE_PATHS", "/recommendations").split(",") if p)
+PROFILE_MIN_DURATION_MS = float(os.getenv("PROFILE_MIN_DURATION_MS", "500"))
+PROFILE_MAX_STORED = int(os.getenv("PROFILE_MAX_STORED", "20"))
+# auto = pyinstrument dacă e instalat, altfel cprofile
+PROFILER = os.getenv("PROFILER", "auto")
+PROFILE_TOP_N = int(os.getenv("PROFILE_TOP_N", "60"))
+
+
+class _CProfileSession:
+    name = "cprofile"
+
+    def __init__(self):
+        self.profiler = cProfile.Profile()
+        self.profiler.enable()
+
+    def stop(self) -> dict:
+        self.profiler.disable()
+        stream = io.StringIO()
+        pstats.Stats(self.profiler, stream=stream).sort_stats("cumulative").print_stats(PROFILE_TOP_N)
+        self.profiler.create_stats()
+        # același format ca pstats.dump_stats, deschis direct de snakeviz / pstats
+        return {"text": stream.getvalue(), "prof": marshal.dumps(self.profiler.stats)}
+
+
+class _PyinstrumentSession:
+    name = "pyinstrument"
+
+    def __init__(self):
+        self.profiler = pyinstrument.Profiler(interval=0.001, async_mode="enabled")
+        self.profiler.start()
+
+    def stop(self) -> dict:
+        self.profiler.stop()
+        return {"text": self.profiler.output_text(), "html": self.profiler.output_html()}
+
+
+def _start_session():
+    if PROFILER == "pyinstrument" or (PROFILER == "auto" and pyinstrument is not None):
+        return _PyinstrumentSession()
+    return _CProfileSession()
+
+
+class ProfileStore:
+    """Ultimele profile, în memorie; un singur request e profilat la un moment dat."""
+
+    def __init__(self, max_stored: int = PROFILE_MAX_STORED):
+        self.max_stored = max_stored
+        self._profiles = OrderedDict()
+        self._active = False
+        self.stats = {"profiled": 0, "stored": 0, "skipped_busy": 0}
+
+    def try_begin(self) -> bool:
+        # cProfile/pyinstrument nu suportă două sesiuni simultane pe același thread
+        if self._active:
+            self.stats["skipped_busy"] += 1
+            return False
+        self._active = True
+        self.stats["profiled"] += 1
+        return True
+
+    def end(self):
+        self._active = False
+
+    def add(self, profile: dict):
+        self._profiles[profile["id"]] = profile
+        self.stats["stored"] += 1
+        while len(self._profiles) > self.max_stored:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[dict]:
+        return self._profiles.get(profile_id)
+
+    def list(self):
+        formats = ("text", "html", "prof")
+        return [
+            {**{k: v for k, v in p.items() if k not in formats}, "formats": [f for f in formats if f in p]}
+            for p in reversed(self._profiles.values())
+        ]
+
+
+profile_store = ProfileStore()
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _token_matches(value: Optional[str]) -> bool:
+    return bool(PROFILING_TOKEN) and value is not None and hmac.compare_digest(value, PROFILING_TOKEN)
+
+
+class ProfilingMiddleware:
+    def __init__(self, app, store: ProfileStore = profile_store):
+        self.app = app
+        self.store = store
+        self.enabled = bool(PROFILING_TOKEN) or PROFILE_SAMPLE_RATE > 0
+
+    def _trigger(self, scope) -> Optional[str]:
+        if PROFILING_TOKEN and _token_matches(_header(scope, b"x-profile")):
+            return "header"
+        if PROFILE_SAMPLE_RATE > 0 and scope["path"].startswith(PROFILE_SAMPLE_PATHS) \
+                and random.random() < PROFILE_SAMPLE_RATE:
+            return "sample"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        trigger = self._trigger(scope)
+        if trigger is None or not self.store.try_begin():
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = uuid.uuid4().hex[:12]
+        response = {"status": 500}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+                if trigger == "header":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        started_at = datetime.utcnow()
+        session = _start_session()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            try:
+                output = session.stop()
+            finally:
+                self.store.end()
+            if trigger == "header" or duration_ms >= PROFILE_MIN_DURATION_MS:
+                self.store.add({
+                    "id": profile_id,
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "status": response["status"],
+                    "duration_ms": round(duration_ms, 1),
+                    "started_at": started_at.isoformat(),
+                    "trigger": trigger,
+                    "profiler": session.name,
+                    **output,
+                })
+
+
+async def require_profiling_admin(x_admin_token: Optional[str] = Header(None)):
+    """Endpoint-urile de profilare nu există dacă PROFILING_TOKEN nu e setat."""
+    if not PROFILING_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not _token_matches(x_admin_token):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
@@ -0,0 +1,322 @@
+"""
+Index de regăsire pentru documentele din app/rag (RAG pentru chatbot).
+
+Fiecare fișier .txt/.md din RAG_DIR este împărțit în fragmente de ~RAG_CHUNK_WORDS cuvinte,
+iar cuvintele sunt mapate prin hashing în RAG_FEATURES coloane (fără vocabular de ținut în memorie).
+Pentru fiecare fișier se scrie un segment pe disc: un index inversat în format CSR
+(coloană -> fragmente + ponderi) și textele fragmentelor, toate ca array-uri numpy încărcate
+cu mmap, deci doar paginile atinse de o interogare ajung în memorie.
+
+Reconstrucția este incrementală: manifest.json ține mtime/dimensiunea fiecărui fișier și
+doar fișierele noi sau modificate primesc un segment nou. Un segment nu e rescris niciodată pe loc:
+fiecare versiune primește un director nou, manifestul e înlocuit atomic, iar directoarele pe care
+manifestul nu le mai referă sunt șterse abia după ce indexul a fost reîncărcat (pe Windows un
+fișier încă mapat nu poate fi șters; încercarea se reia la următorul refresh).
+
+Construirea offline:  python rag_index.py   (din backend/app)
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import shutil
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from lazy_import import lazy_module
+from metrics import start_background_task
+
+np = lazy_module("numpy")
+
+logger = logging.getLogger(__name__)
+
+RAG_DIR = os.getenv("RAG_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "rag"))
+RAG_INDEX_DIR = os.getenv("RAG_INDEX_DIR", os.path.join(RAG_DIR, ".index"))
+RAG_EXTENSIONS = (".txt", ".md")
+RAG_FEATURES = 1 << 18
+RAG_CHUNK_WORDS = int(os.getenv("RAG_CHUNK_WORDS", "120"))
+RAG_CHUNK_OVERLAP = int(os.getenv("RAG_CHUNK_OVERLAP", "20"))
+RAG_TOP_K = int(os.getenv("RAG_TOP_K", "4"))
+RAG_TOKEN_BUDGET = int(os.getenv("RAG_TOKEN_BUDGET", "600"))
+RAG_REFRESH_INTERVAL = float(os.getenv("RAG_REFRESH_INTERVAL", "60"))
+# directoarele .tmp mai vechi de atât sunt resturi ale unei construiri întrerupte
+RAG_STALE_TMP_SECONDS = 3600
+
+_WORD_RE = re.compile(r"\w+")
+_STOPWORDS = {
+    "a", "an", "the", "of", "to", "in", "on", "for", "and", "or", "is", "are", "at", "by", "with",
+    "as", "it", "be", "this", "that", "what", "how", "i", "my", "do", "does",
+    "si", "de", "la", "in", "cu", "ce", "un", "o", "este", "sunt", "pe", "care",
+}
+
+
+def estimate_tokens(text: str) -> int:
+    # aproximare suficientă pentru buget: ~4 caractere pe token
+    return len(text) // 4 + 1
+
+
+def tokenize(text: str) -> List[str]:
+    return [w for w in _WORD_RE.findall(text.lower()) if w not in _STOPWORDS and len(w) > 1]
+
+
+def _feature(word: str) -> int:
+    return zlib.crc32(word.encode()) % RAG_FEATURES
+
+
+def _weights(words: List[str]) -> Dict[int, float]:
+    """tf sublinear, normalizat L2 (IDF se aplică la interogare, e global pe toate segmentele)."""
+    counts = Counter(_feature(w) for w in words)
+    weights = {f: 1.0 + math.log(c) for f, c in counts.items()}
+    norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+    return {f: w / norm for f, w in weights.items()}
+
+
+def chunk_text(text: str, size: int = RAG_CHUNK_WORDS, overlap: int = RAG_CHUNK_OVERLAP) -> List[str]:
+    words = text.split()
+    if not words:
+        return []
+    step = max(1, size - overlap)
+    chunks = []
+    for start in range(0, len(words), step):
+        chunks.append(" ".join(words[start:start + size]))
+        if start + size >= len(words):
+            break
+    return chunks
+
+
+def build_segment(path: str, segment_dir: str) -> int:
+    """Scrie segmentul pentru un fișier într-un director nou și întoarce numărul de fragmente."""
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        chunks = chunk_text(f.read())
+
+    features, docs, weights = [], [], []
+    for doc_id, chunk in enumerate(chunks):
+        for feature, weight in _weights(tokenize(chunk)).items():
+            features.append(feature)
+            docs.append(doc_id)
+            weights.append(weight)
+
+    features = np.asarray(features, dtype=np.int64)
+    order = np.argsort(features, kind="stable")
+    counts = np.bincount(features, minlength=RAG_FEATURES)
+    indptr = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+    encoded = [c.encode("utf-8") for c in chunks]
+    offsets = np.concatenate(([0], np.cumsum([len(c) for c in encoded]))).astype(np.int64)
+
+    tmp_dir = segment_dir + ".tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    np.save(os.path.join(tmp_dir, "indptr.npy"), indptr)
+    np.save(os.path.join(tmp_dir, "docs.npy"), np.asarray(docs, dtype=np.int32)[order])
+    np.save(os.path.join(tmp_dir, "weights.npy"), np.asarray(weights, dtype=np.float32)[order])
+    np.save(os.path.join(tmp_dir, "df.npy"), counts.astype(np.int32))
+    np.save(os.path.join(tmp_dir, "offsets.npy"), offsets)
+    with open(os.path.join(tmp_dir, "texts.bin"), "wb") as f:
+        f.write(b"".join(encoded))
+    # segment_dir e mereu nou (vezi build_index), deci redenumirea nu suprascrie nimic
+    os.replace(tmp_dir, segment_dir)
+    return len(chunks)
+
+
+def _source_files(rag_dir: str) -> Dict[str, os.stat_result]:
+    files = {}
+    for root, dirs, names in os.walk(rag_dir):
+        dirs[:] = [d for d in dirs if not d.startswith(".")]
+        for name in names:
+            if name.endswith(RAG_EXTENSIONS):
+                path = os.path.join(root, name)
+                files[os.path.relpath(path, rag_dir)] = os.stat(path)
+    return files
+
+
+def read_manifest(index_dir: str) -> dict:
+    try:
+        with open(os.path.join(index_dir, "manifest.json")) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def remove_stale_segments(index_dir: str) -> int:
+    """Șterge directoarele de segment pe care manifestul nu le mai referă."""
+    referenced = {entry["segment"] for entry in read_manifest(index_dir).values()}
+    removed = 0
+    for name in os.listdir(index_dir):
+        path = os.path.join(index_dir, name)
+        if name in referenced or not os.path.isdir(path):
+            continue
+        if name.endswith(".tmp") and time.time() - os.path.getmtime(path) < RAG_STALE_TMP_SECONDS:
+            continue  # poate fi o construire în curs (ex. python rag_index.py în paralel)
+        shutil.rmtree(path, ignore_errors=True)
+        removed += not os.path.exists(path)
+    return removed
+
+
+def build_index(rag_dir: str = RAG_DIR, index_dir: str = RAG_INDEX_DIR) -> dict:
+    """
+    Reconstrucție incrementală: doar fișierele noi/modificate sunt re-indexate. Segmentele vechi
+    rămân pe disc (cititorii le pot avea încă mapate); le șterge remove_stale_segments.
+    """
+    os.makedirs(index_dir, exist_ok=True)
+    manifest_path = os.path.join(index_dir, "manifest.json")
+    manifest = read_manifest(index_dir)
+
+    files = _source_files(rag_dir)
+    summary = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+
+    for rel_path in list(manifest):
+        if rel_path not in files:
+            manifest.pop(rel_path)
+            summary["removed"] += 1
+
+    for rel_path, stat in files.items():
+        entry = manifest.get(rel_path)
+        if entry and entry["mtime"] == stat.st_mtime and entry["size"] == stat.st_size:
+            summary["unchanged"] += 1
+            continue
+        # nume nou pentru fiecare versiune: segmentul vechi rămâne neatins până e șters
+        segment = f"{hashlib.sha1(rel_path.encode()).hexdigest()[:16]}-{time.time_ns():x}"
+        chunks = build_segment(os.path.join(rag_dir, rel_path), os.path.join(index_dir, segment))
+        manifest[rel_path] = {"mtime": stat.st_mtime, "size": stat.st_size, "segment": segment, "chunks": chunks}
+        summary["updated" if entry else "added"] += 1
+
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+    summary["chunks"] = sum(e["chunks"] for e in manifest.values())
+    return summary
+
+
+class _Segment:
+    def __init__(self, source: str, path: str):
+        self.source = source
+        load = lambda name: np.load(os.path.join(path, name), mmap_mode="r")
+        self.indptr = load("indptr.npy")
+        self.docs = load("docs.npy")
+        self.weights = load("weights.npy")
+        self.df = load("df.npy")
+        self.offsets = load("offsets.npy")
+        texts_path = os.path.join(path, "texts.bin")
+        self.texts = np.memmap(texts_path, dtype=np.uint8, mode="r") if os.path.getsize(texts_path) else b""
+        self.n_chunks = len(self.offsets) - 1
+
+    def text(self, doc_id: int) -> str:
+        start, end = int(self.offsets[doc_id]), int(self.offsets[doc_id + 1])
+        return bytes(self.texts[start:end]).decode("utf-8", errors="ignore")
+
+
+class RagIndex:
+    def __init__(self, rag_dir: str = RAG_DIR, index_dir: str = RAG_INDEX_DIR,
+                 refresh_interval: float = RAG_REFRESH_INTERVAL):
+        self.rag_dir = rag_dir
+        self.index_dir = index_dir
+        self.refresh_interval = refresh_interval
+        self._segments: List[_Segment] = []
+        # setat de load() odată cu segmentele; numpy se importă abia la prima încărcare
+        self._idf = None
+        self._task: Optional[asyncio.Task] = None
+        self.last_build = None
+        # manifestul din care au fost încărcate segmentele curente
+        self._loaded_manifest: Optional[dict] = None
+
+    @property
+    def chunks(self) -> int:
+        return sum(s.n_chunks for s in self._segments)
+
+    def load(self):
+        manifest = read_manifest(self.index_dir)
+        segments = [
+            _Segment(rel_path, os.path.join(self.index_dir, entry["segment"]))
+            for rel_path, entry in sorted(manifest.items()) if entry["chunks"]
+        ]
+        total = sum(s.n_chunks for s in segments)
+        df = np.zeros(RAG_FEATURES, dtype=np.int64)
+        for segment in segments:
+            df += segment.df
+        idf = (np.log((1 + total) / (1 + df)) + 1.0).astype(np.float32)
+        # înlocuire atomică: interogările în curs folosesc în continuare vechile segmente
+        self._segments, self._idf = segments, idf
+        self._loaded_manifest = manifest
+
+    def refresh(self) -> dict:
+        start = time.perf_counter()
+        summary = build_index(self.rag_dir, self.index_dir)
+        # reîncărcat și când manifestul a fost schimbat din afară (python rag_index.py)
+        if self._loaded_manifest is None or read_manifest(self.index_dir) != self._loaded_manifest:
+            self.load()
+        # abia acum segmentele vechi nu mai sunt folosite de interogările noi
+        summary["stale_removed"] = remove_stale_segments(self.index_dir)
+        summary["seconds"] = round(time.perf_counter() - start, 3)
+        self.last_build = summary
+        return summary
+
+    def search(self, query: str, k: int = RAG_TOP_K) -> List[Tuple[float, str, str]]:
+        """Top-k fragmente (scor, fișier sursă, text) pentru întrebare."""
+        segments, idf = self._segments, self._idf
+        query_counts = Counter(_feature(w) for w in tokenize(query))
+        if not segments or not query_counts:
+            return []
+        query_weights = {f: (1.0 + math.log(c)) * float(idf[f]) for f, c in query_counts.items()}
+
+        candidates = []
+        for segment in segments:
+            scores = np.zeros(segment.n_chunks, dtype=np.float32)
+            for feature, q_weight in query_weights.items():
+                start, end = segment.indptr[feature], segment.indptr[feature + 1]
+                if end > start:
+                    # un fragment apare o singură dată într-o listă, deci indexarea directă e corectă
+                    scores[segment.docs[start:end]] += q_weight * segment.weights[start:end]
+            top = min(k, segment.n_chunks)
+            best = np.argpartition(-scores, top - 1)[:top]
+            candidates.extend((float(scores[d]), segment, int(d)) for d in best if scores[d] > 0)
+
+        candidates.sort(key=lambda c: -c[0])
+        return [(score, segment.source, segment.text(doc)) for score, segment, doc in candidates[:k]]
+
+    def retrieve(self, query: str, k: int = RAG_TOP_K, token_budget: int = RAG_TOKEN_BUDGET) -> List[str]:
+        """Fragmentele relevante care încap împreună în token_budget."""
+        passages, used = [], 0
+        for _, _, text in self.search(query, k):
+            cost = estimate_tokens(text)
+            if used + cost > token_budget:
+                continue
+            passages.append(text)
+            used += cost
+        return passages
+
+    def start(self):
+        if self._task is None:
+            self._task = start_background_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                summary = await loop.run_in_executor(None, self.refresh)
+                if summary["added"] or summary["updated"] or summary["removed"]:
+                    logger.info(f"RAG index rebuilt: {summary}")
+            except Exception as e:
+                logger.error(f"RAG index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval)
+
+
+rag_index = RagIndex()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    print(json.dumps(rag_index.refresh(), indent=2))
+    print(f"{rag_index.chunks} chunks indexed from {RAG_DIR}")
@@ -0,0 +1,166 @@
+"""
+Cache de răspunsuri HTTP pentru endpoint-urile citite des și modificate rar (stocks, news, chart...).
+
+Răspunsul e păstrat deja serializat (bytes), împreună cu un ETag puternic (hash-ul corpului).
+Cheia este numele rutei + path-ul + parametrii de query sortați. O citire repetată costă
+un lookup și, dacă clientul trimite If-None-Match cu același ETag, un 304 fără corp.
+
+Fiecare intrare are un TTL propriu rutei și o listă de tag-uri ("stocks", "news"); scrierile
+relevante (ingestia de știri, reîncărcarea prețurilor) apelează invalidate(tag). Cache-Control
+este "no-cache": clienții pot păstra răspunsul, dar îl revalidează mereu prin ETag.
+
+Corpurile peste COMPRESSION_MIN_SIZE se servesc comprimate (br/gzip, după Accept-Encoding);
+varianta comprimată se calculează o dată per intrare și se păstrează lângă corpul JSON.
+"""
+import asyncio
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from fastapi import Request, Response
+
+import response_compression
+import fast_json
+
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv("RESPONSE_CACHE_MAX_ENTRIES", "2000"))
+
+
+def make_etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match poate conține o listă, iar clienții pot trimite varianta weak (W/"...")
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+
+class _Entry:
+    __slots__ = ("body", "etag", "expires_at", "tags", "encoded")
+
+    def __init__(self, body: bytes, etag: str, expires_at: float, tags: Tuple[str, ...]):
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.tags = tags
+        # codare -> corp comprimat, completat la prima cerere care o acceptă
+        self.encoded: Dict[str, bytes] = {}
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = RESPONSE_CACHE_MAX_ENTRIES, encoder: Callable = fast_json.dumps):
+        self.max_entries = max_entries
+        self.encoder = encoder
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # tag -> generație; o intrare calculată înainte de o invalidare nu mai e salvată
+        self._generations: Dict[str, int] = {}
+        # cereri concurente pentru aceeași cheie așteaptă un singur calcul
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "invalidations": 0, "coalesced": 0,
+                      "compressed": 0}
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def key_for(name: str, request: Request) -> str:
+        query = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+        return f"{name}:{request.url.path}?{query}"
+
+    def _generation(self, tags: Iterable[str]) -> Tuple[int, ...]:
+        return tuple(self._generations.get(tag, 0) for tag in tags)
+
+    def _lookup(self, key: str) -> Optional[_Entry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    async def _respond(self, entry: _Entry, request: Request) -> Response:
+        encoding = None
+        if len(entry.body) >= response_compression.COMPRESSION_MIN_SIZE:
+            encoding = response_compression.negotiate(request.headers.get("accept-encoding"))
+        etag = entry.etag if encoding is None else response_compression.variant_etag(entry.etag, encoding)
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=headers)
+        if encoding is None:
+            return Response(entry.body, media_type="application/json", headers=headers)
+
+        body = entry.encoded.get(encoding)
+        if body is None:
+            body = await response_compression.compress_async(entry.body, encoding, cached=True)
+            entry.encoded[encoding] = body
+            self.stats["compressed"] += 1
+        headers["Content-Encoding"] = encoding
+        return Response(body, media_type="application/json", headers=headers)
+
+    async def _build(self, key: str, build: Callable[[], Awaitable], ttl: float, tags: Tuple[str, ...]) -> _Entry:
+        generation = self._generation(tags)
+        body = self.encoder(await build())
+        entry = _Entry(body, make_etag(body), time.monotonic() + ttl, tags)
+        if self._generation(tags) == generation:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    async def respond(self, request: Request, name: str, build: Callable[[], Awaitable], ttl: float,
+                      tags: Iterable[str] = ()) -> Response:
+        """
+        Servește răspunsul din cache (200 sau 304) sau îl construiește cu `build()` și îl salvează.
+        Excepțiile din build (ex. HTTPException 404) trec mai departe și nu sunt salvate.
+        """
+        key = self.key_for(name, request)
+        entry = self._lookup(key)
+        if entry is not None:
+            self.stats["hits"] += 1
+            return await self._respond(entry, request)
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            self.stats["coalesced"] += 1
+            return await self._respond(await asyncio.shield(pending), request)
+
+        self.stats["misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            entry = await self._build(key, build, ttl, tuple(tags))
+            future.set_result(entry)
+        except BaseException as e:
+            future.set_exception(e)
+            # excepția e deja propagată aici; cei care așteaptă o primesc din future
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        return await self._respond(entry, request)
+
+    def invalidate(self, *tags: str):
+        for tag in tags:
+            self._generations[tag] = self._generations.get(tag, 0) + 1
+        stale = [key for key, entry in self._entries.items() if any(tag in entry.tags for tag in tags)]
+        for key in stale:
+            del self._entries[key]
+        self.stats["invalidations"] += 1
+
+    def invalidation_listener(self, *tags: str):
+        """Callback async pentru listener-e care primesc argumente (ex. news_ingester.listeners)."""
+        async def listener(*_args, **_kwargs):
+            self.invalidate(*tags)
+        return listener
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,133 @@
+"""
+Compresie gzip / brotli pentru răspunsurile mari (grafice, lista de acțiuni, știri, leaderboard).
+
+- CompressionMiddleware comprimă răspunsurile dinamice de tip text/JSON peste COMPRESSION_MIN_SIZE,
+  după Accept-Encoding: brotli dacă modulul `brotli` e instalat și clientul îl acceptă, altfel gzip.
+  Răspunsurile în flux (SSE de la chatbot) și cele deja codate trec neatinse.
+- response_cache păstrează lângă corpul JSON și variantele comprimate (compress_cached, nivel mai
+  mare), calculate o singură dată per intrare; middleware-ul le vede Content-Encoding și le lasă.
+
+Fiecare variantă are ETag propriu ("<hash>-br", "<hash>-gzip"), ca un 304 să nu confirme altă codare.
+"""
+import asyncio
+import gzip
+import os
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+# variantele din cache se comprimă o dată și se servesc de multe ori: merită un nivel mai mare
+GZIP_CACHED_LEVEL = int(os.getenv("GZIP_CACHED_LEVEL", "9"))
+BROTLI_CACHED_QUALITY = int(os.getenv("BROTLI_CACHED_QUALITY", "9"))
+# peste această dimensiune compresia rulează în thread pool, nu pe event loop
+COMPRESSION_THREAD_MIN_SIZE = int(os.getenv("COMPRESSION_THREAD_MIN_SIZE", str(256 * 1024)))
+
+COMPRESSIBLE_TYPES = ("application/json", "text/", "application/javascript", "application/xml", "image/svg+xml")
+# ordinea de preferință a serverului la q egal
+_PREFERENCE = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """Alege codarea din Accept-Encoding (cu q-values), sau None dacă nu comprimăm."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+    wildcard = weights.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in _PREFERENCE:
+        q = weights.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_CACHED_QUALITY if cached else BROTLI_QUALITY)
+    # mtime=0: același corp dă aceiași octeți, deci ETag-ul variantei rămâne valid
+    return gzip.compress(body, compresslevel=GZIP_CACHED_LEVEL if cached else GZIP_LEVEL, mtime=0)
+
+
+async def compress_async(body: bytes, encoding: str, cached: bool = False) -> bytes:
+    if len(body) >= COMPRESSION_THREAD_MIN_SIZE:
+        return await asyncio.to_thread(compress, body, encoding, cached)
+    return compress(body, encoding, cached)
+
+
+def variant_etag(etag: str, encoding: str) -> str:
+    return etag[:-1] + f'-{encoding}"'
+
+
+def _compressible(headers: Headers) -> bool:
+    content_type = headers.get("content-type", "")
+    return (content_type.startswith(COMPRESSIBLE_TYPES) and not content_type.startswith("text/event-stream")
+            and "content-encoding" not in headers)
+
+
+class CompressionMiddleware:
+    def __init__(self, app, min_size: int = COMPRESSION_MIN_SIZE):
+        self.app = app
+        self.min_size = min_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate(Headers(scope=scope).get("accept-encoding"))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        pending = {}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                # așteptăm primul fragment din corp ca să știm dacă merită comprimat
+                pending["start"] = message
+                return
+            start = pending.pop("start", None)
+            if start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(scope=start)
+            body = message.get("body", b"")
+            if not _compressible(headers):
+                await send(start)
+                await send(message)
+                return
+            headers.add_vary_header("Accept-Encoding")
+            if message.get("more_body") or len(body) < self.min_size:
+                await send(start)
+                await send(message)
+                return
+
+            compressed = await compress_async(body, encoding)
+            if len(compressed) >= len(body):
+                await send(start)
+                await send(message)
+                return
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(compressed))
+            await send(start)
+            await send({**message, "body": compressed})
+
+        await self.app(scope, receive, send_wrapper)
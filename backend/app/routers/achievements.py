@@ -1,17 +1,27 @@
 from datetime import datetime, timedelta
 from decimal import Decimal
 from models.user import User
-from web3 import Web3
+import hmac
 import os
 import json
 from dotenv import load_dotenv
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException
 from beanie import Document
 from typing import Optional
+from functools import lru_cache
 
 from models.portfolio import Portfolio
+from blockchain.minter import get_mint_queue, get_w3
+from blockchain.read_cache import ChainReadCache
+from lazy_import import lazy_module
 
 from bson import ObjectId
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+import logging
+
+logger = logging.getLogger(__name__)
+web3 = lazy_module("web3")
 
 # Nou model pentru a urmări achivements minate
 class UserAchievement(Document):
@@ -21,22 +31,29 @@ class UserAchievement(Document):
     tx_hash: Optional[str] = None
     minted_at: Optional[datetime] = None
     token_uri: Optional[str] = None
+    # pending -> confirmed, sau failed după ce coada de mint renunță (vezi /achievements/retry-failed)
+    mint_status: str = "pending"
+    mint_error: Optional[str] = None
     
     class Settings:
         name = "user_achievements"
+        # un achievement se câștigă o singură dată: evaluările concurente nu pot insera (și mina) de două ori
+        indexes = [
+            IndexModel([("user_id", ASCENDING), ("achievement_type", ASCENDING)], unique=True),
+        ]
 
 async def get_user_total_profit(user_id: str) -> float:
-    print("Calculating profit for user:", user_id)
+    logger.debug("Calculating profit for user %s", user_id)
     portfolio = await Portfolio.find_one(Portfolio.user_id == ObjectId(user_id))
-    print("Portfolio found:", portfolio)
+    logger.debug("Portfolio found: %s", portfolio is not None)
     if not portfolio or not portfolio.holdings:
-        print("No portfolio or holdings")
+        logger.debug("No portfolio or holdings")
         return 0.0
     total_profit = 0.0
     for h in portfolio.holdings:
-        print("Holding:", h.symbol, h.current_price, h.avg_buy_price, h.quantity)
+        logger.debug("Holding %s: price=%s avg=%s qty=%s", h.symbol, h.current_price, h.avg_buy_price, h.quantity)
         total_profit += (h.current_price - h.avg_buy_price) * h.quantity
-    print("Total profit:", total_profit)
+    logger.debug("Total profit for %s: %s", user_id, total_profit)
     return total_profit
 # Inițializează routerul pentru FastAPI
 router = APIRouter()
@@ -44,16 +61,80 @@ router = APIRouter()
 # Încarcă variabilele din .env
 load_dotenv()
 
-NFT_CONTRACT_ADDRESS = Web3.to_checksum_address(os.getenv("NFT_CONTRACT_ADDRESS"))
-BLOCKCHAIN_URL = os.getenv("BLOCKCHAIN_URL")
-PRIVATE_KEY = os.getenv("PRIVATE_KEY")
+NFT_ARTIFACT_PATH = "blockchain/artifacts/contracts/UserAchievementNFT.sol/UserAchievementNFT.json"
+
+# X-Admin-Token pentru rutele care pornesc mint-uri pentru toți userii (sweep, retry-failed)
+ACHIEVEMENTS_ADMIN_TOKEN = os.getenv("ACHIEVEMENTS_ADMIN_TOKEN", "")
+
+
+async def require_achievements_admin(x_admin_token: Optional[str] = Header(None)):
+    """Rutele de administrare nu există dacă ACHIEVEMENTS_ADMIN_TOKEN nu e setat."""
+    if not ACHIEVEMENTS_ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if x_admin_token is None or not hmac.compare_digest(x_admin_token, ACHIEVEMENTS_ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@lru_cache(maxsize=None)
+def get_nft_reader():
+    """
+    Contractul NFT și cache-ul de citiri, create la prima cerere care are nevoie de ele,
+    ca API-ul să pornească și fără nod / artefacte de contract.
+    """
+    with open(NFT_ARTIFACT_PATH) as f:
+        abi = json.load(f)["abi"]
+    w3 = get_w3()
+    contract = w3.eth.contract(address=web3.Web3.to_checksum_address(os.getenv("NFT_CONTRACT_ADDRESS")), abi=abi)
+    return contract, ChainReadCache(w3)
+
+
+def mark_achievement_confirmed(achievement: "UserAchievement"):
+    """Callback pentru coada de mint: completează tx_hash și minted_at după confirmare."""
+    async def on_confirmed(job, receipt):
+        await achievement.set({
+            UserAchievement.tx_hash: job.tx_hash,
+            UserAchievement.minted_at: datetime.utcnow(),
+            UserAchievement.mint_status: "confirmed",
+            UserAchievement.mint_error: None,
+        })
+    return on_confirmed
+
+
+def mark_achievement_failed(achievement: "UserAchievement"):
+    """Callback pentru coada de mint: achievement-ul rămâne vizibil ca failed și poate fi retrimis."""
+    async def on_failed(job, reason):
+        await achievement.set({
+            UserAchievement.mint_status: "failed",
+            UserAchievement.mint_error: reason,
+        })
+    return on_failed
 
-with open("blockchain/artifacts/contracts/UserAchievementNFT.sol/UserAchievementNFT.json") as f:
-    abi = json.load(f)["abi"]
 
-w3 = Web3(Web3.HTTPProvider(BLOCKCHAIN_URL))
-contract = w3.eth.contract(address=NFT_CONTRACT_ADDRESS, abi=abi)
-admin_address = w3.eth.account.from_key(PRIVATE_KEY).address
+def enqueue_achievement_mint(achievement: "UserAchievement"):
+    get_mint_queue().enqueue(achievement.wallet_address, achievement.token_uri,
+                             on_confirmed=mark_achievement_confirmed(achievement),
+                             on_failed=mark_achievement_failed(achievement))
+
+
+async def queue_achievement_mint(user_id: str, achievement_type: str, wallet_address: str, token_uri: str):
+    """
+    Salvează achievement-ul ca pending și pune mint-ul în coada admin-ului.
+    tx_hash și minted_at se completează abia după ce tranzacția e confirmată.
+    """
+    wallet_address = web3.Web3.to_checksum_address(wallet_address)
+    new_achievement = UserAchievement(
+        user_id=user_id,
+        achievement_type=achievement_type,
+        wallet_address=wallet_address,
+        token_uri=token_uri,
+    )
+    try:
+        await new_achievement.insert()
+    except DuplicateKeyError:
+        return {"info": "Achievement already earned"}
+
+    enqueue_achievement_mint(new_achievement)
+    return {"status": "queued", "achievement_id": str(new_achievement.id)}
 
 async def check_and_mint_10_days_nft(user_id: str):
     user = await User.get(user_id)
@@ -66,39 +147,13 @@ async def check_and_mint_10_days_nft(user_id: str):
     )
     
     if existing_achievement:
-        print("User already has 10 days achievement")
+        logger.debug("User %s already has 10 days achievement", user_id)
         return {"info": "Achievement already minted", "tx_hash": existing_achievement.tx_hash}
         
     if user.created_at <= datetime.utcnow() - timedelta(days=10):
-        achievement = "10_days"
         # Folosește direct linkul IPFS generat de Pinata pentru acest achievement
         token_uri = "ipfs://QmP7vuFVH6jNfwU5sQP16AstYRUEvGwUjQu2wxwXz12E3Q"
-        nonce = w3.eth.get_transaction_count(admin_address)
-        wallet_address = w3.to_checksum_address(user.wallet_address)
-        txn = contract.functions.mintNFT(wallet_address, token_uri).build_transaction({
-            "from": admin_address,
-            "nonce": nonce,
-            "gas": 300000,
-            "gasPrice": w3.to_wei("10", "gwei"),
-        })
-        # Adaugăm logging pentru a vedea ce atribute are signed_txn
-        signed_txn = w3.eth.account.sign_transaction(txn, PRIVATE_KEY)
-        print("Signed transaction attributes:", dir(signed_txn))
-        # Încercăm cu raw_transaction (cu underscore)
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        
-        # Salvează în baza de date
-        new_achievement = UserAchievement(
-            user_id=user_id,
-            achievement_type="10_days",
-            wallet_address=wallet_address,
-            tx_hash=tx_hash.hex(),
-            token_uri=token_uri,
-            minted_at=datetime.utcnow()
-        )
-        await new_achievement.insert()
-        
-        return {"tx_hash": tx_hash.hex()}
+        return await queue_achievement_mint(user_id, "10_days", user.wallet_address, token_uri)
     else:
         return {"error": "User does not qualify for 10 days NFT"}
 
@@ -113,40 +168,15 @@ async def check_and_mint_profit_nft(user_id: str):
     )
     
     if existing_achievement:
-        print("User already has profit achievement")
+        logger.debug("User %s already has profit achievement", user_id)
         return {"info": "Achievement already minted", "tx_hash": existing_achievement.tx_hash}
         
     profit = await get_user_total_profit(user_id)
     if profit is None:
         return {"error": "Profit data not available for user"}
     if Decimal(profit) > 0:
-        achievement = "profit_positive"
-       
         token_uri = "ipfs://QmP7vuFVH6jNfwU5sQP16AstYRUEvGwUjQu2wxwXz12E3Q"
-        nonce = w3.eth.get_transaction_count(admin_address)
-        wallet_address = w3.to_checksum_address(user.wallet_address)
-        txn = contract.functions.mintNFT(wallet_address, token_uri).build_transaction({
-            "from": admin_address,
-            "nonce": nonce,
-            "gas": 300000,
-            "gasPrice": w3.to_wei("10", "gwei"),
-        })
-        signed_txn = w3.eth.account.sign_transaction(txn, PRIVATE_KEY)
-        # Încercăm cu raw_transaction (cu underscore)
-        tx_hash = w3.eth.send_raw_transaction(signed_txn.raw_transaction)
-        
-        # Salvează în baza de date
-        new_achievement = UserAchievement(
-            user_id=user_id,
-            achievement_type="profit_positive",
-            wallet_address=wallet_address,
-            tx_hash=tx_hash.hex(),
-            token_uri=token_uri,
-            minted_at=datetime.utcnow()
-        )
-        await new_achievement.insert()
-        
-        return {"tx_hash": tx_hash.hex()}
+        return await queue_achievement_mint(user_id, "profit_positive", user.wallet_address, token_uri)
     else:
         return {"error": "User does not qualify for profit NFT"}
 # Rute FastAPI pentru a declanșa mintarea achievement-urilor
@@ -158,6 +188,25 @@ async def check_10_days_nft(user_id: str):
 async def check_profit_nft(user_id: str):
     return await check_and_mint_profit_nft(user_id)
 
+@router.post("/achievements/sweep", dependencies=[Depends(require_achievements_admin)])
+async def sweep_achievements(batch_size: int = 1000, dry_run: bool = False):
+    """
+    Evaluează toate regulile de achievement pentru toți userii și pune mint-urile noi în coadă.
+    Cu dry_run=true doar raportează ce ar fi câștigat.
+    """
+    from achievements_engine import sweep_all_users
+    return await sweep_all_users(batch_size=batch_size, mint=not dry_run)
+
+
+@router.post("/achievements/retry-failed", dependencies=[Depends(require_achievements_admin)])
+async def retry_failed_achievements():
+    """Pune din nou în coadă mint-urile marcate failed."""
+    failed = await UserAchievement.find(UserAchievement.mint_status == "failed").to_list()
+    for achievement in failed:
+        await achievement.set({UserAchievement.mint_status: "pending", UserAchievement.mint_error: None})
+        enqueue_achievement_mint(achievement)
+    return {"requeued": len(failed)}
+
 
 @router.get("/user-nfts/{wallet_address}")
 async def get_user_nfts(wallet_address: str):
@@ -165,22 +214,23 @@ async def get_user_nfts(wallet_address: str):
     Returnează lista de NFT-uri deținute de un wallet, cu metadata (token_uri).
     """
     try:
-        print(f"Fetching NFTs for wallet: {wallet_address}")
-        wallet_checksum = Web3.to_checksum_address(wallet_address)
-        print(f"Checksum address: {wallet_checksum}")
+        logger.debug("Fetching NFTs for wallet %s", wallet_address)
+        wallet_checksum = web3.Web3.to_checksum_address(wallet_address)
+        logger.debug("Checksum address: %s", wallet_checksum)
         
         # Verifică NFT-uri din baza de date ca fallback/backup
         db_achievements = await UserAchievement.find(
             {"wallet_address": wallet_address}
         ).to_list()
         
-        print(f"Found {len(db_achievements)} NFTs in database")
+        logger.debug("Found %d NFTs in database", len(db_achievements))
         
         nfts_from_db = []
         for ach in db_achievements:
             nfts_from_db.append({
-                "token_id": ach.tx_hash[:10],  # Un identificator unic bazat pe tx_hash
+                "token_id": ach.tx_hash[:10] if ach.tx_hash else str(ach.id),  # Un identificator unic bazat pe tx_hash (mint-urile pending nu au încă)
                 "token_uri": ach.token_uri,
+                "mint_status": "confirmed" if ach.tx_hash else ach.mint_status,
                 "metadata": {
                     "name": f"Achievement: {ach.achievement_type}",
                     "description": f"Wall Street Academy Achievement: {ach.achievement_type}",
@@ -190,12 +240,13 @@ async def get_user_nfts(wallet_address: str):
         
         try:
             # Încearcă să obțină NFT-urile din blockchain
-            print("Calling balanceOf...")
-            balance = contract.functions.balanceOf(wallet_checksum).call()
-            print(f"NFT balance from blockchain: {balance}")
+            logger.debug("Calling balanceOf")
+            contract, read_cache = get_nft_reader()
+            balance = read_cache.call(contract.functions.balanceOf(wallet_checksum))
+            logger.debug("NFT balance from blockchain: %s", balance)
             
             if balance == 0:
-                print("No NFTs found in blockchain, returning database results")
+                logger.debug("No NFTs found in blockchain, returning database results")
                 return nfts_from_db if nfts_from_db else []
             
             nfts = []
@@ -203,12 +254,12 @@ async def get_user_nfts(wallet_address: str):
             # Folosim tokenOfOwnerByIndex în loc de scanare - mai eficient
             for i in range(balance):
                 try:
-                    token_id = contract.functions.tokenOfOwnerByIndex(wallet_checksum, i).call()
-                    print(f"Token ID from index {i}: {token_id}")
+                    token_id = read_cache.call(contract.functions.tokenOfOwnerByIndex(wallet_checksum, i))
+                    logger.debug("Token ID from index %d: %s", i, token_id)
                     
                     # Obține URL-ul de metadata
-                    token_uri = contract.functions.tokenURI(token_id).call()
-                    print(f"Token URI: {token_uri}")
+                    token_uri = read_cache.call(contract.functions.tokenURI(token_id), immutable=True)
+                    logger.debug("Token URI: %s", token_uri)
                     
                     # Pregătește metadatele pentru frontend
                     nfts.append({
@@ -221,22 +272,21 @@ async def get_user_nfts(wallet_address: str):
                         }
                     })
                 except Exception as e:
-                    print(f"Error getting token at index {i}: {e}")
+                    logger.warning("Error getting token at index %d: %s", i, e)
                     continue
             
             if len(nfts) > 0:
-                print(f"Returning {len(nfts)} NFTs from blockchain")
+                logger.debug("Returning %d NFTs from blockchain", len(nfts))
                 return nfts
             else:
-                print("Falling back to database NFTs")
+                logger.info("Falling back to database NFTs")
                 return nfts_from_db if nfts_from_db else []
                 
         except Exception as e:
             # În cazul în care blockchain-ul nu răspunde, folosește NFT-urile din baza de date
-            print(f"Error accessing blockchain: {e}")
-            print("Falling back to database results")
+            logger.warning("Error accessing blockchain, falling back to database results: %s", e)
             return nfts_from_db if nfts_from_db else []
             
     except Exception as e:
-        print(f"ERROR in get_user_nfts: {str(e)}")
+        logger.exception("Error in get_user_nfts: %s", e)
         raise HTTPException(status_code=500, detail=f"Error fetching NFTs: {str(e)}")
\ No newline at end of file
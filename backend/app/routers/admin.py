@@ -0,0 +1,32 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import HTMLResponse, PlainTextResponse, Response
+
+from profiling import profile_store, require_profiling_admin
+
+router = APIRouter(dependencies=[Depends(require_profiling_admin)])
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """Profilele păstrate (cele mai noi primele), fără conținut."""
+    return {"stats": profile_store.stats, "profiles": profile_store.list()}
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(profile_id: str, format: str = Query("text", pattern="^(text|html|prof)$")):
+    """
+    text = raportul text; html = flamegraph pyinstrument; prof = fișier pstats (cProfile),
+    deschis cu `snakeviz profile.prof` sau `python -m pstats profile.prof`.
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    if format not in profile:
+        raise HTTPException(status_code=400, detail=f"Format {format} not available for {profile['profiler']} profiles")
+
+    if format == "html":
+        return HTMLResponse(profile["html"])
+    if format == "prof":
+        return Response(profile["prof"], media_type="application/octet-stream",
+                        headers={"Content-Disposition": f'attachment; filename="{profile_id}.prof"'})
+    return PlainTextResponse(profile["text"])
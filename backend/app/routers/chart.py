@@ -1,13 +1,23 @@
 # app/routers/chart.py
 
-from fastapi import APIRouter, HTTPException
+import os
+
+from fastapi import APIRouter, HTTPException, Request
 from models.stock import Stock
 from datetime import datetime, timedelta
 
+from response_cache import response_cache
+
 router = APIRouter()
 
+CHART_CACHE_TTL = float(os.getenv("CHART_CACHE_TTL", "300"))
+
 @router.get("/{symbol}")
-async def get_chart(symbol: str):
+async def get_chart(symbol: str, request: Request):
+    return await response_cache.respond(request, "chart", lambda: build_chart(symbol), ttl=CHART_CACHE_TTL,
+                                        tags=("stocks",))
+
+async def build_chart(symbol: str):
     stock = await Stock.find_one(Stock.symbol == symbol)
 
     if not stock:
@@ -1,66 +1,253 @@
-from fastapi import APIRouter, Body
+from fastapi import APIRouter, Body, Request
+from fastapi.responses import StreamingResponse
 import httpx
-from models.portfolio import Portfolio
-from models.stock import Stock
-from beanie import PydanticObjectId
+import json
+import logging
+import os
+from typing import Optional
 from fastapi import HTTPException
+from auth.auth import verify_access_token
+from chat_cache import chat_cache
+from portfolio_snapshot import portfolio_snapshots
+from rag_index import RAG_TOKEN_BUDGET, rag_index
+from chat_context import Conversation, assemble_messages, conversation_store
+from metrics import span
+from llm_client import QueueFullError, UserLimitError, get_llm_client, llm_admission
 
 router = APIRouter()
-OLLAMA_URL = "http://localhost:11434/v1/chat/completions"
+logger = logging.getLogger(__name__)
+OLLAMA_URL = os.getenv("OLLAMA_URL", "http://localhost:11434/v1/chat/completions")
 
 async def get_user_portfolio(user_id: str):
     if user_id == "guest":
         return "You are not logged in. Please log in to see your portfolio information."
     
     try:
-        portfolio = await Portfolio.find_one({"user_id": PydanticObjectId(user_id)})
-        if not portfolio or not portfolio.holdings:
+        # Rezumatul precalculat (prețuri, P&L, sectoare); DB-ul e atins doar la primul mesaj
+        snapshot = await portfolio_snapshots.get(user_id)
+        if not snapshot:
             return "You don't have any stocks in your portfolio yet."
-        
-        lines = ["Your portfolio:"]
-        for h in portfolio.holdings:
-            lines.append(f"- {h.symbol}: {h.quantity} shares, avg buy price: {h.avg_buy_price}")
-        return "\n".join(lines)
+        return snapshot["text"]
     except Exception as e:
-        print(f"Error getting portfolio: {e}")
+        logger.warning("Error getting portfolio for %s: %s", user_id, e)
         return "Could not retrieve portfolio information."
 
+CHAT_INSTRUCTIONS = (
+    "You are a helpful assistant for the Wall Street Academy app. "
+    "IMPORTANT: Always respond in the same language the user asks their question in. "
+    "If they write in English, respond in English. "
+    "If they write in Romanian, respond in Romanian. "
+    "If they write in Spanish, respond in Spanish, etc. "
+    "You have access to the user's portfolio information and can answer questions about it. "
+)
+
+def _token_subject(request: Request) -> Optional[str]:
+    """Userul din token-ul JWT (header Authorization: Bearer ...), dacă cererea are unul valid."""
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        payload = verify_access_token(authorization[len("bearer "):].strip())
+        if payload and payload.get("sub"):
+            return str(payload["sub"])
+    return None
+
+def admission_key(request: Request, user_id: str) -> str:
+    """
+    Cheia pentru limita per user din llm_admission: identitatea din token-ul JWT, dacă cererea
+    are unul valid, altfel user_id-ul trimis. Vizitatorii "guest" sunt separați după IP, altfel
+    toți cei nelogați ar împărți aceleași LLM_PER_USER_LIMIT locuri.
+    """
+    subject = _token_subject(request)
+    if subject:
+        return subject
+    if not user_id or user_id == "guest":
+        return f"guest:{request.client.host if request.client else 'unknown'}"
+    return user_id
+
+def resolve_session(request: Request, session_id: Optional[str], user_id: str) -> Conversation:
+    """
+    Conversația cererii: cea cu session_id-ul trimis, altfel, pentru un user autentificat,
+    conversația lui implicită (una per user), ca memoria să meargă și fără session_id.
+    Guest-ii fără session_id încep o conversație nouă.
+    """
+    if not session_id and _token_subject(request) == user_id:
+        session_id = f"user:{user_id}"
+    return conversation_store.get_or_create(session_id, user_id)
+
+def _retrieve_passages(message: str, token_budget: int):
+    return rag_index.retrieve(message, token_budget=min(token_budget, RAG_TOKEN_BUDGET))
+
+async def build_chat_payload(message: str, user_id: str, stream: bool = False,
+                             portfolio_context: str = None, conversation: Conversation = None) -> dict:
+    """
+    Construiește payload-ul pentru Ollama: instrucțiuni, portofoliul userului, istoricul
+    conversației și fragmentele RAG, încadrate în CHAT_CONTEXT_BUDGET tokeni.
+    """
+    if portfolio_context is None:
+        portfolio_context = await get_user_portfolio(user_id)
+    return {
+        "model": "mistral",
+        "messages": assemble_messages(CHAT_INSTRUCTIONS, portfolio_context, message,
+                                      conversation, retrieve=_retrieve_passages),
+        "stream": stream
+    }
+
 @router.post("/chat")
 async def chat_with_mistral(
+    request: Request,
     message: str = Body(...),
-    user_id: str = Body(...)
+    user_id: str = Body(...),
+    session_id: Optional[str] = Body(None)
 ):
     """
     Chatbot endpoint using local Mistral (Ollama).
     Responds in the same language the user asked the question in.
     Uses user's portfolio as context if user is logged in.
+    Trimite session_id-ul primit înapoi pentru a continua conversația.
     """
     try:
-
+        conversation = resolve_session(request, session_id, user_id)
         portfolio_context = await get_user_portfolio(user_id)
-        
-        system_prompt = (
-            "You are a helpful assistant for the Wall Street Academy app. "
-            "IMPORTANT: Always respond in the same language the user asks their question in. "
-            "If they write in English, respond in English. "
-            "If they write in Romanian, respond in Romanian. "
-            "If they write in Spanish, respond in Spanish, etc. "
-            "You have access to the user's portfolio information and can answer questions about it. "
-            f"{portfolio_context}\n"
-            "If the user asks about their stocks, use this information."
-        )
-        payload = {
-            "model": "mistral",
-            "messages": [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": message}
-            ],
-            "stream": False
-        }
-        async with httpx.AsyncClient() as client:
-            response = await client.post(OLLAMA_URL, json=payload, timeout=60.0)
-            data = response.json()
-            return {"response": data["choices"][0]["message"]["content"]}
+        # Întrebările repetate (același mesaj, același portofoliu) nu mai ajung la model;
+        # doar la începutul conversației, un follow-up depinde de istoric
+        cached = None if conversation.turns else chat_cache.get(message, portfolio_context)
+        if cached is not None:
+            conversation.add_turn(message, cached)
+            return {"response": cached, "cached": True, "session_id": conversation.session_id}
+
+        payload = await build_chat_payload(message, user_id, portfolio_context=portfolio_context,
+                                           conversation=conversation)
+        async with llm_admission.slot(admission_key(request, user_id)):
+            with span("llm"):
+                response = await get_llm_client().post(OLLAMA_URL, json=payload, timeout=60.0)
+        data = response.json()
+        content = data["choices"][0]["message"]["content"]
+        if not conversation.turns:
+            chat_cache.put(message, portfolio_context, content)
+        conversation.add_turn(message, content)
+        return {"response": content, "session_id": conversation.session_id}
+    except UserLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
     except Exception as e:
-        print(f"Chatbot error: {e}")
-        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
\ No newline at end of file
+        logger.exception("Chatbot error: %s", e)
+        raise HTTPException(status_code=500, detail=f"Error processing request: {str(e)}")
+
+class ReleasingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse care apelează on_close după ce răspunsul se termină, oricum s-ar termina:
+    și când clientul pleacă înainte ca generatorul să fie pornit (atunci `finally`-ul lui nu rulează).
+    """
+
+    def __init__(self, content, on_close, **kwargs):
+        super().__init__(content, **kwargs)
+        self._on_close = on_close
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._on_close()
+
+def sse_event(data: dict) -> str:
+    return f"data: {json.dumps(data)}\n\n"
+
+async def stream_ollama_tokens(payload: dict):
+    """Generator peste token-urile emise de Ollama (format OpenAI: linii "data: {...}")."""
+    # read=None: între token-uri pot trece câteva secunde pe CPU
+    timeout = httpx.Timeout(60.0, read=None)
+    with span("llm"):
+        async with get_llm_client().stream("POST", OLLAMA_URL, json=payload, timeout=timeout) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.startswith("data:"):
+                    continue
+                data = line[len("data:"):].strip()
+                if data == "[DONE]":
+                    break
+                chunk = json.loads(data)
+                choices = chunk.get("choices") or []
+                if not choices:
+                    continue
+                token = (choices[0].get("delta") or {}).get("content")
+                if token:
+                    yield token
+
+@router.post("/chat/stream")
+async def chat_with_mistral_stream(
+    request: Request,
+    message: str = Body(...),
+    user_id: str = Body(...),
+    session_id: Optional[str] = Body(None)
+):
+    """
+    Varianta cu streaming a /chat: token-urile sunt trimise ca Server-Sent Events
+    pe măsură ce Ollama le generează. Dacă clientul închide conexiunea, generarea e oprită.
+    Id-ul sesiunii este trimis în header-ul X-Session-Id.
+    """
+    conversation = resolve_session(request, session_id, user_id)
+    headers = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no", "X-Session-Id": conversation.session_id}
+    portfolio_context = await get_user_portfolio(user_id)
+    first_turn = not conversation.turns
+    cached = chat_cache.get(message, portfolio_context) if first_turn else None
+    if cached is not None:
+        conversation.add_turn(message, cached)
+
+        async def cached_stream():
+            yield sse_event({"token": cached, "cached": True})
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(cached_stream(), media_type="text/event-stream", headers=headers)
+
+    payload = await build_chat_payload(message, user_id, stream=True, portfolio_context=portfolio_context,
+                                       conversation=conversation)
+    # Locul în coada LLM e ocupat până se termină stream-ul. E cerut înainte de răspuns, ca
+    # 429/503 să ajungă ca status HTTP; eliberarea se face o singură dată, din primul loc care ajunge
+    slot_key = admission_key(request, user_id)
+    try:
+        await llm_admission.acquire(slot_key)
+    except UserLimitError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    released = False
+
+    def release_slot():
+        nonlocal released
+        if not released:
+            released = True
+            llm_admission.release(slot_key)
+
+    async def event_stream():
+        tokens = []
+        try:
+            async for token in stream_ollama_tokens(payload):
+                if await request.is_disconnected():
+                    # Ieșirea din generator închide și conexiunea către Ollama
+                    break
+                tokens.append(token)
+                yield sse_event({"token": token})
+            else:
+                # doar răspunsurile complete ajung în cache și în istoric
+                answer = "".join(tokens)
+                if first_turn:
+                    chat_cache.put(message, portfolio_context, answer)
+                conversation.add_turn(message, answer)
+            yield "data: [DONE]\n\n"
+        except Exception as e:
+            logger.exception("Chatbot stream error: %s", e)
+            yield sse_event({"error": f"Error processing request: {str(e)}"})
+        finally:
+            release_slot()
+
+    try:
+        return ReleasingStreamingResponse(event_stream(), release_slot, media_type="text/event-stream",
+                                          headers=headers)
+    except BaseException:
+        release_slot()
+        raise
+
+@router.get("/metrics")
+async def chatbot_metrics():
+    """Starea cozii de admitere către LLM și a cache-ului de răspunsuri."""
+    return {**llm_admission.metrics(), "cache": chat_cache.metrics(), "sessions": len(conversation_store)}
@@ -2,10 +2,11 @@ from fastapi import APIRouter, HTTPException
 from models.user import User
 from models.trade import Trade
 from blockchain.utils import get_trades_from_chain
+from fast_json import FastJSONResponse
 
 router = APIRouter()
 
-@router.get("/", response_model=list)
+@router.get("/", response_class=FastJSONResponse)
 async def get_leaderboard():
     users = await User.find_all().to_list()
     leaderboard = []
@@ -40,4 +41,4 @@ async def get_leaderboard():
 
     leaderboard.sort(key=lambda x: x["total_profit"], reverse=True)
 
-    return leaderboard
+    return FastJSONResponse(leaderboard)
@@ -1,16 +1,23 @@
-from fastapi import APIRouter, HTTPException, Request
-import yfinance as yf
+from fastapi import APIRouter, HTTPException, Request, Query
 from typing import List, Optional, Dict, Any, Union
 from pydantic import BaseModel, Field, validator
-import traceback
+import hashlib
+import os
 import sys
 import json
+import logging
 import time
 from datetime import datetime
 
-router = APIRouter()
+from bson import ObjectId
+
+from models.news import NewsArticle
+from models.portfolio import Portfolio
+from news_index import news_index
+from response_cache import response_cache
 
-print("News router module loaded!")  # Debug la încărcarea modulului
+router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class NewsItem(BaseModel):
     id: Optional[str] = None
@@ -27,203 +34,77 @@ class NewsItem(BaseModel):
         extra = "allow"
         arbitrary_types_allowed = True
 
+NEWS_FEED_LIMIT = 20
+NEWS_CACHE_TTL = float(os.getenv("NEWS_CACHE_TTL", "60"))
+
+async def get_latest_news(limit: int = NEWS_FEED_LIMIT):
+    """Ultimele știri din colecția "news" (populată de news_ingest), o singură interogare pe index."""
+    # Cerem puțin mai mult ca să rămână `limit` știri după eliminarea duplicatelor sindicalizate
+    articles = await NewsArticle.find_all().sort(-NewsArticle.providerPublishTime).limit(limit * 2).to_list()
+    unique = [a.to_api() for a in articles if not news_index.is_duplicate(a.news_id)]
+    return unique[:limit]
+
 @router.get("/", response_model=List[NewsItem])
-async def get_financial_news():
+async def get_financial_news(request: Request):
     """
     Get general financial news
     """
-    print("GET /news endpoint called")
-
-
-    tickers_to_try = [
-        "AAPL", "MSFT", "GOOG", "AMZN", "SPY", "QQQ", "TSLA", "META", "NVDA", "JPM",
-        "GE", "BAC", "F", "AMD", "INTC", "WFC", "PFE", "DIS", "XOM", "WMT",
-        "^GSPC", "^DJI", "^IXIC"  
-    ]
-
-    all_news = []
-
-    # Încercăm fiecare ticker până găsim știri
-    for ticker in tickers_to_try:
-        try:
-            print(f"Fetching news for {ticker}")
-            stock = yf.Ticker(ticker)
-            
-            # Verificăm explicit dacă obiectul are atributul news și dacă conține items
-            if hasattr(stock, "news") and stock.news and len(stock.news) > 0:
-                news_items = stock.news
-                print(f"Found {len(news_items)} news items for {ticker}")
-                all_news.extend(news_items)
-                
-                # Dacă am găsit destule știri, ne oprim
-                if len(all_news) >= 30:
-                    print(f"Reached sufficient news items: {len(all_news)}")
-                    break
-        except Exception as e:
-            # Log eroarea dar continuăm cu următorul ticker
-            print(f"Error fetching news for {ticker}: {str(e)}")
-            print(f"Type of exception: {type(e).__name__}")
-            continue
-
-    # Dacă nu am găsit nicio știre, returnăm o listă goală
-    if not all_news:
-        print("No news found from any ticker.")
-        return []
-
-    # Eliminăm duplicatele folosind ID-urile
-    seen_ids = set()
-    unique_news = []
-
-    for item in all_news:
-        # Verificăm dacă item-ul e un dicționar valid
-        if not isinstance(item, dict):
-            print(f"Skipping non-dict news item: {type(item)}")
-            continue
-            
-        # Extragem sau generăm ID-ul
-        item_id = item.get("id")
-        
-        # Adăugăm știrea dacă ID-ul e unic
-        if item_id and item_id not in seen_ids:
-            seen_ids.add(item_id)
-            unique_news.append(item)
-        # Sau generăm un ID nou dacă nu există
-        elif not item_id:
-            generated_id = f"gen-{len(seen_ids)}"
-            item["id"] = generated_id
-            seen_ids.add(generated_id)
-            unique_news.append(item)
-
-    print(f"Found {len(unique_news)} unique news items")
-
-    # Procesăm și returnăm știrile (maxim 20)
-    processed_news = process_yfinance_news(unique_news[:20])
-
-    # Verificăm dacă procesarea a returnat rezultate
-    if not processed_news:
-        print("No processed news after filtering.")
-        return []
-
-    print(f"Returning {len(processed_news)} news items")
-    return processed_news
+    # invalidat de news_ingest după fiecare ingestie (tag "news")
+    return await response_cache.respond(request, "news", get_latest_news, ttl=NEWS_CACHE_TTL, tags=("news",))
 
 
 @router.get("/all", response_model=List[NewsItem])
-async def get_all_financial_news():
+async def get_all_financial_news(request: Request):
     """
     Endpoint alternativ pentru știrile generale de piață
     """
-    print("GET /news/all endpoint called")
-
-    # Începem cu indici de piață pentru știri mai generale
-    tickers_to_try = [
-        "^GSPC", "^DJI", "^IXIC",  # Indici pentru știri generale
-        "SPY", "QQQ", "DIA",       # ETF-uri pentru indici
-        "AAPL", "MSFT", "GOOG", "AMZN", "TSLA", "META", "NVDA", "JPM",
-        "GE", "BAC", "F", "AMD", "INTC", "WFC", "PFE", "DIS", "XOM", "WMT"
-    ]
-
-    all_news = []
-
-    # Încercăm fiecare ticker până găsim știri
-    for ticker in tickers_to_try:
-        try:
-            print(f"Fetching news for {ticker}")
-            stock = yf.Ticker(ticker)
-            
-            # Verificăm explicit dacă obiectul are atributul news și dacă conține items
-            if hasattr(stock, "news") and stock.news and len(stock.news) > 0:
-                news_items = stock.news
-                print(f"Found {len(news_items)} news items for {ticker}")
-                all_news.extend(news_items)
-                
-                # Dacă am găsit destule știri, ne oprim
-                if len(all_news) >= 30:
-                    print(f"Reached sufficient news items: {len(all_news)}")
-                    break
-        except Exception as e:
-            # Log eroarea dar continuăm cu următorul ticker
-            print(f"Error fetching news for {ticker}: {str(e)}")
-            print(f"Type of exception: {type(e).__name__}")
-            continue
-
-    # Dacă nu am găsit nicio știre, returnăm o listă goală
-    if not all_news:
-        print("No news found from any ticker.")
-        return []
-
-    # Eliminăm duplicatele folosind ID-urile
-    seen_ids = set()
-    unique_news = []
-
-    for item in all_news:
-        # Verificăm dacă item-ul e un dicționar valid
-        if not isinstance(item, dict):
-            print(f"Skipping non-dict news item: {type(item)}")
-            continue
-            
-        # Extragem sau generăm ID-ul
-        item_id = item.get("id")
-        
-        # Adăugăm știrea dacă ID-ul e unic
-        if item_id and item_id not in seen_ids:
-            seen_ids.add(item_id)
-            unique_news.append(item)
-        # Sau generăm un ID nou dacă nu există
-        elif not item_id:
-            generated_id = f"gen-{len(seen_ids)}"
-            item["id"] = generated_id
-            seen_ids.add(generated_id)
-            unique_news.append(item)
-
-    print(f"Found {len(unique_news)} unique news items")
-
-    # Procesăm și returnăm știrile (maxim 20)
-    processed_news = process_yfinance_news(unique_news[:20])
-    
-    print(f"Returning {len(processed_news)} processed news items")
-    return processed_news
+    return await response_cache.respond(request, "news", get_latest_news, ttl=NEWS_CACHE_TTL, tags=("news",))
 
 @router.get("/by-ticker/{ticker}")
-async def get_ticker_news(ticker: str):
+async def get_ticker_news(ticker: str, offset: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100)):
     """
-    Get news specific to a ticker symbol
+    Get news specific to a ticker symbol (din indexul în memorie; un ticker neurmărit de ingestie
+    e adăugat la runda următoare, dacă există în "stocks")
     """
-    print(f"GET /by-ticker/{ticker} endpoint called")
-    
+    from news_ingest import news_ingester  # news_ingest importă process_yfinance_news de aici
     try:
-        print(f"Creating yf.Ticker object for {ticker}")
-        stock = yf.Ticker(ticker)
-        
-        has_news = hasattr(stock, 'news')
-        print(f"Ticker {ticker} has news attribute: {has_news}")
-        
-        if has_news and stock.news:
-            news_items = stock.news
-            print(f"Found {len(news_items)} news items for {ticker}")
-            
-            # Verificăm și printăm structura primului element pentru debugging
-            if news_items and len(news_items) > 0:
-                print(f"First news item keys: {list(news_items[0].keys())}")
-                if 'content' in news_items[0]:
-                    print(f"Content keys: {list(news_items[0]['content'].keys()) if isinstance(news_items[0]['content'], dict) else 'Content is not a dict'}")
-            
-            # Procesăm și returnăm știrile
-            return process_yfinance_news(news_items)
-        else:
-            print(f"No news found for ticker {ticker}")
-            return []
+        await news_ingester.request_ticker(ticker)
     except Exception as e:
-        print(f"Error fetching news for ticker {ticker}: {str(e)}")
-        print(f"Exception type: {type(e).__name__}")
-        print(f"Traceback: {traceback.format_exc()}")
+        logger.warning(f"Could not request news tracking for {ticker}: {e}")
+    return news_index.query([ticker], offset=offset, limit=limit)
+
+@router.get("/portfolio/{user_id}")
+async def get_portfolio_news(user_id: str, offset: int = Query(0, ge=0), limit: int = Query(20, ge=1, le=100)):
+    """
+    Știrile relevante pentru tickerele din portofoliul userului
+    """
+    try:
+        user_oid = ObjectId(user_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid user ID format")
+    portfolio = await Portfolio.find_one(Portfolio.user_id == user_oid)
+    if not portfolio or not portfolio.holdings:
         return []
+    return news_index.query([h.symbol for h in portfolio.holdings], offset=offset, limit=limit)
+
+def stable_news_id(item: dict, title: Optional[str], publisher: str, link: Optional[str], published) -> str:
+    """
+    Id pentru o știre fără id de la yfinance, derivat doar din conținut (nu din ora ingestiei),
+    ca re-ingestia aceleiași știri să facă upsert peste același document.
+    """
+    if link:
+        key = f"link|{link}"
+    elif title:
+        key = f"{publisher}|{title}|{published}"
+    else:
+        key = json.dumps(item, sort_keys=True, default=str)
+    return "news-" + hashlib.sha1(key.encode("utf-8")).hexdigest()
 
 def process_yfinance_news(raw_news):
     """
     Process news from yfinance to match our frontend expected format
     """
-    print(f"Processing {len(raw_news)} news items")
+    logger.debug("Processing %d news items", len(raw_news))
     processed_news = []
     current_timestamp = int(time.time())
     
@@ -231,7 +112,7 @@ def process_yfinance_news(raw_news):
         try:
             # Verificăm structura item-ului
             if not isinstance(item, dict):
-                print(f"Item {i} is not a dictionary, skipping")
+                logger.debug("Item %d is not a dictionary, skipping", i)
                 continue
                 
             # Extragem content din item
@@ -239,16 +120,14 @@ def process_yfinance_news(raw_news):
             if 'content' in item and isinstance(item['content'], dict):
                 content = item['content']
             
-            # Generăm id unic dacă nu există
-            news_id = item.get('id') or content.get('id') or f"news-{current_timestamp}-{i}"
-            
             # Determinăm titlul
             title = None
             if 'title' in content:
                 title = content['title']
             elif 'title' in item:
                 title = item['title']
-            else:
+            source_title = title
+            if title is None:
                 title = f"Financial News Update {i+1}"
             
             # Determinăm publisher
@@ -278,7 +157,7 @@ def process_yfinance_news(raw_news):
                         dt = datetime.fromisoformat(pub_date_raw.replace('Z', '+00:00'))
                         pub_date = int(dt.timestamp())
                     except Exception as e:
-                        print(f"Couldn't parse date {pub_date_raw}: {str(e)}")
+                        logger.debug("Couldn't parse date %s: %s", pub_date_raw, e)
                         pub_date = current_timestamp
                 else:
                     pub_date = pub_date_raw
@@ -291,11 +170,15 @@ def process_yfinance_news(raw_news):
                         dt = datetime.fromisoformat(pub_date_raw.replace('Z', '+00:00'))
                         pub_date = int(dt.timestamp())
                     except Exception as e:
-                        print(f"Couldn't parse date {pub_date_raw}: {str(e)}")
+                        logger.debug("Couldn't parse date %s: %s", pub_date_raw, e)
                         pub_date = current_timestamp
                 else:
                     pub_date = pub_date_raw
             
+            # Id-ul de la yfinance, altfel unul derivat din conținut (stabil între ingestii)
+            news_id = item.get('id') or content.get('id') or stable_news_id(
+                item, source_title, publisher, link, content.get('pubDate') or item.get('providerPublishTime'))
+            
             # Determinăm tipul știrii
             news_type = "STORY"
             if 'contentType' in content:
@@ -342,18 +225,16 @@ def process_yfinance_news(raw_news):
             
             # Adăugăm știrea în lista procesată
             processed_news.append(news_item)
-            print(f"Processed news item {i+1}: {news_item['title'][:30]}...")
+            logger.debug("Processed news item %d: %.30s", i + 1, news_item["title"])
             
         except Exception as e:
-            print(f"Error processing news item {i}: {str(e)}")
-            print(traceback.format_exc())
+            logger.warning("Error processing news item %d: %s", i, e, exc_info=True)
             continue
     
-    print(f"Returning {len(processed_news)} processed news items")
+    logger.debug("Returning %d processed news items", len(processed_news))
     return processed_news
 
 @router.get("/test")
 async def test_news_endpoint():
     """Test endpoint to check if the news router is working"""
-    print("GET /test endpoint called")
     return {"status": "ok", "message": "News API is working"}
\ No newline at end of file
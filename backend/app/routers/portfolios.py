@@ -2,11 +2,16 @@ from fastapi import APIRouter, HTTPException
 from models.portfolio import Portfolio
 from models.user import User  # asigură-te că ai acest import!
 from bson import ObjectId
-import yfinance as yf
+from lazy_import import lazy_module
+import logging
 from datetime import datetime
 from pydantic import BaseModel
+from portfolio_snapshot import portfolio_snapshots
+from metrics import span
 
+yf = lazy_module("yfinance")
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class PortfolioCreate(BaseModel):
     user_id: str
@@ -39,6 +44,8 @@ async def create_portfolio(portfolio_data: PortfolioCreate):
     )
     
     await new_portfolio.save()
+    # chatbot-ul poate avea în memorie "fără portofoliu" pentru acest user
+    portfolio_snapshots.update_from_portfolio(user_id, new_portfolio)
     
     return {
         "status": "created",
@@ -65,7 +72,7 @@ async def get_portfolio(user_id: str):
         raise HTTPException(status_code=404, detail="User not found")
 
     # Log pentru debugging
-    print(f"Portfolio for {user_id}: {len(portfolio.holdings)} holdings")
+    logger.debug("Portfolio for %s: %d holdings", user_id, len(portfolio.holdings))
 
     if not portfolio.holdings:
         return {
@@ -82,46 +89,49 @@ async def get_portfolio(user_id: str):
     price_update_count = 0
     for holding in portfolio.holdings:
         try:
-            print(f"Fetching current price for {holding.symbol}...")
             ticker = yf.Ticker(holding.symbol)
-            price = ticker.info.get("regularMarketPrice", 0.0)
-            print(f"Symbol: {holding.symbol}, Price from API: {price}")
+            with span("yfinance"):
+                price = ticker.info.get("regularMarketPrice", 0.0)
+            logger.debug("Symbol %s, price from API: %s", holding.symbol, price)
             
             if price and price > 0:
                 holding.current_price = price
                 holding.market_value = round(price * holding.quantity, 2)
                 price_update_count += 1
             else:
-                print(f"Warning: Got zero price for {holding.symbol}")
+                logger.debug("Got zero price for %s, trying history", holding.symbol)
                 # Încercăm o metodă alternativă pentru a obține prețul
                 try:
-                    hist = ticker.history(period="1d")
+                    with span("yfinance"):
+                        hist = ticker.history(period="1d")
                     if not hist.empty:
                         last_price = hist['Close'].iloc[-1]
-                        print(f"Got historical price: {last_price}")
+                        logger.debug("Got historical price for %s: %s", holding.symbol, last_price)
                         holding.current_price = last_price
                         holding.market_value = round(last_price * holding.quantity, 2)
                         price_update_count += 1
                 except Exception as e:
-                    print(f"Failed to get historical price: {str(e)}")
+                    logger.warning("Failed to get historical price for %s: %s", holding.symbol, e)
             
             holding.last_updated = datetime.utcnow()
         except Exception as e:
-            print(f"Error updating price for {holding.symbol}: {str(e)}")
+            logger.warning("Error updating price for %s: %s", holding.symbol, e)
             # Nu modificăm prețul dacă există eroare, păstrăm valoarea existentă
 
-    print(f"Updated prices for {price_update_count} out of {len(portfolio.holdings)} holdings")
+    logger.info("Updated prices for %d out of %d holdings", price_update_count, len(portfolio.holdings))
 
     # Forțăm salvarea actualizărilor
     try:
         await portfolio.save()
-        print(f"Portfolio saved successfully")
+        # Prețuri noi: și rezumatul folosit de chatbot
+        portfolio_snapshots.update_from_portfolio(user_id, portfolio)
     except Exception as e:
-        print(f"Error saving portfolio: {str(e)}")
+        logger.error("Error saving portfolio for %s: %s", user_id, e)
 
     # Verificăm dacă prețurile au fost actualizate corect
-    for holding in portfolio.holdings:
-        print(f"After save - Symbol: {holding.symbol}, Current price: {holding.current_price}")
+    if logger.isEnabledFor(logging.DEBUG):
+        for holding in portfolio.holdings:
+            logger.debug("After save - symbol %s, current price %s", holding.symbol, holding.current_price)
 
     # Construim răspunsul
     return {
@@ -1,16 +1,14 @@
-from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import List, Dict, Any, Optional
 from models.user import User
 from models.stock import Stock
 from models.portfolio import Portfolio, Holding
 from models.trade import Trade
 from motor.motor_asyncio import AsyncIOMotorClient
-import pandas as pd
-import numpy as np
-from scipy import stats
-from sklearn.preprocessing import MinMaxScaler
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.neighbors import NearestNeighbors
+from lazy_import import lazy_module
+# pandas/numpy se încarcă la primul calcul, nu la pornire; sklearn se importă local unde e folosit
+pd = lazy_module("pandas")
+np = lazy_module("numpy")
 from datetime import datetime, timedelta
 import asyncio
 from pymongo import DESCENDING
@@ -19,13 +17,17 @@ import json
 import logging
 import random  # Pentru simulări
 from functools import lru_cache
+import os
+from response_cache import response_cache
+from fast_json import FastJSONResponse
 
 # Configurare logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+MARKET_OVERVIEW_CACHE_TTL = float(os.getenv("MARKET_OVERVIEW_CACHE_TTL", "300"))
+
 # Implementări pentru calcularea indicatorilor tehnici
 def calculate_sma(data, timeperiod=20):
     """Implementare pentru Simple Moving Average (SMA)"""
@@ -1465,8 +1467,12 @@ def generate_investment_thesis(stock_details):
     return thesis
 
 @router.get("/", response_model=Dict[str, Any])
-async def get_market_overview():
+async def get_market_overview(request: Request):
     """Obține o privire de ansamblu asupra pieței."""
+    return await response_cache.respond(request, "market_overview", build_market_overview,
+                                        ttl=MARKET_OVERVIEW_CACHE_TTL, tags=("stocks",))
+
+async def build_market_overview():
     market_trend = await analyze_market_trend()
     sector_performance = await get_sector_performance()
     
@@ -1813,7 +1819,7 @@ async def get_recommendations(
         logger.error(f"Error generating recommendations: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail="Failed to generate recommendations")
     
-@router.get("/{user_id}/detail/{symbol}", response_model=Dict[str, Any])
+@router.get("/{user_id}/detail/{symbol}", response_class=FastJSONResponse)
 async def get_recommendation_detail(user_id: str, symbol: str):
     """
     Returns complete details for a specific stock recommendation.
@@ -2057,7 +2063,8 @@ async def get_recommendation_detail(user_id: str, symbol: str):
             "holding_details": holding_details
         }
         
-        return result
+        # Valorile vin din pandas (np.float64, np.bool_, NaN): fast_json le codează direct
+        return FastJSONResponse(result)
     except HTTPException as e:
         raise e
     except Exception as e:
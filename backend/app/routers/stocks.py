@@ -1,11 +1,16 @@
-from fastapi import APIRouter, HTTPException
+import os
+
+from fastapi import APIRouter, HTTPException, Request
 from models.stock import Stock
 from typing import List
 
+from response_cache import response_cache
+
 router = APIRouter()
 
-@router.get("/")
-async def get_stocks():
+STOCKS_CACHE_TTL = float(os.getenv("STOCKS_CACHE_TTL", "300"))
+
+async def list_stocks():
     stocks = await Stock.find_all().to_list()
     return [
         {
@@ -19,6 +24,11 @@ async def get_stocks():
         for stock in stocks
     ]
 
+@router.get("/")
+async def get_stocks(request: Request):
+    # Lista completă e aceeași pentru toți clienții: servită serializată din cache, cu ETag
+    return await response_cache.respond(request, "stocks", list_stocks, ttl=STOCKS_CACHE_TTL, tags=("stocks",))
+
 # Add this new endpoint to get a single stock by symbol
 @router.get("/{symbol}")
 async def get_stock_by_symbol(symbol: str):
@@ -4,10 +4,14 @@ from models.portfolio import Portfolio
 from pydantic import BaseModel
 from bson import ObjectId
 from datetime import datetime
+import logging
 
-from blockchain.utils import register_trade_on_chain
+from models.outbox import OutboxEvent
+from outbox import outbox_transaction, outbox_worker
+from fast_json import FastJSONResponse
 
 router = APIRouter()
+logger = logging.getLogger(__name__)
 
 class TradeRequest(BaseModel):
     user_id: str
@@ -67,7 +71,6 @@ async def create_trade(trade: TradeRequest):
         status="completed",
         timestamp=datetime.utcnow(),
     )
-    await new_trade.insert()
 
     # Update portfolio cash
     if trade.trade_type == "buy":
@@ -126,23 +129,26 @@ async def create_trade(trade: TradeRequest):
                     holding.last_updated = datetime.utcnow()
                 break
     
-    # Save updated portfolio
-    await portfolio.save()
+    # Trade-ul, portofoliul și efectele secundare se scriu împreună; outbox worker-ul
+    # se ocupă de blockchain, achievements și invalidări, deci răspunsul nu așteaptă după ele
+    user_payload = {"user_id": str(user_oid)}
+    async with outbox_transaction() as session:
+        await new_trade.insert(session=session)
+        await portfolio.save(session=session)
+        await OutboxEvent.insert_many([
+            OutboxEvent(event_type="register_trade", payload={
+                **user_payload,
+                "trade_id": str(new_trade.id),
+                "symbol": trade.symbol,
+                "quantity": trade.quantity,
+                "trade_type": trade.trade_type,
+                "execution_price": trade.execution_price,
+            }),
+            OutboxEvent(event_type="check_achievements", payload=user_payload),
+            OutboxEvent(event_type="portfolio_changed", payload=user_payload),
+        ], session=session)
+    outbox_worker.notify()
 
-    # Blockchain registration (unchanged)
-    try:
-        blockchain_result = register_trade_on_chain({
-            "user_id": user_oid,
-            "symbol": trade.symbol,
-            "quantity": trade.quantity,
-            "execution_price": trade.execution_price
-        })
-        if hasattr(new_trade, "blockchain_tx"):
-            new_trade.blockchain_tx = blockchain_result.get("tx_hash")
-            await new_trade.save()
-    except Exception as e:
-        print(f"Blockchain registration failed: {str(e)}")
-    
     # Return trade confirmation
     return {
         "trade_id": str(new_trade.id),
@@ -155,7 +161,7 @@ from blockchain.utils import get_trades_from_chain
 
 # Adaugă acest endpoint nou la sfârșitul fișierului trades.py
 
-@router.get("/user/{user_id}")
+@router.get("/user/{user_id}", response_class=FastJSONResponse)
 async def get_user_trades(user_id: str):
     try:
         user_oid = ObjectId(user_id)
@@ -164,11 +170,11 @@ async def get_user_trades(user_id: str):
     
     trades = await Trade.find(Trade.user_id == user_oid).sort(-Trade.timestamp).to_list()
     
-    # Convertește ObjectId la string pentru a putea fi serializat în JSON
-    return [
+    # Codat direct de FastJSONResponse (ObjectId/datetime incluse), fără jsonable_encoder
+    return FastJSONResponse([
         {
-            "id": str(trade.id),
-            "user_id": str(trade.user_id),
+            "id": trade.id,
+            "user_id": trade.user_id,
             "symbol": trade.symbol,
             "quantity": trade.quantity,
             "trade_type": trade.trade_type,
@@ -180,7 +186,7 @@ async def get_user_trades(user_id: str):
             "blockchain_tx": getattr(trade, "blockchain_tx", None)
         }
         for trade in trades
-    ]
+    ])
 
 @router.get("/onchain/{user_address}", response_model=list)
 def get_onchain_trades(user_address: str):
@@ -188,7 +194,5 @@ def get_onchain_trades(user_address: str):
         trades = get_trades_from_chain(user_address)
         return trades
     except Exception as e:
-        import traceback
-        print("❌ Blockchain read error:")
-        traceback.print_exc() 
+        logger.exception("Blockchain read error for %s", user_address)
         raise HTTPException(status_code=500, detail=f"Blockchain read error: {str(e)}")
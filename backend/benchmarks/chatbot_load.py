@@ -0,0 +1,155 @@
+"""
+Test de încărcare pentru /api/chatbot/chat și /api/chatbot/chat/stream.
+
+Trimite --requests cereri cu --concurrency clienți simultani și raportează latența totală,
+time-to-first-token (la streaming) ca percentile, rata de erori și throughput-ul.
+--repeat-ratio controlează ce fracțiune din mesaje sunt întrebări repetate (pentru cache).
+
+    python backend/benchmarks/fake_llm_server.py --port 11500 &
+    (cd backend/app && OLLAMA_URL=http://127.0.0.1:11500/v1/chat/completions uvicorn main:app --port 8000) &
+    python backend/benchmarks/chatbot_load.py --concurrency 16 --requests 200 --stream
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import Counter
+
+import httpx
+
+FAQ = [
+    "What is a stock?",
+    "How do ETFs work?",
+    "What is a dividend?",
+    "How is my portfolio doing?",
+    "What does P/E ratio mean?",
+    "Should I diversify my portfolio?",
+    "What is market capitalization?",
+    "Ce este o obligațiune?",
+]
+
+
+def percentiles(values, points=(50, 90, 95, 99)):
+    if not values:
+        return {}
+    ordered = sorted(values)
+    result = {}
+    for p in points:
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        result[f"p{p}"] = round(ordered[idx] * 1000, 1)
+    result["mean"] = round(sum(ordered) / len(ordered) * 1000, 1)
+    result["max"] = round(ordered[-1] * 1000, 1)
+    return result
+
+
+def make_message(i: int, repeat_ratio: float, rng: random.Random) -> str:
+    if rng.random() < repeat_ratio:
+        return rng.choice(FAQ)
+    return f"{rng.choice(FAQ)} (variant {i})"
+
+
+async def one_request(client, url, body, stream):
+    start = time.perf_counter()
+    ttft = None
+    if not stream:
+        response = await client.post(url, json=body)
+        response.raise_for_status()
+        return time.perf_counter() - start, None, response.status_code
+
+    async with client.stream("POST", url, json=body) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            data = line[len("data:"):].strip()
+            if data == "[DONE]":
+                break
+            if "error" in json.loads(data):
+                raise RuntimeError(json.loads(data)["error"])
+            if ttft is None:
+                ttft = time.perf_counter() - start
+    return time.perf_counter() - start, ttft, response.status_code
+
+
+async def run(args):
+    url = args.base_url.rstrip("/") + ("/api/chatbot/chat/stream" if args.stream else "/api/chatbot/chat")
+    rng = random.Random(args.seed)
+    # id-uri ObjectId valide, fără portofoliu: limita per user din coada LLM nu se aplică tuturor deodată
+    user_ids = args.user_ids or [f"{rng.getrandbits(96):024x}" for _ in range(args.users)]
+    bodies = [
+        {"message": make_message(i, args.repeat_ratio, rng), "user_id": user_ids[i % len(user_ids)]}
+        for i in range(args.requests)
+    ]
+    latencies, ttfts = [], []
+    statuses = Counter()
+    errors = Counter()
+    queue = asyncio.Queue()
+    for body in bodies:
+        queue.put_nowait(body)
+
+    async def worker(client):
+        while True:
+            try:
+                body = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                latency, ttft, status = await one_request(client, url, body, args.stream)
+                latencies.append(latency)
+                if ttft is not None:
+                    ttfts.append(ttft)
+                statuses[status] += 1
+            except httpx.HTTPStatusError as e:
+                statuses[e.response.status_code] += 1
+                errors[f"http_{e.response.status_code}"] += 1
+            except Exception as e:
+                errors[type(e).__name__] += 1
+
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+    failed = sum(errors.values())
+    return {
+        "benchmark": "chatbot_load",
+        "url": url,
+        "concurrency": args.concurrency,
+        "requests": args.requests,
+        "repeat_ratio": args.repeat_ratio,
+        "seconds": round(elapsed, 3),
+        "requests_per_second": round(args.requests / elapsed, 2) if elapsed > 0 else None,
+        "error_rate": round(failed / args.requests, 4) if args.requests else 0.0,
+        "errors": dict(errors),
+        "status_codes": {str(k): v for k, v in statuses.items()},
+        "latency_ms": percentiles(latencies),
+        "ttft_ms": percentiles(ttfts) if args.stream else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--stream", action="store_true", help="folosește /chat/stream și măsoară TTFT")
+    parser.add_argument("--repeat-ratio", type=float, default=0.5)
+    parser.add_argument("--users", type=int, default=50, help="câți useri sintetici trimit cereri")
+    parser.add_argument("--user-ids", nargs="+", help="id-uri explicite (ex. guest) în loc de useri sintetici")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
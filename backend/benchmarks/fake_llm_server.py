@@ -0,0 +1,129 @@
+"""
+Server LLM fals, compatibil cu /v1/chat/completions (OpenAI / Ollama), pentru teste de încărcare.
+
+Simulează costul unei generări pe CPU: o latență până la primul token (prefill) și un ritm
+fix de tokeni pe secundă, cu sau fără streaming. Câte generări rulează simultan se poate
+limita cu --slots, ca la un proces Ollama real.
+
+    python backend/benchmarks/fake_llm_server.py --port 11500 --ttft 0.4 --tokens-per-second 20
+    OLLAMA_URL=http://127.0.0.1:11500/v1/chat/completions uvicorn main:app   (din backend/app)
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+WORDS = (
+    "the market portfolio stock price index fund risk return dividend growth value sector "
+    "volatility investor trading long term short position yield bond equity earnings"
+).split()
+
+
+def create_app(ttft: float, tokens_per_second: float, response_tokens: int, jitter: float, slots: int) -> FastAPI:
+    app = FastAPI()
+    semaphore = asyncio.Semaphore(slots) if slots > 0 else None
+    stats = {"requests": 0, "active": 0, "tokens": 0}
+
+    def tokens(seed: str):
+        rng = random.Random(seed)
+        return [rng.choice(WORDS) + " " for _ in range(response_tokens)]
+
+    def delay(base: float) -> float:
+        return max(0.0, base * (1 + random.uniform(-jitter, jitter)))
+
+    async def generate(seed: str):
+        await asyncio.sleep(delay(ttft))
+        for token in tokens(seed):
+            yield token
+            stats["tokens"] += 1
+            await asyncio.sleep(delay(1.0 / tokens_per_second))
+
+    async def run_slot(fn):
+        if semaphore is None:
+            return await fn()
+        async with semaphore:
+            return await fn()
+
+    def chunk(completion_id: str, model: str, delta: dict, finish_reason=None) -> str:
+        body = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+        return f"data: {json.dumps(body)}\n\n"
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        model = body.get("model", "fake")
+        seed = json.dumps(body.get("messages", []))
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        stats["requests"] += 1
+
+        if body.get("stream"):
+            async def event_stream():
+                if semaphore is not None:
+                    await semaphore.acquire()
+                stats["active"] += 1
+                try:
+                    yield chunk(completion_id, model, {"role": "assistant"})
+                    async for token in generate(seed):
+                        yield chunk(completion_id, model, {"content": token})
+                    yield chunk(completion_id, model, {}, "stop")
+                    yield "data: [DONE]\n\n"
+                finally:
+                    stats["active"] -= 1
+                    if semaphore is not None:
+                        semaphore.release()
+
+            return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+        async def complete():
+            stats["active"] += 1
+            try:
+                return "".join([token async for token in generate(seed)])
+            finally:
+                stats["active"] -= 1
+
+        content = await run_slot(complete)
+        return {
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"completion_tokens": response_tokens},
+        }
+
+    @app.get("/stats")
+    async def get_stats():
+        return stats
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11500)
+    parser.add_argument("--ttft", type=float, default=0.5, help="secunde până la primul token")
+    parser.add_argument("--tokens-per-second", type=float, default=20.0)
+    parser.add_argument("--response-tokens", type=int, default=60)
+    parser.add_argument("--jitter", type=float, default=0.1, help="variație relativă a întârzierilor (0.1 = ±10%%)")
+    parser.add_argument("--slots", type=int, default=1, help="generări simultane (0 = nelimitat)")
+    args = parser.parse_args()
+
+    app = create_app(args.ttft, args.tokens_per_second, args.response_tokens, args.jitter, args.slots)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
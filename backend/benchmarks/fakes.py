@@ -0,0 +1,81 @@
+"""
+Servicii externe false, comune benchmark-urilor: yfinance (știri, cotații, istoric).
+
+install_fake_yfinance() trebuie apelat înainte ca aplicația să folosească yfinance; modulele
+aplicației îl încarcă leneș (lazy_module), deci e suficient să rulăm înainte de prima cerere.
+Latența unei cereri "la Yahoo" se simulează cu latency (secunde, blocant, ca biblioteca reală).
+"""
+import random
+import sys
+import time
+import types
+from datetime import datetime, timedelta, timezone
+
+NEWS_PUBLISHERS = ["Reuters", "Bloomberg", "Yahoo Finance", "MarketWatch", "CNBC"]
+
+
+def quote(symbol: str) -> float:
+    """Preț determinist per simbol, ca rulările să fie comparabile."""
+    return round(random.Random(symbol).uniform(5, 900), 2)
+
+
+def fake_raw_news(ticker: str, count: int = 20):
+    """Știri în forma întoarsă de yfinance >= 0.2.5x (câmpurile sub "content")."""
+    rng = random.Random(ticker)
+    # în ultimele ~2 săptămâni, ca știrile să nu fie scoase din news_index pe criteriu de vârstă
+    published = datetime.now(timezone.utc).replace(second=0, microsecond=0) - timedelta(days=14)
+    items = []
+    for i in range(count):
+        # o parte din știri apar la mai multe tickere, ca în realitate
+        news_id = f"{ticker}-{i}" if rng.random() < 0.7 else f"shared-{rng.randrange(50)}"
+        items.append({
+            "id": news_id,
+            "content": {
+                "id": news_id,
+                "title": f"{ticker} headline {i}",
+                "pubDate": (published + timedelta(minutes=rng.randrange(14 * 24 * 60))).isoformat().replace("+00:00", "Z"),
+                "provider": {"displayName": rng.choice(NEWS_PUBLISHERS)},
+                "clickThroughUrl": {"url": f"https://example.com/{news_id}"},
+                "contentType": "STORY",
+                "thumbnail": {"resolutions": [{"url": f"https://example.com/{news_id}.jpg", "width": 140, "height": 140}]},
+                "finance": {"stockTickers": [{"symbol": ticker}, {"symbol": rng.choice(["SPY", "QQQ", "AAPL"])}]},
+            },
+        })
+    return items
+
+
+def install_fake_yfinance(latency: float = 0.0):
+    module = types.ModuleType("yfinance")
+
+    class Ticker:
+        def __init__(self, symbol):
+            self.ticker = symbol
+
+        @staticmethod
+        def _wait():
+            if latency > 0:
+                time.sleep(latency)
+
+        @property
+        def news(self):
+            self._wait()
+            return fake_raw_news(self.ticker)
+
+        @property
+        def info(self):
+            self._wait()
+            return {"symbol": self.ticker, "regularMarketPrice": quote(self.ticker)}
+
+        def history(self, period: str = "1mo", **kwargs):
+            import pandas as pd
+
+            self._wait()
+            days = {"1d": 1, "5d": 5, "1mo": 21, "3mo": 63, "6mo": 126, "1y": 252}.get(period, 21)
+            index = pd.bdate_range(end=datetime(2024, 12, 31), periods=days)
+            close = [quote(self.ticker) * (1 + 0.001 * (i - days)) for i in range(days)]
+            return pd.DataFrame({"Open": close, "High": close, "Low": close, "Close": close,
+                                 "Volume": [1_000_000] * days}, index=index)
+
+    module.Ticker = Ticker
+    sys.modules["yfinance"] = module
+    return module
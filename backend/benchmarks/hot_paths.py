@@ -0,0 +1,434 @@
+"""
+Benchmark offline pentru căile fierbinți ale backend-ului: fără Mongo, yfinance sau nod blockchain.
+
+- Mongo: Beanie peste mongomock_motor (în memorie), populat cu date sintetice deterministe;
+  cu --mongo-uri aceleași scenarii rulează pe un server real, într-o bază temporară;
+- yfinance: modul fals, Ticker(...).news întoarce știri în formatul real (content/provider/...);
+- Web3: contract fals pentru getUserTrades, citit prin ChainReadCache-ul real.
+
+Scenarii: indicators (SMA/EMA/RSI/MACD/ATR pe 500 de simboluri), historical_data (cold și warm),
+recommendations (get_recommendations complet), create_trade (apelanți concurenți),
+leaderboard (10k useri) și news (process_yfinance_news + o ingestie completă).
+mongomock nu are indexuri, deci fiecare find e o scanare; timpii absoluți se compară doar între
+rulări pe același backend (câmpul "backend" din rezultat).
+
+    pip install mongomock-motor pandas
+    cd backend/app
+    python ../benchmarks/hot_paths.py --output before.json
+    python ../benchmarks/hot_paths.py --only leaderboard create_trade --repeat 5
+
+Rezultatul e JSON: per scenariu timpii fiecărei repetiții, min/median/mean și parametrii,
+plus commit-ul curent, ca rulările de pe commit-uri diferite să poată fi comparate direct.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime, timedelta
+
+from fakes import fake_raw_news, install_fake_yfinance
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+SCENARIOS = ["indicators", "historical_data", "recommendations", "create_trade", "leaderboard", "news"]
+SECTORS = ["Technology", "Healthcare", "Finance", "Consumer Staples", "Utilities", "Energy", "Industrials"]
+
+
+# === Fakes ===
+def symbol_names(n):
+    return [f"S{i:04d}" for i in range(n)]
+
+
+class FakeContractCall:
+    def __init__(self, contract, fn_name, args, result):
+        self.contract = contract
+        self.address = contract.address
+        self.fn_name = fn_name
+        self.args = args
+        self.kwargs = {}
+        self._result = result
+
+    def call(self, block_identifier=None):
+        self.contract.calls += 1
+        return self._result
+
+
+class FakeTradeContract:
+    """getUserTrades întoarce câteva trade-uri deterministe per adresă, ca tuple (symbol, amount, is_buy, ts)."""
+    address = "0x000000000000000000000000000000000000bEEF"
+
+    def __init__(self):
+        self.calls = 0
+        self.functions = types.SimpleNamespace(getUserTrades=self._get_user_trades)
+
+    def _get_user_trades(self, user_addr):
+        rng = random.Random(user_addr)
+        trades = [("S%04d" % rng.randrange(100), rng.randint(1, 50), rng.random() < 0.6, 1_700_000_000 + i)
+                  for i in range(rng.randrange(4))]
+        return FakeContractCall(self, "getUserTrades", (user_addr,), trades)
+
+
+class FakeW3:
+    def __init__(self, block_number: int = 1):
+        self.eth = types.SimpleNamespace(block_number=block_number)
+
+
+def install_fake_chain():
+    from blockchain import utils
+    from blockchain.read_cache import ChainReadCache
+
+    contract = FakeTradeContract()
+    read_cache = ChainReadCache(FakeW3())
+    utils.get_trade_contract = lambda: contract
+    utils.get_read_cache = lambda: read_cache
+    return contract, read_cache
+
+
+# === Bază de date ===
+async def init_database(mongo_uri):
+    from beanie import init_beanie
+    from models.news import NewsArticle
+    from models.outbox import OutboxEvent
+    from models.portfolio import Portfolio
+    from models.stock import Stock
+    from models.trade import Trade
+    from models.user import User
+
+    if mongo_uri:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(mongo_uri)
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        client = AsyncMongoMockClient()
+
+    suffix = f"{os.getpid()}_{int(time.time())}"
+    main_db, stocks_db = client[f"bench_sim_{suffix}"], client[f"bench_stocks_{suffix}"]
+    await init_beanie(database=main_db, document_models=[User, Portfolio, Trade, OutboxEvent, NewsArticle])
+    await init_beanie(database=stocks_db, document_models=[Stock])
+
+    async def cleanup():
+        if mongo_uri:
+            await client.drop_database(main_db.name)
+            await client.drop_database(stocks_db.name)
+            client.close()
+
+    return cleanup
+
+
+async def reset_collections(*models):
+    for model in models:
+        await model.get_motor_collection().delete_many({})
+
+
+async def seed_stocks(n: int, rng: random.Random):
+    from models.stock import Stock
+
+    await reset_collections(Stock)
+    await Stock.insert_many([
+        Stock(symbol=symbol, name=f"Company {symbol}", sector=rng.choice(SECTORS),
+              market_cap=rng.uniform(1e9, 2e12), last_price=rng.uniform(5, 900))
+        for symbol in symbol_names(n)
+    ])
+
+
+async def seed_users(n: int, trades_per_user: int, symbols, rng: random.Random, holdings: int = 5):
+    """Useri cu wallet, portofoliu și trade-uri; întoarce id-urile userilor."""
+    from models.portfolio import Holding, Portfolio
+    from models.trade import Trade
+    from models.user import User
+
+    await reset_collections(User, Portfolio, Trade)
+    users = [
+        User(username=f"user{i}", email=f"user{i}@example.com", password_hash="x",
+             wallet_address="0x%040x" % rng.getrandbits(160))
+        for i in range(n)
+    ]
+    await User.insert_many(users)
+    users = await User.find_all().to_list()
+
+    portfolios, trades = [], []
+    now = datetime.utcnow()
+    for user in users:
+        held = rng.sample(symbols, min(holdings, len(symbols)))
+        portfolios.append(Portfolio(user_id=user.id, cash=100_000.0, holdings=[
+            Holding(symbol=s, quantity=rng.randint(1, 100), avg_buy_price=rng.uniform(5, 900),
+                    current_price=rng.uniform(5, 900), market_value=rng.uniform(100, 50_000))
+            for s in held
+        ]))
+        for j in range(trades_per_user):
+            trades.append(Trade(user_id=user.id, symbol=rng.choice(held), trade_type=rng.choice(["buy", "sell"]),
+                                order_type="market", quantity=rng.randint(1, 20),
+                                execution_price=rng.uniform(5, 900), commission=1.0, status="completed",
+                                timestamp=now - timedelta(minutes=j)))
+    await Portfolio.insert_many(portfolios)
+    if trades:
+        await Trade.insert_many(trades)
+    return [str(u.id) for u in users]
+
+
+# === Măsurare ===
+def summarize(samples):
+    return {
+        "runs": [round(s, 6) for s in samples],
+        "min": round(min(samples), 6),
+        "median": round(statistics.median(samples), 6),
+        "mean": round(statistics.fmean(samples), 6),
+        "max": round(max(samples), 6),
+    }
+
+
+def percentiles_ms(values, points=(50, 90, 99)):
+    ordered = sorted(values)
+    return {f"p{p}": round(ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000, 3)
+            for p in points}
+
+
+async def timed(fn, repeat: int, before=None):
+    samples = []
+    for _ in range(repeat):
+        if before is not None:
+            before()
+        start = time.perf_counter()
+        await fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+# === Scenarii ===
+async def bench_indicators(args):
+    import numpy as np
+    import pandas as pd
+    from routers.recommendations import calculate_atr, calculate_ema, calculate_macd, calculate_rsi, calculate_sma
+
+    rng = np.random.default_rng(args.seed)
+    index = pd.bdate_range(end="2024-12-31", periods=args.history_days)
+    frames = []
+    for _ in range(args.symbols):
+        close = pd.Series(100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(index)))), index=index)
+        spread = np.abs(rng.normal(0, 0.01, len(index)))
+        frames.append((close * (1 + spread), close * (1 - spread), close))
+
+    async def run():
+        for high, low, close in frames:
+            calculate_sma(close, 20)
+            calculate_sma(close, 50)
+            calculate_ema(close, 20)
+            calculate_rsi(close, 14)
+            calculate_macd(close, 12, 26, 9)
+            calculate_atr(high, low, close, 14)
+
+    samples = await timed(run, args.repeat)
+    return {"params": {"symbols": args.symbols, "days": args.history_days},
+            "seconds": summarize(samples),
+            "per_symbol_ms": round(min(samples) / args.symbols * 1000, 4)}
+
+
+async def bench_historical_data(args):
+    from routers import recommendations
+
+    await seed_stocks(args.symbols, random.Random(args.seed))
+    symbols = symbol_names(args.symbols)[:args.historical_symbols]
+
+    async def run():
+        for symbol in symbols:
+            await recommendations.get_stock_historical_data(symbol, "6mo")
+
+    def cold():
+        recommendations._stock_data_cache.clear()
+        random.seed(args.seed)
+
+    cold_samples = await timed(run, args.repeat, before=cold)
+    warm_samples = await timed(run, args.repeat)
+    return {"params": {"symbols": len(symbols), "period": "6mo"},
+            "cold_seconds": summarize(cold_samples),
+            "warm_seconds": summarize(warm_samples),
+            "cold_per_symbol_ms": round(min(cold_samples) / len(symbols) * 1000, 4),
+            "warm_per_symbol_ms": round(min(warm_samples) / len(symbols) * 1000, 4)}
+
+
+async def bench_recommendations(args):
+    from routers import recommendations
+
+    rng = random.Random(args.seed)
+    symbols = symbol_names(args.symbols)
+    await seed_stocks(args.symbols, rng)
+    user_ids = await seed_users(args.recommendation_users, 10, symbols[:100], rng)
+    target = user_ids[0]
+
+    async def run():
+        result = await recommendations.get_recommendations(
+            target, limit=5, include_details=True, min_performance=-3.0, filter_negative=True)
+        if not isinstance(result, dict):
+            raise RuntimeError("get_recommendations returned no result")
+
+    def cold():
+        recommendations._stock_data_cache.clear()
+        random.seed(args.seed)
+
+    cold_samples = await timed(run, args.repeat, before=cold)
+    warm_samples = await timed(run, args.repeat)
+    return {"params": {"users": len(user_ids), "stocks": args.symbols},
+            "cold_seconds": summarize(cold_samples),
+            "warm_seconds": summarize(warm_samples)}
+
+
+async def bench_create_trade(args):
+    from models.outbox import OutboxEvent
+    from routers.trades import TradeRequest, create_trade
+
+    rng = random.Random(args.seed)
+    symbols = symbol_names(100)
+    user_ids = await seed_users(args.trade_callers, 0, symbols, rng, holdings=0)
+    total = args.trade_callers * args.trades_per_caller
+    results = []
+
+    async def caller(user_id, latencies):
+        for i in range(args.trades_per_caller):
+            request = TradeRequest(user_id=user_id, symbol=symbols[i % len(symbols)], quantity=1,
+                                   trade_type="buy", order_type="market", execution_price=10.0)
+            start = time.perf_counter()
+            await create_trade(request)
+            latencies.append(time.perf_counter() - start)
+
+    for _ in range(args.repeat):
+        await reset_collections(OutboxEvent)
+        latencies = []
+        start = time.perf_counter()
+        await asyncio.gather(*(caller(uid, latencies) for uid in user_ids))
+        elapsed = time.perf_counter() - start
+        results.append((elapsed, latencies))
+
+    best_elapsed, best_latencies = min(results, key=lambda r: r[0])
+    return {"params": {"callers": args.trade_callers, "trades_per_caller": args.trades_per_caller},
+            "seconds": summarize([r[0] for r in results]),
+            "trades_per_second": round(total / best_elapsed, 2),
+            "latency_ms": percentiles_ms(best_latencies)}
+
+
+async def bench_leaderboard(args, chain):
+    from routers.leaderboard import get_leaderboard
+
+    contract, _ = chain
+    rng = random.Random(args.seed)
+    seed_start = time.perf_counter()
+    await seed_users(args.leaderboard_users, args.leaderboard_trades, symbol_names(100), rng, holdings=3)
+    seed_seconds = time.perf_counter() - seed_start
+
+    contract.calls = 0
+    rows = []
+
+    async def run():
+        rows[:] = [await get_leaderboard()]
+
+    samples = await timed(run, args.repeat)
+    return {"params": {"users": args.leaderboard_users, "trades_per_user": args.leaderboard_trades},
+            "seed_seconds": round(seed_seconds, 3),
+            "seconds": summarize(samples),
+            "rows": len(json.loads(rows[0].body)) if rows else 0,
+            "chain_calls": contract.calls}
+
+
+async def bench_news(args):
+    from models.news import NewsArticle
+    from news_ingest import NEWS_TICKERS, NewsIngester
+    from routers.news import process_yfinance_news
+
+    raw = [fake_raw_news(t) for t in NEWS_TICKERS]
+
+    async def process():
+        for _ in range(args.news_rounds):
+            for items in raw:
+                process_yfinance_news(items)
+
+    process_samples = await timed(process, args.repeat)
+    processed = args.news_rounds * sum(min(len(items), 20) for items in raw)
+
+    ingester = NewsIngester()
+    await reset_collections(NewsArticle)
+    ingest_samples = await timed(ingester.ingest_once, args.repeat)
+    return {"params": {"tickers": len(raw), "rounds": args.news_rounds},
+            "process_seconds": summarize(process_samples),
+            "items_per_second": round(processed / min(process_samples), 1),
+            "ingest_once_seconds": summarize(ingest_samples),
+            "ingested_items": ingester.last_run["items"] if ingester.last_run else 0}
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args):
+    install_fake_yfinance()
+    chain = install_fake_chain()
+    cleanup = await init_database(args.mongo_uri)
+    results = {}
+    try:
+        for name in args.only or SCENARIOS:
+            start = time.perf_counter()
+            if name == "leaderboard":
+                results[name] = await bench_leaderboard(args, chain)
+            else:
+                results[name] = await globals()[f"bench_{name}"](args)
+            print(f"{name}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    finally:
+        await cleanup()
+
+    return {
+        "benchmark": "hot_paths",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "backend": "mongodb" if args.mongo_uri else "mongomock",
+        "repeat": args.repeat,
+        "seed": args.seed,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--only", nargs="+", choices=SCENARIOS)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--symbols", type=int, default=500)
+    parser.add_argument("--history-days", type=int, default=252)
+    parser.add_argument("--historical-symbols", type=int, default=100, help="câte simboluri trec prin get_stock_historical_data")
+    parser.add_argument("--recommendation-users", type=int, default=200)
+    parser.add_argument("--trade-callers", type=int, default=32)
+    parser.add_argument("--trades-per-caller", type=int, default=20)
+    parser.add_argument("--leaderboard-users", type=int,
+                        help="implicit 10000 pe MongoDB; 2000 pe mongomock, unde fiecare find e o scanare completă")
+    parser.add_argument("--leaderboard-trades", type=int, default=2, help="trade-uri per user la leaderboard")
+    parser.add_argument("--news-rounds", type=int, default=20)
+    parser.add_argument("--mongo-uri", help="rulează pe un MongoDB real în loc de mongomock")
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    parser.add_argument("--verbose", action="store_true", help="lasă log-urile aplicației pe stderr")
+    args = parser.parse_args()
+
+    if args.leaderboard_users is None:
+        args.leaderboard_users = 10_000 if args.mongo_uri else 2_000
+    if not args.verbose:
+        logging.disable(logging.CRITICAL)
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
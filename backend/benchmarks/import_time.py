@@ -0,0 +1,75 @@
+"""
+Buget pentru timpul de import al aplicației (`import main`), adică pornirea unui worker.
+
+Importă main într-un interpretor nou cu `python -X importtime`, raportează timpul total și
+modulele de top cele mai scumpe (cumulat) și iese cu cod 1 dacă se depășește bugetul:
+
+    cd backend/app
+    python ../benchmarks/import_time.py --budget-ms 1500 --top 15
+
+Rulat de mai multe ori (--runs), se păstrează minimul, ca zgomotul de disc/cache să nu conteze.
+Același buget (plus lipsa numpy/pandas/yfinance/web3 la pornire) e verificat în tests/test_import_time.py.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def measure(module: str):
+    """Returnează (total_us, {modul: cumulat_us}) pentru un import într-un proces nou (nivelurile 0 și 1)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    modules, total = {}, None
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package", indentat cu 2 spații per nivel
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 0 and name == module:
+            total = int(cumulative)
+        elif depth <= 1:
+            modules[name] = max(modules.get(name, 0), int(cumulative))
+    return total if total is not None else sum(modules.values()), modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500")))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    best_total, best_modules = None, {}
+    for _ in range(max(1, args.runs)):
+        total, modules = measure(args.module)
+        if best_total is None or total < best_total:
+            best_total, best_modules = total, modules
+
+    total_ms = best_total / 1000
+    slowest = sorted(best_modules.items(), key=lambda kv: kv[1], reverse=True)
+    report = {
+        "benchmark": "import_time",
+        "module": args.module,
+        "import_ms": round(total_ms, 1),
+        "budget_ms": args.budget_ms,
+        "within_budget": total_ms <= args.budget_ms,
+        "slowest_imports_ms": {name: round(us / 1000, 1) for name, us in slowest[:args.top]},
+    }
+    print(json.dumps(report, indent=2))
+    sys.exit(0 if report["within_budget"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark pentru serializarea JSON a listelor mari: calea standard FastAPI față de fast_json.
+
+Rândurile imită răspunsurile reale: trade-uri (ObjectId, datetime, float-uri), leaderboard
+și detalii de recomandare (scalari NumPy, NaN). Pentru fiecare dimensiune (implicit 1k și 10k
+rânduri) se măsoară timpul minim din --repeat rulări și vârful de memorie (tracemalloc) pentru:
+- fastapi: jsonable_encoder + JSONResponse.render (ce face FastAPI pentru un dict/list returnat);
+- fast_json: FastJSONResponse.render (orjson, dacă e instalat);
+- fast_json_stdlib: aceeași cale cu json din stdlib (fallback-ul fără orjson).
+
+    cd backend/app
+    python ../benchmarks/json_encoding.py --rows 1000 10000 --output json.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+import numpy as np
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+import fast_json
+
+SHAPES = ["trades", "leaderboard", "recommendation"]
+
+
+def make_rows(shape: str, n: int, rng: random.Random):
+    start = datetime(2024, 1, 1)
+    if shape == "trades":
+        return [{
+            "id": ObjectId(),
+            "user_id": ObjectId(),
+            "symbol": f"S{rng.randrange(500):04d}",
+            "quantity": rng.randint(1, 100),
+            "trade_type": rng.choice(["buy", "sell"]),
+            "order_type": "market",
+            "execution_price": round(rng.uniform(5, 500), 2),
+            "commission": 0.0,
+            "status": "executed",
+            "timestamp": start + timedelta(minutes=i),
+            "blockchain_tx": None,
+        } for i in range(n)]
+    if shape == "leaderboard":
+        return [{
+            "user_id": str(ObjectId()),
+            "username": f"student{i}",
+            "total_trades": rng.randint(0, 200),
+            "total_profit": round(rng.uniform(-5000, 5000), 2),
+            "last_trade": (start + timedelta(hours=i)).isoformat(),
+        } for i in range(n)]
+    # recommendation: valori scoase din pandas, ca în get_recommendation_detail
+    prices = np.random.default_rng(rng.randrange(2**32)).normal(100, 5, n)
+    return [{
+        "symbol": f"S{i % 500:04d}",
+        "price": prices[i],
+        "sma20": np.float64("nan") if i % 50 == 0 else prices[i] * 0.99,
+        "volume": np.int64(rng.randint(1_000, 1_000_000)),
+        "trend_up": prices[i] > 100,
+        "date": start + timedelta(days=i),
+    } for i in range(n)]
+
+
+def encode_fastapi(rows) -> bytes:
+    # rutele vechi făceau str(ObjectId) de mână; aici același cost, prin custom_encoder
+    return JSONResponse(jsonable_encoder(rows, custom_encoder={ObjectId: str})).body
+
+
+def encode_fast_json(rows) -> bytes:
+    return fast_json.FastJSONResponse(rows).body
+
+
+def encode_fast_json_stdlib(rows) -> bytes:
+    return fast_json.dumps_stdlib(rows)
+
+
+ENCODERS = {
+    "fastapi": encode_fastapi,
+    "fast_json": encode_fast_json,
+    "fast_json_stdlib": encode_fast_json_stdlib,
+}
+
+
+def measure(encode, rows, repeat: int) -> dict:
+    try:
+        body = encode(rows)
+    except Exception as e:
+        # ex. np.bool_ / NaN pe care jsonable_encoder + json.dumps nu le acceptă
+        return {"error": f"{type(e).__name__}: {e}"}
+
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        encode(rows)
+        times.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    encode(rows)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "min_ms": round(min(times), 3),
+        "median_ms": round(statistics.median(times), 3),
+        "peak_kib": round(peak / 1024, 1),
+        "bytes": len(body),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR, text=True).strip()
+    except Exception:
+        return None
+
+
+def run(args) -> dict:
+    rng = random.Random(args.seed)
+    results = {}
+    for shape in args.shapes:
+        for n in args.rows:
+            rows = make_rows(shape, n, rng)
+            results[f"{shape}_{n}"] = {name: measure(ENCODERS[name], rows, args.repeat) for name in ENCODERS}
+    return {
+        "benchmark": "json_encoding",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "orjson": fast_json.orjson is not None,
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1_000, 10_000])
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=SHAPES)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
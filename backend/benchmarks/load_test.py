@@ -0,0 +1,296 @@
+"""
+Test de încărcare end-to-end: un amestec realist de utilizatori pe tot API-ul.
+
+Fiecare student sintetic face signup + login și își creează portofoliul; apoi cererile sunt
+generate open-loop, cu sosiri Poisson la --rate cereri/secundă, iar ruta se alege după --mix
+(login, portofoliu, trade, recomandări, leaderboard, știri, chat). Raportul JSON conține
+throughput-ul, percentilele de latență, codurile de stare și rata de erori per rută.
+
+Cu --spawn pornește singur serverul LLM fals și aplicația (serve_stubbed.py, cu yfinance fals);
+MongoDB și nodul hardhat cu contractele deployate trebuie să ruleze local (start_blockchain.py).
+
+    python backend/start_blockchain.py &
+    python backend/benchmarks/load_test.py --spawn --users 200 --rate 50 --duration 60
+    python backend/benchmarks/load_test.py --mix portfolio=50,news=30,trade=20 --rate 200
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import uuid
+from collections import Counter, defaultdict
+
+import httpx
+
+from chatbot_load import FAQ, percentiles
+from fakes import quote
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SYMBOLS = ["AAPL", "MSFT", "GOOGL", "AMZN", "TSLA", "META", "NVDA", "JPM", "DIS", "PG", "JNJ", "NFLX"]
+DEFAULT_MIX = "login=3,portfolio=30,trade=15,recommendations=8,leaderboard=5,news=20,news_portfolio=12,chat=7"
+PASSWORD = "load-test-password"
+
+
+class Student:
+    def __init__(self, email: str):
+        self.email = email
+        self.user_id = None
+        self.holdings = Counter()
+
+
+def user_id_from_token(token: str) -> str:
+    # Payload-ul JWT (fără verificarea semnăturii): "sub" e id-ul userului
+    payload = token.split(".")[1]
+    payload += "=" * (-len(payload) % 4)
+    return json.loads(base64.urlsafe_b64decode(payload))["sub"]
+
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name.strip() not in ACTIONS:
+            raise SystemExit(f"Unknown action in --mix: {name!r} (known: {', '.join(ACTIONS)})")
+        mix[name.strip()] = float(weight or 1)
+    return mix
+
+
+# === Acțiuni: fiecare face o cerere și întoarce răspunsul ===
+async def do_login(client, student, rng):
+    return await client.post("/auth/login", json={"email": student.email, "password": PASSWORD})
+
+
+async def do_portfolio(client, student, rng):
+    return await client.get(f"/portfolios/{student.user_id}")
+
+
+async def do_trade(client, student, rng):
+    owned = [s for s, q in student.holdings.items() if q > 0]
+    if owned and rng.random() < 0.3:
+        symbol, trade_type = rng.choice(owned), "sell"
+    else:
+        symbol, trade_type = rng.choice(SYMBOLS), "buy"
+    response = await client.post("/trades/", json={
+        "user_id": student.user_id, "symbol": symbol, "quantity": 1, "trade_type": trade_type,
+        "order_type": "market", "execution_price": quote(symbol),
+    })
+    if response.status_code == 200:
+        student.holdings[symbol] += 1 if trade_type == "buy" else -1
+    return response
+
+
+async def do_recommendations(client, student, rng):
+    return await client.get(f"/recommendations/{student.user_id}")
+
+
+async def do_leaderboard(client, student, rng):
+    return await client.get("/leaderboard/")
+
+
+async def do_news(client, student, rng):
+    return await client.get("/news/")
+
+
+async def do_news_portfolio(client, student, rng):
+    return await client.get(f"/news/portfolio/{student.user_id}")
+
+
+async def do_chat(client, student, rng):
+    return await client.post("/api/chatbot/chat", json={"message": rng.choice(FAQ), "user_id": student.user_id})
+
+
+ACTIONS = {
+    "login": do_login,
+    "portfolio": do_portfolio,
+    "trade": do_trade,
+    "recommendations": do_recommendations,
+    "leaderboard": do_leaderboard,
+    "news": do_news,
+    "news_portfolio": do_news_portfolio,
+    "chat": do_chat,
+}
+
+
+# === Pregătire ===
+async def register(client, student: Student):
+    response = await client.post("/auth/signup", json={
+        "username": student.email.split("@")[0], "email": student.email, "password": PASSWORD})
+    if response.status_code not in (200, 400):  # 400 = există deja, refolosim contul
+        response.raise_for_status()
+    response = await client.post("/auth/login", json={"email": student.email, "password": PASSWORD})
+    response.raise_for_status()
+    student.user_id = user_id_from_token(response.json()["access_token"])
+    response = await client.post("/portfolios/", json={"user_id": student.user_id})
+    response.raise_for_status()
+
+
+async def register_all(client, students, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(student):
+        async with semaphore:
+            await register(client, student)
+
+    await asyncio.gather(*(one(s) for s in students))
+
+
+async def chain_reachable(url: str) -> bool:
+    try:
+        async with httpx.AsyncClient(timeout=2) as client:
+            response = await client.post(url, json={"jsonrpc": "2.0", "method": "eth_blockNumber", "params": [], "id": 1})
+            return response.status_code == 200 and "result" in response.json()
+    except Exception:
+        return False
+
+
+async def wait_ready(base_url: str, timeout: float):
+    deadline = time.monotonic() + timeout
+    async with httpx.AsyncClient(base_url=base_url, timeout=2) as client:
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get("/")).status_code == 200:
+                    return
+            except httpx.TransportError:
+                pass
+            await asyncio.sleep(0.5)
+    raise SystemExit(f"API at {base_url} did not become ready in {timeout:.0f}s")
+
+
+def spawn_services(args):
+    """Pornește LLM-ul fals și aplicația cu yfinance fals; întoarce procesele, pentru oprire."""
+    llm = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "fake_llm_server.py"),
+                            "--port", str(args.llm_port)])
+    env = dict(os.environ, OLLAMA_URL=f"http://127.0.0.1:{args.llm_port}/v1/chat/completions",
+               BLOCKCHAIN_URL=args.chain_url)
+    if args.mongo_uri:
+        env["MONGO_URI"] = args.mongo_uri
+    port = httpx.URL(args.base_url).port or 8000
+    api = subprocess.Popen([sys.executable, os.path.join(BENCH_DIR, "serve_stubbed.py"), "--port", str(port),
+                            "--yfinance-latency", str(args.yfinance_latency)], env=env)
+    return [api, llm]
+
+
+# === Rulare ===
+async def run(args):
+    mix = parse_mix(args.mix)
+    names, weights = list(mix), list(mix.values())
+    rng = random.Random(args.seed)
+    run_id = uuid.uuid4().hex[:8]
+    students = [Student(f"student-{run_id}-{i}@example.com") for i in range(args.users)]
+
+    processes = spawn_services(args) if args.spawn else []
+    try:
+        await wait_ready(args.base_url, args.startup_timeout)
+        limits = httpx.Limits(max_connections=args.max_in_flight, max_keepalive_connections=args.max_in_flight)
+        async with httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout, limits=limits) as client:
+            setup_start = time.perf_counter()
+            await register_all(client, students, args.setup_concurrency)
+            setup_seconds = time.perf_counter() - setup_start
+
+            latencies = defaultdict(list)
+            statuses = defaultdict(Counter)
+            errors = defaultdict(Counter)
+            in_flight = set()
+            dropped = 0
+
+            async def fire(name, student):
+                start = time.perf_counter()
+                try:
+                    response = await ACTIONS[name](client, student, rng)
+                    statuses[name][response.status_code] += 1
+                    if response.status_code >= 400:
+                        errors[name][f"http_{response.status_code}"] += 1
+                    else:
+                        latencies[name].append(time.perf_counter() - start)
+                except Exception as e:
+                    errors[name][type(e).__name__] += 1
+
+            start = time.perf_counter()
+            next_at = start
+            while next_at - start < args.duration:
+                delay = next_at - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                if len(in_flight) >= args.max_in_flight:
+                    # Open-loop: nu așteptăm serverul; cererea e numărată ca pierdută de client
+                    dropped += 1
+                else:
+                    task = asyncio.create_task(fire(rng.choices(names, weights)[0], rng.choice(students)))
+                    in_flight.add(task)
+                    task.add_done_callback(in_flight.discard)
+                next_at += rng.expovariate(args.rate)
+            if in_flight:
+                await asyncio.wait(in_flight, timeout=args.timeout)
+            elapsed = time.perf_counter() - start
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    routes = {}
+    for name in names:
+        sent = sum(statuses[name].values()) + sum(v for k, v in errors[name].items() if not k.startswith("http_"))
+        failed = sum(errors[name].values())
+        routes[name] = {
+            "requests": sent,
+            "error_rate": round(failed / sent, 4) if sent else 0.0,
+            "errors": dict(errors[name]),
+            "status_codes": {str(k): v for k, v in statuses[name].items()},
+            "latency_ms": percentiles(latencies[name]),
+        }
+    completed = sum(r["requests"] for r in routes.values())
+    failed_total = sum(sum(errors[n].values()) for n in names)
+    return {
+        "benchmark": "load_test",
+        "base_url": args.base_url,
+        "users": args.users,
+        "offered_rate": args.rate,
+        "duration": args.duration,
+        "mix": mix,
+        "chain_reachable": await chain_reachable(args.chain_url),
+        "setup_seconds": round(setup_seconds, 2),
+        "seconds": round(elapsed, 3),
+        "requests": completed,
+        "dropped": dropped,
+        "throughput": round(completed / elapsed, 2) if elapsed > 0 else None,
+        "error_rate": round(failed_total / completed, 4) if completed else 0.0,
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+    parser.add_argument("--users", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20.0, help="cereri pe secundă (sosiri Poisson)")
+    parser.add_argument("--duration", type=float, default=60.0, help="secunde de trafic după pregătire")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="acțiune=pondere,... (" + ", ".join(ACTIONS) + ")")
+    parser.add_argument("--max-in-flight", type=int, default=256)
+    parser.add_argument("--setup-concurrency", type=int, default=16)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--spawn", action="store_true", help="pornește aplicația (yfinance fals) și LLM-ul fals")
+    parser.add_argument("--llm-port", type=int, default=11500)
+    parser.add_argument("--yfinance-latency", type=float, default=0.05)
+    parser.add_argument("--mongo-uri", help="MONGO_URI pentru aplicația pornită cu --spawn")
+    parser.add_argument("--chain-url", default=os.getenv("BLOCKCHAIN_URL", "http://127.0.0.1:8545"))
+    parser.add_argument("--startup-timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+"""
+Pornește aplicația FastAPI cu yfinance înlocuit de fakes.install_fake_yfinance.
+
+Mongo și nodul blockchain sunt cele reale (locale), date prin MONGO_URI / BLOCKCHAIN_URL;
+LLM-ul e cel de la OLLAMA_URL (de obicei fake_llm_server.py). Folosit de load_test.py --spawn,
+dar se poate rula și direct:
+
+    OLLAMA_URL=http://127.0.0.1:11500/v1/chat/completions python backend/benchmarks/serve_stubbed.py --port 8000
+"""
+import argparse
+import os
+import sys
+
+import uvicorn
+
+from fakes import install_fake_yfinance
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--yfinance-latency", type=float, default=0.05, help="secunde per apel yfinance fals")
+    args = parser.parse_args()
+
+    # Căile relative din aplicație (ABI-uri, rag/) sunt față de backend/app
+    os.chdir(APP_DIR)
+    sys.path.insert(0, APP_DIR)
+    install_fake_yfinance(args.yfinance_latency)
+
+    from main import app
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
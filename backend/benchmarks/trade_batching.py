@@ -0,0 +1,130 @@
+"""
+Benchmark: înregistrare trade-uri on-chain, un tx per trade vs. registerTrades în batch.
+
+Rulează împotriva unui nod hardhat local cu TradeSimulator deployat (npx hardhat node + deploy):
+
+    cd backend/app
+    python ../benchmarks/trade_batching.py --trades 200 --batch-sizes 10 50 100
+
+Scrie rezultatele ca JSON (gas total, gas per trade, trade-uri/secundă) pe stdout sau în --output.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from dotenv import load_dotenv
+from eth_account import Account
+from web3 import Web3
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app"))
+
+ARTIFACT_PATH = "blockchain/artifacts/contracts/TradeSimulator.sol/TradeSimulator.json"
+SYMBOLS = ["AAPL", "MSFT", "GOOG", "AMZN", "TSLA", "META", "NVDA", "JPM"]
+
+
+def load_contract(w3):
+    if os.path.exists(ARTIFACT_PATH):
+        with open(ARTIFACT_PATH) as f:
+            abi = json.load(f)["abi"]
+    else:
+        from blockchain.utils import trade_abi as abi
+    address = Web3.to_checksum_address(os.getenv("CONTRACT_ADDRESS"))
+    return w3.eth.contract(address=address, abi=abi)
+
+
+def fake_trades(n):
+    users = [Account.create().address for _ in range(20)]
+    return [
+        {
+            "user": users[i % len(users)],
+            "symbol": SYMBOLS[i % len(SYMBOLS)],
+            "amount": (i % 10) + 1,
+            "is_buy": i % 3 != 0,
+        }
+        for i in range(n)
+    ]
+
+
+def send_all(w3, account, calls):
+    """Trimite toate tranzacțiile cu nonce-uri locale consecutive și așteaptă receipt-urile la final."""
+    nonce = w3.eth.get_transaction_count(account.address, "pending")
+    gas_price = w3.to_wei("10", "gwei")
+    tx_hashes = []
+    start = time.perf_counter()
+    for call in calls:
+        txn = call.build_transaction({"from": account.address, "nonce": nonce, "gasPrice": gas_price})
+        signed_txn = account.sign_transaction(txn)
+        tx_hashes.append(w3.eth.send_raw_transaction(signed_txn.raw_transaction))
+        nonce += 1
+    receipts = [w3.eth.wait_for_transaction_receipt(h) for h in tx_hashes]
+    elapsed = time.perf_counter() - start
+    return receipts, elapsed
+
+
+def run_per_trade(w3, account, contract, trades):
+    calls = [
+        contract.functions.registerTrade(t["user"], t["symbol"], t["amount"], t["is_buy"])
+        for t in trades
+    ]
+    receipts, elapsed = send_all(w3, account, calls)
+    return summarize("per_trade", len(trades), len(calls), receipts, elapsed)
+
+
+def run_batched(w3, account, contract, trades, batch_size):
+    calls = []
+    for i in range(0, len(trades), batch_size):
+        chunk = trades[i:i + batch_size]
+        calls.append(contract.functions.registerTrades(
+            [t["user"] for t in chunk],
+            [t["symbol"] for t in chunk],
+            [t["amount"] for t in chunk],
+            [t["is_buy"] for t in chunk],
+        ))
+    receipts, elapsed = send_all(w3, account, calls)
+    return summarize(f"batch_{batch_size}", len(trades), len(calls), receipts, elapsed)
+
+
+def summarize(name, n_trades, n_txs, receipts, elapsed):
+    total_gas = sum(r["gasUsed"] for r in receipts)
+    return {
+        "name": name,
+        "trades": n_trades,
+        "transactions": n_txs,
+        "failed_transactions": sum(1 for r in receipts if r["status"] != 1),
+        "total_gas": total_gas,
+        "gas_per_trade": round(total_gas / n_trades, 1),
+        "seconds": round(elapsed, 4),
+        "trades_per_second": round(n_trades / elapsed, 1) if elapsed > 0 else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trades", type=int, default=200)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--rpc", default=os.getenv("BLOCKCHAIN_URL", "http://127.0.0.1:8545"))
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    load_dotenv()
+    w3 = Web3(Web3.HTTPProvider(args.rpc))
+    account = Account.from_key(os.getenv("PRIVATE_KEY"))
+    contract = load_contract(w3)
+    trades = fake_trades(args.trades)
+
+    results = [run_per_trade(w3, account, contract, trades)]
+    for batch_size in args.batch_sizes:
+        results.append(run_batched(w3, account, contract, trades, batch_size))
+
+    report = json.dumps({"benchmark": "trade_batching", "results": results}, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
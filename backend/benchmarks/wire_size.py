@@ -0,0 +1,121 @@
+"""
+Benchmark pentru compresia răspunsurilor: octeți pe fir și timp estimat de încărcare pe rețele lente.
+
+Payload-uri sintetice în forma reală a răspunsurilor mari: lista de acțiuni (/stocks/), o serie
+de grafic (/{symbol}), știri cu thumbnail (/news/all) și leaderboard. Pentru fiecare codare
+(identity, gzip și br, la nivelul dinamic și la cel folosit pentru variantele din response_cache)
+se raportează dimensiunea, timpul minim de compresie și timpul de transfer estimat la
+--bandwidth-kbps plus un RTT, adică ce simte un client pe o rețea de școală aglomerată.
+
+    cd backend/app
+    python ../benchmarks/wire_size.py --bandwidth-kbps 2000 --output wire_size.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+from fakes import quote
+from json_encoding import git_commit, make_rows
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+sys.path.insert(0, APP_DIR)
+
+import fast_json
+import response_compression
+
+SECTORS = ["Technology", "Healthcare", "Finance", "Consumer Staples", "Utilities", "Energy", "Industrials"]
+
+
+def make_payloads(rng: random.Random, stocks: int, chart_days: int, news: int, leaderboard: int) -> dict:
+    symbols = [f"S{i:04d}" for i in range(stocks)]
+    start = datetime(2024, 1, 1)
+    return {
+        "stocks": [{
+            "symbol": s, "name": f"{s} Holdings Inc.", "sector": rng.choice(SECTORS),
+            "price": quote(s), "change": round(rng.uniform(-5, 5), 2),
+            "price_history": [round(quote(s) * rng.uniform(0.9, 1.1), 2) for _ in range(30)],
+        } for s in symbols],
+        "chart": {
+            "labels": [(start + timedelta(days=i)).strftime("%Y-%m-%d") for i in range(chart_days)],
+            "values": [round(100 + rng.gauss(0, 5), 2) for _ in range(chart_days)],
+        },
+        "news": [{
+            "id": f"news-{i}", "title": f"{rng.choice(symbols)} shares move after quarterly results {i}",
+            "publisher": rng.choice(["Reuters", "Bloomberg", "Yahoo Finance"]),
+            "link": f"https://example.com/news/{i}", "providerPublishTime": 1_700_000_000 + i * 60,
+            "type": "STORY", "relatedTickers": rng.sample(symbols, 2),
+            "thumbnail": {"resolutions": [{"url": f"https://example.com/{i}.jpg", "width": 140, "height": 140}]},
+        } for i in range(news)],
+        "leaderboard": make_rows("leaderboard", leaderboard, rng),
+    }
+
+
+def variants():
+    encodings = ["gzip"] + (["br"] if response_compression.brotli is not None else [])
+    for encoding in encodings:
+        yield f"{encoding}_dynamic", encoding, False
+        yield f"{encoding}_cached", encoding, True
+
+
+def transfer_ms(size: int, bandwidth_kbps: float, rtt_ms: float) -> float:
+    return round(rtt_ms + size * 8 / bandwidth_kbps, 1)
+
+
+def measure(body: bytes, args) -> dict:
+    result = {"identity": {"bytes": len(body), "transfer_ms": transfer_ms(len(body), args.bandwidth_kbps, args.rtt_ms)}}
+    for name, encoding, cached in variants():
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            compressed = response_compression.compress(body, encoding, cached)
+            times.append((time.perf_counter() - start) * 1000)
+        result[name] = {
+            "bytes": len(compressed),
+            "ratio": round(len(body) / len(compressed), 2),
+            "compress_ms": round(min(times), 3),
+            "transfer_ms": transfer_ms(len(compressed), args.bandwidth_kbps, args.rtt_ms),
+        }
+    return result
+
+
+def run(args) -> dict:
+    payloads = make_payloads(random.Random(args.seed), args.stocks, args.chart_days, args.news, args.leaderboard)
+    return {
+        "benchmark": "wire_size",
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "brotli": response_compression.brotli is not None,
+        "bandwidth_kbps": args.bandwidth_kbps,
+        "rtt_ms": args.rtt_ms,
+        "results": {name: measure(fast_json.dumps(data), args) for name, data in payloads.items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stocks", type=int, default=500)
+    parser.add_argument("--chart-days", type=int, default=1000)
+    parser.add_argument("--news", type=int, default=200)
+    parser.add_argument("--leaderboard", type=int, default=1000)
+    parser.add_argument("--bandwidth-kbps", type=float, default=2000.0, help="lățimea de bandă a clientului, kbit/s")
+    parser.add_argument("--rtt-ms", type=float, default=80.0)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="fișier JSON pentru rezultate (implicit stdout)")
+    args = parser.parse_args()
+
+    report = json.dumps(run(args), indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(report)
+    else:
+        print(report)
+
+
+if __name__ == "__main__":
+    main()
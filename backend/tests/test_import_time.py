@@ -0,0 +1,50 @@
+"""
+Bugetul de pornire al unui worker: `import main` nu încarcă dependențele grele (ele sunt
+importate la prima folosire, vezi lazy_import) și rămâne sub IMPORT_TIME_BUDGET_MS.
+
+    cd backend
+    python -m pytest tests
+
+Raportul detaliat (modulele cele mai scumpe) îl dă benchmarks/import_time.py.
+"""
+import json
+import os
+import subprocess
+import sys
+
+APP_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "app")
+IMPORT_TIME_BUDGET_MS = float(os.getenv("IMPORT_TIME_BUDGET_MS", "1500"))
+HEAVY_MODULES = ("numpy", "pandas", "yfinance", "web3", "eth_account", "scipy", "sklearn")
+RUNS = 3
+
+
+def import_main():
+    """Importă main într-un interpretor nou; întoarce (modulele grele încărcate, timpul de import în ms)."""
+    code = (
+        "import json, sys, main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True,
+    )
+    assert proc.returncode == 0, proc.stderr.strip().splitlines()[-1:]
+
+    import_us = None
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; main e singurul modul de nivel 0 cu numele ăsta
+        if line.startswith("import time:") and line.endswith("| main"):
+            import_us = int(line[len("import time:"):].split("|")[1])
+    assert import_us is not None, "no importtime line for main"
+    return json.loads(proc.stdout.strip().splitlines()[-1]), import_us / 1000
+
+
+def test_import_main_skips_heavy_modules_and_stays_within_budget():
+    runs = [import_main() for _ in range(RUNS)]
+
+    loaded = sorted({m for heavy, _ in runs for m in heavy})
+    assert loaded == [], f"imported at startup: {loaded}"
+
+    # minimul din câteva rulări, ca zgomotul de disc/cache să nu conteze
+    best_ms = min(ms for _, ms in runs)
+    assert best_ms <= IMPORT_TIME_BUDGET_MS, f"import main took {best_ms:.0f} ms (budget {IMPORT_TIME_BUDGET_MS:.0f} ms)"
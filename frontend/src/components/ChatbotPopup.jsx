@@ -11,6 +11,8 @@ export default function ChatbotPopup() {
   const [loading, setLoading] = useState(false);
   const messagesEndRef = useRef(null);
   const [userId, setUserId] = useState(null);
+  // Conversația continuă cu același session_id (backend-ul ține istoricul per sesiune)
+  const [sessionId, setSessionId] = useState(() => sessionStorage.getItem("chatbot_session_id"));
   
   // Obține ID-ul utilizatorului la prima încărcare
   useEffect(() => {
@@ -62,11 +64,20 @@ export default function ChatbotPopup() {
       console.log("Sending to API with user ID:", userId);
       
       // Trimite cerere către backend
+      const token = localStorage.getItem("access_token");
       const res = await axios.post("http://localhost:8000/api/chatbot/chat", {
         message: currentInput,
-        user_id: userId || "guest"
+        user_id: userId || "guest",
+        session_id: sessionId
+      }, {
+        headers: token ? { Authorization: `Bearer ${token}` } : {}
       });
       
+      if (res.data.session_id && res.data.session_id !== sessionId) {
+        sessionStorage.setItem("chatbot_session_id", res.data.session_id);
+        setSessionId(res.data.session_id);
+      }
+
       // Adaugă răspunsul backend-ului
       const botResponse = { role: "assistant", content: res.data.response };
       setMessages(prevMessages => [...prevMessages, botResponse]);